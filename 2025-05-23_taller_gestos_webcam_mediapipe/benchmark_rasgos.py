@@ -0,0 +1,241 @@
+"""
+Benchmark de rasgos de mano: reglas atributo por atributo contra rasgos_mano
+Recorre secuencias de landmarks grabadas (.npz con --grabar) o, sin archivos, una
+secuencia sintética de manos con gestos conocidos, rotadas, escaladas y en espejo.
+Mide el tiempo por fotograma de cada enfoque y, con la secuencia sintética, el
+acierto en el conteo de dedos
+Uso: python benchmark_rasgos.py [grabacion.npz ...] [--frames 3000] [--manos 2]
+     python benchmark_rasgos.py --grabar grabacion.npz [--segundos 30]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from rasgos_mano import ClasificadorReglas, calcular_rasgos, landmarks_a_arreglo
+
+
+class Punto:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y, z):
+        self.x, self.y, self.z = x, y, z
+
+
+class Mano:
+    """
+    Imita hand_landmarks de MediaPipe: una lista .landmark de objetos con x, y, z
+    """
+    __slots__ = ("landmark",)
+
+    def __init__(self, puntos):
+        self.landmark = [Punto(*map(float, p)) for p in puntos]
+
+
+# Reglas anteriores, copiadas de hand_gestures.py y generar_json.py
+def count_extended_fingers(hand_landmarks):
+    count = 0
+    for tip, dip in zip((8, 12, 16, 20), (7, 11, 15, 19)):
+        if hand_landmarks.landmark[tip].y < hand_landmarks.landmark[dip].y:
+            count += 1
+    if hand_landmarks.landmark[4].x > hand_landmarks.landmark[3].x:
+        count += 1
+    return count
+
+
+def calc_thumb_index_distance(hand_landmarks):
+    thumb = hand_landmarks.landmark[4]
+    index = hand_landmarks.landmark[8]
+    dx = thumb.x - index.x
+    dy = thumb.y - index.y
+    return np.sqrt(dx*dx + dy*dy)
+
+
+def contar_dedos(mano_landmarks):
+    dedos = [False, False, False, False, False]
+    tips = [4, 8, 12, 16, 20]
+    if mano_landmarks.landmark[4].x < mano_landmarks.landmark[3].x:
+        dedos[0] = True
+    for i, tip in enumerate(tips[1:], start=1):
+        if mano_landmarks.landmark[tip].y < mano_landmarks.landmark[tip - 2].y:
+            dedos[i] = True
+    return sum(dedos)
+
+
+def direccion(d, normal, angulo):
+    """
+    Dirección d inclinada 'angulo' (radianes, por mano) hacia la normal de la palma
+    """
+    return d * np.cos(angulo)[:, None] + normal * np.sin(angulo)[:, None]
+
+
+def manos_sinteticas(n, rng):
+    """
+    n manos con dedos extendidos o doblados al azar
+    Devuelve (landmarks (n, 21, 3) en coordenadas normalizadas, extendidos (n, 5) bool)
+    """
+    extendidos = rng.random((n, 5)) < 0.5
+    puntos = np.zeros((n, 21, 3))
+    normal = np.array([0.0, 0.0, -1.0])  # La palma mira a la cámara; z negativo es hacia ella
+    nudillos = {5: (-0.2, -0.8), 9: (0.0, -0.85), 13: (0.18, -0.8), 17: (0.33, -0.7)}
+    for dedo, base in enumerate((5, 9, 13, 17), start=1):
+        puntos[:, base, :2] = nudillos[base]
+        d = np.array([0.15 * (dedo - 2.5), -1.0, 0.0])
+        d /= np.linalg.norm(d)
+        ext = extendidos[:, dedo]
+        # Ángulos de la articulación del nudillo, media y distal
+        angulos = np.where(ext[:, None], rng.uniform(0, 0.25, (n, 3)),
+                           rng.uniform([1.0, 1.4, 0.7], [1.6, 1.9, 1.2], (n, 3)))
+        acumulado = np.cumsum(angulos, axis=1)
+        for k, largo in enumerate((0.4, 0.25, 0.2)):
+            puntos[:, base + k + 1] = puntos[:, base + k] + largo * direccion(d, normal, acumulado[:, k])
+
+    # Pulgar: hacia afuera extendido, cruzando la palma hacia el meñique doblado
+    puntos[:, 1, :2] = (-0.25, -0.15)
+    puntos[:, 2, :2] = (-0.4, -0.3)
+    ext = extendidos[:, 0]
+    d = np.where(ext[:, None], np.array([-0.6, -0.8, 0.0]), np.array([0.8, -0.6, 0.0]))
+    angulos = np.where(ext[:, None], rng.uniform(0, 0.25, (n, 2)), rng.uniform([0.3, 0.9], [0.6, 1.3], (n, 2)))
+    acumulado = np.cumsum(angulos, axis=1)
+    for k, largo in enumerate((0.3, 0.25)):
+        puntos[:, 3 + k] = puntos[:, 2 + k] + largo * (d * np.cos(acumulado[:, k])[:, None] +
+                                                       normal * np.sin(acumulado[:, k])[:, None])
+
+    # Espejo (mano izquierda o imagen volteada), rotación, escala, posición y ruido
+    espejo = rng.random(n) < 0.5
+    puntos[espejo, :, 0] *= -1
+    theta = rng.uniform(-0.7, 0.7, n)
+    c, s = np.cos(theta), np.sin(theta)
+    x, y = puntos[..., 0].copy(), puntos[..., 1].copy()
+    puntos[..., 0] = c[:, None] * x - s[:, None] * y
+    puntos[..., 1] = s[:, None] * x + c[:, None] * y
+    puntos *= rng.uniform(0.12, 0.25, n)[:, None, None]
+    puntos[..., :2] += rng.uniform(0.3, 0.7, (n, 1, 2))
+    puntos += rng.normal(0, 0.002, puntos.shape)
+    return puntos.astype(np.float32), extendidos
+
+
+def secuencia_sintetica(frames, manos, semilla=0):
+    """
+    (frames, manos, 21, 3) y los dedos extendidos verdaderos (frames, manos, 5)
+    """
+    rng = np.random.default_rng(semilla)
+    puntos, extendidos = manos_sinteticas(frames * manos, rng)
+    return puntos.reshape(frames, manos, 21, 3), extendidos.reshape(frames, manos, 5)
+
+
+def cargar_grabacion(ruta):
+    """
+    Grabación de --grabar: (frames, max_manos, 21, 3) con NaN donde no hubo mano
+    """
+    return np.load(ruta)["manos"]
+
+
+def grabar(ruta, segundos, max_manos=2):
+    import cv2
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=max_manos,
+                                     min_detection_confidence=0.7, min_tracking_confidence=0.5)
+    cap = cv2.VideoCapture(0)
+    frames = []
+    fin = time.perf_counter() + segundos
+    while time.perf_counter() < fin:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        results = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+        registro = np.full((max_manos, 21, 3), np.nan, dtype=np.float32)
+        manos = landmarks_a_arreglo(results)
+        registro[:len(manos)] = manos
+        frames.append(registro)
+        cv2.imshow("Grabando landmarks", cv2.flip(frame, 1))
+        if cv2.waitKey(1) & 0xFF == 27:
+            break
+    cap.release()
+    cv2.destroyAllWindows()
+    np.savez_compressed(ruta, manos=np.array(frames))
+    print(f"{len(frames)} fotogramas guardados en {ruta}")
+
+
+def medir(nombre, secuencia, verdad=None):
+    # Fotogramas como los entrega MediaPipe: listas de objetos con atributos
+    fotogramas = [[Mano(m) for m in f if not np.isnan(m).any()] for f in secuencia]
+    total_manos = sum(len(f) for f in fotogramas)
+    clasificador = ClasificadorReglas()
+
+    inicio = time.perf_counter()
+    anteriores = [[(count_extended_fingers(m), calc_thumb_index_distance(m)) for m in f] for f in fotogramas]
+    t_gestos = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    conteos_json = [[contar_dedos(m) for m in f] for f in fotogramas]
+    t_json = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    conteos, gestos = [], []
+    for f in fotogramas:
+        rasgos = calcular_rasgos(landmarks_a_arreglo(f))
+        conteos.append(rasgos.dedos)
+        gestos.append(clasificador(rasgos))
+    t_rasgos = time.perf_counter() - inicio
+
+    # Fuera de línea: todas las manos de la secuencia en un solo lote
+    validas = ~np.isnan(secuencia).any(axis=(-1, -2))
+    lote = secuencia[validas]
+    inicio = time.perf_counter()
+    rasgos = calcular_rasgos(lote)
+    t_lote = time.perf_counter() - inicio
+
+    n = len(fotogramas)
+    print(f"\n{nombre}: {n} fotogramas, {total_manos} manos")
+    print(f"  count_extended_fingers + distancia: {1e6 * t_gestos / n:8.1f} us/fotograma")
+    print(f"  contar_dedos:                       {1e6 * t_json / n:8.1f} us/fotograma")
+    print(f"  rasgos_mano + clasificador:         {1e6 * t_rasgos / n:8.1f} us/fotograma "
+          f"(incluye convertir los landmarks)")
+    print(f"  rasgos_mano en un lote:             {1e6 * t_lote / n:8.1f} us/fotograma")
+
+    if verdad is not None:
+        correcto = verdad[validas].sum(axis=1)
+        conteos_gestos = [[c for c, _ in f] for f in anteriores]
+        for etiqueta, conteo in (("count_extended_fingers", plano_conteos(conteos_gestos)),
+                                 ("contar_dedos", plano_conteos(conteos_json)),
+                                 ("rasgos_mano", plano_conteos(conteos)),
+                                 ("rasgos_mano (lote)", rasgos.dedos)):
+            print(f"  Conteo de dedos correcto ({etiqueta}): {100 * np.mean(conteo == correcto):.1f}%")
+        print(f"  Estado de cada dedo correcto (rasgos_mano): "
+              f"{100 * np.mean(rasgos.extendidos == verdad[validas]):.1f}%")
+    else:
+        coincide = np.mean(plano_conteos(conteos_json) == plano_conteos(conteos))
+        print(f"  Coincidencia de conteo entre contar_dedos y rasgos_mano: {100 * coincide:.1f}%")
+    etiquetas, cuentas = np.unique([g or "-" for f in gestos for g in f], return_counts=True)
+    print("  Gestos: " + ", ".join(f"{e} {c}" for e, c in zip(etiquetas, cuentas)))
+
+
+def plano_conteos(conteos):
+    return np.concatenate([np.asarray(c, int) for c in conteos]) if conteos else np.empty(0, int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de rasgos de mano")
+    parser.add_argument("grabaciones", nargs="*", help="Archivos .npz grabados con --grabar")
+    parser.add_argument("--frames", type=int, default=3000)
+    parser.add_argument("--manos", type=int, default=2)
+    parser.add_argument("--grabar", default=None, help="Grabar landmarks de la webcam en este .npz")
+    parser.add_argument("--segundos", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.grabar:
+        grabar(args.grabar, args.segundos, args.manos)
+        return
+    if args.grabaciones:
+        for ruta in args.grabaciones:
+            medir(ruta, cargar_grabacion(ruta))
+    else:
+        secuencia, verdad = secuencia_sintetica(args.frames, args.manos)
+        medir("Secuencia sintética", secuencia, verdad)
+
+
+if __name__ == "__main__":
+    main()
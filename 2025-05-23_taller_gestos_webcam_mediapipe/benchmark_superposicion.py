@@ -0,0 +1,80 @@
+"""
+Benchmark del tinte de fondo de hand_gestures.py a 720p y 1080p
+Compara el bucle original (copia sin usar + np.full + addWeighted nuevo en cada
+fotograma) con CompositorTinte sobre una secuencia de gestos: tramos sin mano
+(negro), mano abierta (verde), pinza (negro) y otros (blanco); todos tiñen el
+fotograma y la salida de las variantes es la misma
+Uso: python benchmark_superposicion.py [--frames 300] [--alpha 0.3]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from superposicion import CompositorTinte
+
+RESOLUCIONES = {"720p": (720, 1280), "1080p": (1080, 1920)}
+# Color de cada gesto en hand_gestures.py: sin mano, mano abierta, pinza y otros
+COLORES = ((0, 0, 0), (0, 255, 0), (0, 0, 0), (255, 255, 255))
+
+
+def secuencia_colores(frames, tramo=30, semilla=0):
+    """
+    Un color por fotograma que cambia cada 'tramo' fotogramas, como un gesto sostenido
+    """
+    rng = np.random.default_rng(semilla)
+    gestos = rng.integers(0, len(COLORES), frames // tramo + 1)
+    return [COLORES[gestos[i // tramo]] for i in range(frames)]
+
+
+def original(frame, color, alpha):
+    h, w, _ = frame.shape
+    frame.copy()  # 'background': se copiaba en cada fotograma sin usarse
+    overlay = np.full((h, w, 3), color, dtype=np.uint8)
+    return cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
+
+
+def medir(nombre, forma, colores, alpha):
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 256, forma + (3,), dtype=np.uint8)
+    frames = [base.copy() for _ in range(4)]  # Fotogramas distintos en memoria, como la cámara
+
+    tiempos = {}
+    for etiqueta, paso in (
+            ("original", lambda f, c: original(f, c, alpha)),
+            ("compositor (búfer)", CompositorTinte(alpha).aplicar),
+            ("compositor (en sitio)", lambda f, c, comp=CompositorTinte(alpha): comp.aplicar(f, c, en_sitio=True))):
+        t = []
+        for i, color in enumerate(colores):
+            frame = frames[i % len(frames)]
+            inicio = time.perf_counter()
+            paso(frame, color)
+            t.append(time.perf_counter() - inicio)
+        tiempos[etiqueta] = np.array(t) * 1000
+
+    # Mismo resultado que el original para cada color
+    comp = CompositorTinte(alpha)
+    diferencia = max(np.abs(comp.aplicar(base, c).astype(int) - original(base, c, alpha)).max()
+                     for c in set(COLORES))
+
+    print(f"\n{nombre} ({forma[1]}x{forma[0]}), {len(colores)} fotogramas | "
+          f"diferencia máxima con el original: {diferencia}")
+    for etiqueta, t in tiempos.items():
+        print(f"  {etiqueta:22s} media {t.mean():6.2f} ms | p95 {np.percentile(t, 95):6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del tinte de fondo")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--alpha", type=float, default=0.3)
+    args = parser.parse_args()
+
+    colores = secuencia_colores(args.frames)
+    for nombre, forma in RESOLUCIONES.items():
+        medir(nombre, forma, colores, args.alpha)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Tinte de color sobre el fotograma sin reservar memoria en cada iteración
+Mezclar con cv2.addWeighted contra un np.full((h, w, 3), color) nuevo por fotograma
+cuesta más en crear la capa que en mezclar. Aquí la capa de cada (forma, color) se
+crea una vez y se reutiliza, la mezcla se escribe en un búfer de salida reservado de
+antemano (o sobre el propio fotograma) y un tinte neutro no toca la imagen
+"""
+
+import cv2
+import numpy as np
+
+
+class CompositorTinte:
+    def __init__(self, alpha=0.3, max_capas=8):
+        """
+        alpha: peso del color sobre el fotograma (0 no tiñe)
+        max_capas: capas de color guardadas; al superarlo se descarta la más antigua
+        """
+        self.alpha = alpha
+        self.max_capas = max_capas
+        self.capas = {}
+        self.salida = None
+        self.mezclas = 0
+        self.omitidas = 0
+
+    def capa(self, forma, color):
+        clave = (forma, tuple(color))
+        capa = self.capas.get(clave)
+        if capa is None:
+            if len(self.capas) >= self.max_capas:
+                del self.capas[next(iter(self.capas))]
+            capa = np.full(forma, color, dtype=np.uint8)
+            self.capas[clave] = capa
+        return capa
+
+    def aplicar(self, frame, color, alpha=None, en_sitio=False):
+        """
+        Devuelve frame * (1 - alpha) + color * alpha
+        color None (o alpha 0) es el tinte neutro: se devuelve el fotograma tal cual
+        Sin en_sitio el resultado va a un búfer interno que se reutiliza en la siguiente
+        llamada; copiarlo si hay que conservarlo
+        """
+        alpha = self.alpha if alpha is None else alpha
+        if color is None or alpha <= 0:
+            self.omitidas += 1
+            return frame
+
+        if en_sitio:
+            salida = frame
+        else:
+            if self.salida is None or self.salida.shape != frame.shape:
+                self.salida = np.empty_like(frame)
+            salida = self.salida
+        cv2.addWeighted(self.capa(frame.shape, color), alpha, frame, 1.0 - alpha, 0, dst=salida)
+        self.mezclas += 1
+        return salida
@@ -0,0 +1,166 @@
+"""
+Benchmark del filtro de Kalman por lotes frente al bucle del cuaderno
+Escalar: filtrar_bucle (una señal y una medición a la vez) contra KalmanLotes.constante
+Velocidad constante 2D: un filtro matricial por señal en bucle contra KalmanLotes
+El bucle recorre solo --senales-bucle señales y se extrapola linealmente al total
+(10k x 10k en Python puro tarda decenas de minutos); --bucle-completo lo ejecuta entero
+Uso: python benchmark_kalman.py [--senales 10000] [--pasos 10000] [--senales-bucle 20]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from kalman_lotes import KalmanLotes, filtrar_bucle
+
+
+def mediciones(senales, pasos, dim=1, bloque=100, semilla=0):
+    """
+    Genera mediciones ruidosas por bloques de pasos para no guardar pasos x señales
+    completos en memoria (10k x 10k en float64 son 800 MB). Devuelve bloques (pasos, señales, dim)
+    """
+    rng = np.random.default_rng(semilla)
+    nivel = rng.normal(0, 10, (senales, dim))
+    for inicio in range(0, pasos, bloque):
+        n = min(bloque, pasos - inicio)
+        yield nivel + rng.normal(0, 2, (n, senales, dim))
+
+
+def bucle_velocidad_constante(Z, kf):
+    """
+    Referencia: el mismo modelo matricial, pero señal por señal y paso por paso
+    """
+    F, H, Q, R = kf.F, kf.H, kf.Q, kf.R
+    x = kf.x.copy()
+    salida = np.empty((len(Z), len(x), len(F)))
+    for i in range(Z.shape[1]):
+        xi = x[i].copy()
+        P = np.eye(len(F)) * 100.0
+        for t in range(len(Z)):
+            xi = F @ xi
+            P = F @ P @ F.T + Q
+            S = H @ P @ H.T + R
+            K = P @ H.T @ np.linalg.inv(S)
+            xi = xi + K @ (Z[t, i] - H @ xi)
+            P = P - K @ H @ P
+            salida[t, i] = xi
+    return salida
+
+
+def medir_escalar(args):
+    print(f"\nModelo escalar (cuaderno): {args.senales} señales x {args.pasos} pasos")
+    senales_bucle = args.senales if args.bucle_completo else min(args.senales_bucle, args.senales)
+
+    kf = KalmanLotes.constante(args.senales)
+    t_lotes = 0.0
+    ultimo_bucle = []
+    for Z in mediciones(args.senales, args.pasos):
+        inicio = time.perf_counter()
+        for z in Z:
+            kf.actualizar(z)
+        t_lotes += time.perf_counter() - inicio
+        ultimo_bucle.append(Z[:, :senales_bucle, 0])
+
+    # El bucle del cuaderno sobre el subconjunto de señales
+    Z_bucle = np.concatenate(ultimo_bucle)
+    inicio = time.perf_counter()
+    finales = [filtrar_bucle(Z_bucle[:, i].tolist())[-1] for i in range(senales_bucle)]
+    t_bucle = (time.perf_counter() - inicio) * args.senales / senales_bucle
+
+    error = np.abs(kf.x[:senales_bucle, 0] - np.array(finales)).max()
+    pasos_s = args.senales * args.pasos
+    print(f"  Bucle de Python:  {t_bucle:9.2f} s  ({pasos_s / t_bucle / 1e6:7.2f} M actualizaciones/s)"
+          + ("" if args.bucle_completo else f"  [extrapolado desde {senales_bucle} señales]"))
+    print(f"  KalmanLotes:      {t_lotes:9.2f} s  ({pasos_s / t_lotes / 1e6:7.2f} M actualizaciones/s)")
+    print(f"  Aceleración: {t_bucle / t_lotes:.0f}x | diferencia máxima con el bucle: {error:.2e}")
+
+
+def trayectorias(senales, pasos, dim=2, ruido=2.0, semilla=1):
+    """
+    Puntos a velocidad constante y sus mediciones ruidosas, ambos (pasos, señales, dim)
+    """
+    rng = np.random.default_rng(semilla)
+    inicio = rng.uniform(0, 500, (senales, dim))
+    velocidad = rng.normal(0, 1, (senales, dim))
+    verdad = inicio + np.arange(1, pasos + 1)[:, None, None] * velocidad
+    return verdad, verdad + rng.normal(0, ruido, verdad.shape)
+
+
+def medir_velocidad_constante(args):
+    senales, pasos = args.senales, min(args.pasos, args.pasos_cv)
+    print(f"\nVelocidad constante 2D: {senales} señales x {pasos} pasos")
+    senales_bucle = min(args.senales_bucle, senales)
+    verdad, Z = trayectorias(senales, pasos)
+
+    kf = KalmanLotes.velocidad_constante(senales, dim=2, x0=Z[0])
+    inicio = time.perf_counter()
+    filtrado = kf.filtrar(Z)
+    t_lotes = time.perf_counter() - inicio
+
+    referencia = KalmanLotes.velocidad_constante(senales_bucle, dim=2, x0=Z[0, :senales_bucle])
+    inicio = time.perf_counter()
+    salida_bucle = bucle_velocidad_constante(Z[:, :senales_bucle], referencia)
+    t_bucle = (time.perf_counter() - inicio) * senales / senales_bucle
+    error = np.abs(filtrado[:, :senales_bucle] - salida_bucle).max()
+    del salida_bucle
+
+    suave = KalmanLotes.velocidad_constante(senales, dim=2, x0=Z[0])
+    inicio = time.perf_counter()
+    suavizado = suave.suavizar_rts(Z)
+    t_rts = time.perf_counter() - inicio
+
+    print(f"  Bucle por señal:   {t_bucle:8.2f} s  [extrapolado desde {senales_bucle} señales]")
+    print(f"  KalmanLotes:       {t_lotes:8.2f} s  ({t_bucle / t_lotes:.0f}x) | "
+          f"diferencia máxima: {error:.2e}")
+    print(f"  Filtro + RTS:      {t_rts:8.2f} s")
+    for nombre, est in (("medición", Z), ("filtrado", filtrado[..., :2]), ("RTS", suavizado[..., :2])):
+        rmse = np.sqrt(((est - verdad) ** 2).mean())
+        print(f"  RMSE de posición ({nombre}): {rmse:.3f}")
+
+
+def medir_faltantes(args, fraccion=0.1):
+    """
+    Mediciones faltantes marcadas con NaN en Z y False en la máscara: el filtro y el
+    suavizador deben dar lo mismo que con cualquier otro relleno y ningún estado NaN
+    """
+    senales, pasos = min(args.senales, 1000), min(args.pasos, args.pasos_cv)
+    print(f"\nMediciones faltantes ({fraccion:.0%}): {senales} señales x {pasos} pasos")
+    verdad, Z = trayectorias(senales, pasos)
+    mascara = np.random.default_rng(2).random((pasos, senales)) > fraccion
+    mascara[0] = True
+    Z_nan = np.where(mascara[..., None], Z, np.nan)
+    Z_cero = np.where(mascara[..., None], Z, 0.0)
+
+    resultados = {}
+    for nombre, Zr in (("NaN", Z_nan), ("cero", Z_cero)):
+        filtrado = KalmanLotes.velocidad_constante(senales, dim=2, x0=Z[0]).filtrar(Zr, mascara)
+        suavizado = KalmanLotes.velocidad_constante(senales, dim=2, x0=Z[0]).suavizar_rts(Zr, mascara)
+        resultados[nombre] = (filtrado, suavizado)
+    filtrado, suavizado = resultados["NaN"]
+    assert np.isfinite(filtrado).all() and np.isfinite(suavizado).all(), "estado NaN con mediciones faltantes"
+    assert all(np.array_equal(a, b) for a, b in zip(resultados["NaN"], resultados["cero"]))
+    for nombre, est in (("filtrado", filtrado[..., :2]), ("RTS", suavizado[..., :2])):
+        rmse = np.sqrt(((est - verdad) ** 2).mean())
+        print(f"  RMSE de posición ({nombre}): {rmse:.3f} | igual con relleno NaN o cero")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del filtro de Kalman por lotes")
+    parser.add_argument("--senales", type=int, default=10000)
+    parser.add_argument("--pasos", type=int, default=10000)
+    parser.add_argument("--senales-bucle", type=int, default=20,
+                        help="Señales que recorre el bucle de referencia (se extrapola al total)")
+    parser.add_argument("--bucle-completo", action="store_true",
+                        help="Ejecutar el bucle escalar sobre todas las señales")
+    parser.add_argument("--pasos-cv", type=int, default=300,
+                        help="Pasos del modelo de velocidad constante (guarda la secuencia completa)")
+    args = parser.parse_args()
+
+    medir_escalar(args)
+    medir_velocidad_constante(args)
+    medir_faltantes(args)
+
+
+if __name__ == "__main__":
+    main()
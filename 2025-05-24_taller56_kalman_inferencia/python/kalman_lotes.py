@@ -0,0 +1,179 @@
+"""
+Filtro de Kalman por lotes para miles de señales independientes
+Generaliza el filtro escalar de kalman_filter.ipynb: el estado de todas las
+señales vive en un arreglo (señales, dim) y cada paso es una operación NumPy
+sobre el lote completo en lugar de un bucle de Python por señal y por medición.
+
+Si todas las señales comparten modelo y se miden en los mismos pasos, su
+covarianza P es idéntica: se guarda una sola (dim, dim) y la ganancia se calcula
+una vez por paso. Con mediciones faltantes (máscara) cada señal pasa a tener su
+propia covarianza (señales, dim, dim)
+"""
+
+import numpy as np
+
+
+class KalmanLotes:
+    def __init__(self, F, H, Q, R, x0, P0, dtype=np.float64):
+        """
+        F: (n, n) transición | H: (m, n) observación | Q: (n, n) | R: (m, m)
+        x0: (señales, n) estado inicial | P0: (n, n) covarianza inicial común
+        """
+        self.F = np.asarray(F, dtype)
+        self.H = np.asarray(H, dtype)
+        self.Q = np.asarray(Q, dtype)
+        self.R = np.asarray(R, dtype)
+        self.x = np.array(x0, dtype=dtype)
+        self.P = np.array(P0, dtype=dtype)
+        self.dtype = dtype
+
+    @classmethod
+    def constante(cls, num_senales, q=0.001, r=4.0, x0=0.0, p0=1.0, dtype=np.float64):
+        """
+        Modelo escalar del cuaderno: x_k = x_{k-1} + ruido
+        """
+        x = np.full((num_senales, 1), x0, dtype=dtype)
+        return cls([[1.0]], [[1.0]], [[q]], [[r]], x, [[p0]], dtype)
+
+    @classmethod
+    def velocidad_constante(cls, num_senales, dim=2, dt=1.0, q=1e-2, r=4.0, x0=None, p0=100.0,
+                            dtype=np.float64):
+        """
+        Posición y velocidad en 'dim' dimensiones (2D para puntos y cajas, 3D para landmarks)
+        Estado: [p_1..p_dim, v_1..v_dim]; se mide solo la posición
+        q: intensidad de la aceleración aleatoria | r: varianza de la medición
+        x0: posiciones iniciales (señales, dim); la velocidad inicial es cero
+        """
+        I = np.eye(dim)
+        Z = np.zeros((dim, dim))
+        F = np.block([[I, dt * I], [Z, I]])
+        H = np.hstack((I, Z))
+        Q = q * np.block([[dt ** 4 / 4 * I, dt ** 3 / 2 * I], [dt ** 3 / 2 * I, dt ** 2 * I]])
+        x = np.zeros((num_senales, 2 * dim), dtype=dtype)
+        if x0 is not None:
+            x[:, :dim] = x0
+        return cls(F, H, Q, r * I, x, p0 * np.eye(2 * dim), dtype)
+
+    @property
+    def compartida(self):
+        return self.P.ndim == 2
+
+    def predecir(self):
+        self.x = self.x @ self.F.T
+        # Con una covarianza por señal (señales, n, n) matmul difunde F sobre el lote
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.x
+
+    def _ganancia_compartida(self):
+        """
+        Ganancia común K = P H' S^-1 y covarianza corregida (solo matrices n x n)
+        """
+        S = self.H @ self.P @ self.H.T + self.R
+        K = np.linalg.solve(S, self.H @ self.P).T  # S es simétrica
+        self.P = self.P - K @ self.H @ self.P
+        return K
+
+    def corregir(self, z, mascara=None):
+        """
+        z: (señales, m) mediciones | mascara: (señales,) True donde hay medición
+        """
+        z = np.asarray(z, dtype=self.dtype).reshape(len(self.x), -1)
+        if mascara is not None and not np.all(mascara):
+            if self.compartida:
+                # Las covarianzas dejan de ser iguales: una por señal desde aquí
+                self.P = np.repeat(self.P[None], len(self.x), axis=0)
+            mascara = np.asarray(mascara, bool)
+        else:
+            mascara = None
+
+        residuo = z - self.x @ self.H.T
+        if mascara is not None:
+            # El valor de relleno de una medición faltante (NaN, por ejemplo) no debe
+            # llegar al estado: 0 * NaN sigue siendo NaN aunque la ganancia sea cero
+            residuo = np.where(mascara[:, None], residuo, 0.0)
+        if self.compartida:
+            K = self._ganancia_compartida()
+            self.x += residuo @ K.T
+            return self.x
+
+        PHt = self.P @ self.H.T
+        S = self.H @ PHt + self.R
+        K = PHt @ np.linalg.inv(S)
+        if mascara is not None:
+            # Sin medición: ganancia cero, el estado queda con la predicción
+            K *= mascara[:, None, None]
+        self.x += (K @ residuo[:, :, None])[:, :, 0]
+        self.P = self.P - K @ self.H @ self.P
+        return self.x
+
+    def actualizar(self, z, mascara=None):
+        """
+        Paso en línea: predicción + corrección con el lote de mediciones del instante
+        Devuelve el estado filtrado (señales, n)
+        """
+        if not self.compartida or (mascara is not None and not np.all(mascara)):
+            self.predecir()
+            return self.corregir(z, mascara)
+
+        # Covarianza común: x = (I - K H) F x + K z recorre el lote una vez
+        # en lugar de predecir, calcular el residuo y corregir por separado
+        z = np.asarray(z, dtype=self.dtype).reshape(len(self.x), -1)
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        K = self._ganancia_compartida()
+        self.x = self.x @ ((np.eye(len(self.F)) - K @ self.H) @ self.F).T
+        self.x += z @ K.T
+        return self.x
+
+    def filtrar(self, Z, mascara=None):
+        """
+        Filtra una secuencia completa Z (pasos, señales, m); devuelve (pasos, señales, n)
+        """
+        salida = np.empty((len(Z),) + self.x.shape, dtype=self.dtype)
+        for t in range(len(Z)):
+            salida[t] = self.actualizar(Z[t], None if mascara is None else mascara[t])
+        return salida
+
+    def suavizar_rts(self, Z, mascara=None):
+        """
+        Suavizador Rauch-Tung-Striebel para datos fuera de línea
+        Filtra Z (pasos, señales, m) desde el estado actual y recorre la secuencia
+        hacia atrás; devuelve los estados suavizados (pasos, señales, n)
+        """
+        pasos = len(Z)
+        x_filtrado = np.empty((pasos,) + self.x.shape, dtype=self.dtype)
+        x_predicho = np.empty_like(x_filtrado)
+        P_filtrado = []
+        P_predicho = []
+        for t in range(pasos):
+            x_predicho[t] = self.predecir()
+            P_predicho.append(self.P)
+            x_filtrado[t] = self.corregir(Z[t], None if mascara is None else mascara[t])
+            P_filtrado.append(self.P)
+
+        suavizado = x_filtrado
+        for t in range(pasos - 2, -1, -1):
+            # Ganancia del suavizador C = P_t F' (P_{t+1|t})^-1
+            Pf, Pp = P_filtrado[t], P_predicho[t + 1]
+            if Pp.ndim == 2:
+                C = np.linalg.solve(Pp, self.F @ Pf).T
+                suavizado[t] += (suavizado[t + 1] - x_predicho[t + 1]) @ C.T
+            else:
+                C = np.swapaxes(np.linalg.solve(Pp, self.F @ Pf), 1, 2)
+                diferencia = suavizado[t + 1] - x_predicho[t + 1]
+                suavizado[t] += (C @ diferencia[:, :, None])[:, :, 0]
+        return suavizado
+
+
+def filtrar_bucle(observed, Q=0.001, R=4.0, P=1.0, x_hat=0.0):
+    """
+    Filtro escalar del cuaderno, medición por medición (referencia para comparar)
+    """
+    estimate = []
+    for z in observed:
+        x_hat_prior = x_hat
+        P_prior = P + Q
+        K = P_prior / (P_prior + R)
+        x_hat = x_hat_prior + K * (z - x_hat_prior)
+        P = (1 - K) * P_prior
+        estimate.append(x_hat)
+    return estimate
@@ -1,13 +1,13 @@
 import cv2
 from ultralytics import YOLO
-import socket, json
+
+from telemetria import EmisorTelemetria
 
 # 1. Carga modelo YOLO
 model = YOLO('yolov8n.pt')
 
-# 2. Configura socket UDP destino
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-server_address = ('localhost', 10000)
+# 2. Configura emisor UDP binario (ver telemetria.py)
+emisor = EmisorTelemetria(('localhost', 10000))
 
 # 3. Abre cámara
 cap = cv2.VideoCapture(0)
@@ -17,16 +17,16 @@ while True:
     if not ret: break
 
     # 4. Detección
-    results = model(frame)
-    detections = len(results.pandas().xywh)
+    results = model(frame, verbose=False)
+    detections = len(results[0].boxes)
 
-    # 5. Envío JSON
-    msg = json.dumps({'detections': detections})
-    sock.sendto(msg.encode(), server_address)
+    # 5. Envío binario (secuencia + instante + detecciones)
+    emisor.enviar(detections)
 
     # 6. Muestra video
     cv2.imshow('Video', frame)
     if cv2.waitKey(1) & 0xFF == ord('q'): break
 
+emisor.cerrar()
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,136 @@
+"""
+Prueba local del puente de telemetría sin cámara ni React
+Levanta un servidor socket.io sustituto, el receptor de socket_server.py y un
+emisor sintético; reporta pérdida de paquetes, latencia y emisiones coalescidas.
+Antes comprueba sin red el conteo de secuencias: hueco, paquete tardío y reinicio
+del emisor
+Uso: python prueba_telemetria.py [--paquetes 3000] [--hz 120] [--perdida 0.02] [--sin-socketio]
+"""
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+from telemetria import EmisorTelemetria, ReceptorTelemetria, empaquetar
+
+PUERTO_UDP = 10001
+PUERTO_SOCKETIO = 4001
+
+
+async def iniciar_servidor_sustituto(recibidos):
+    """
+    Servidor socket.io mínimo que guarda cada evento 'data' con su instante de llegada
+    """
+    import socketio
+    from aiohttp import web
+
+    sio = socketio.AsyncServer(async_mode="aiohttp")
+    app = web.Application()
+    sio.attach(app)
+
+    @sio.on("data")
+    async def data(sid, datos):
+        recibidos.append((time.time(), datos))
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "localhost", PUERTO_SOCKETIO).start()
+    return runner
+
+
+def emitir_sintetico(paquetes, hz, perdida, registros_por_paquete):
+    """
+    Envía paquetes a ritmo fijo; 'perdida' descarta registros a propósito
+    """
+    emisor = EmisorTelemetria(("localhost", PUERTO_UDP), registros_por_paquete)
+    periodo = 1.0 / hz
+    siguiente = time.perf_counter()
+    for i in range(paquetes):
+        if random.random() < perdida:
+            emisor.secuencia += 1  # Registro que nunca llega
+        else:
+            emisor.enviar(i % 10)
+        siguiente += periodo
+        espera = siguiente - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+    emisor.cerrar()
+
+
+def comprobar_secuencias():
+    """
+    Secuencias 4997, 4999 (hueco), 4998 (tardío), 5000 y el emisor reiniciado en 0, 1, 2:
+    el tardío se descuenta de los perdidos y tras el reinicio el estado vuelve a avanzar
+    """
+    receptor = ReceptorTelemetria(lambda evento, datos: None)
+    t = time.time()
+    for i, seq in enumerate((4997, 4999, 4998, 5000, 0, 1, 2)):
+        receptor.procesar_datagrama(empaquetar([(seq, t + 0.01 * i, seq % 7)]))
+    s = receptor.estadisticas()
+    assert receptor.ultimo["seq"] == 2 and receptor.ultimo["detections"] == 2, receptor.ultimo
+    assert receptor.esperada == 3, receptor.esperada
+    assert (s["recibidos"], s["perdidos"], s["desordenados"], s["reinicios"]) == (7, 0, 1, 1), s
+
+    # Un duplicado viejo después del reinicio sigue siendo tardío, no otro reinicio
+    receptor.procesar_datagrama(empaquetar([(4990, t - 1.0, 0)]))
+    s = receptor.estadisticas()
+    assert receptor.ultimo["seq"] == 2 and (s["desordenados"], s["reinicios"]) == (2, 1), s
+    print("Secuencias: hueco, tardío y reinicio del emisor contados correctamente")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--paquetes", type=int, default=3000)
+    parser.add_argument("--hz", type=float, default=120.0, help="Ritmo del emisor")
+    parser.add_argument("--tasa", type=float, default=15.0, help="Emisiones por segundo hacia socket.io")
+    parser.add_argument("--perdida", type=float, default=0.0, help="Fracción de registros descartados a propósito")
+    parser.add_argument("--registros", type=int, default=1, help="Registros por datagrama")
+    parser.add_argument("--sin-socketio", action="store_true", help="Usar un emisor en memoria")
+    args = parser.parse_args()
+
+    comprobar_secuencias()
+    recibidos = []
+    runner = sio = None
+    if args.sin_socketio:
+        def emitir(evento, datos):
+            recibidos.append((time.time(), datos))
+    else:
+        import socketio
+        runner = await iniciar_servidor_sustituto(recibidos)
+        sio = socketio.AsyncClient()
+        await sio.connect(f"http://localhost:{PUERTO_SOCKETIO}")
+        emitir = sio.emit
+
+    receptor = ReceptorTelemetria(emitir, tasa_hz=args.tasa)
+    transporte = await receptor.escuchar(("localhost", PUERTO_UDP))
+    tarea = asyncio.create_task(receptor.bucle_emision())
+
+    hilo = threading.Thread(target=emitir_sintetico,
+                            args=(args.paquetes, args.hz, args.perdida, args.registros))
+    hilo.start()
+    while hilo.is_alive():
+        await asyncio.sleep(0.1)
+    await asyncio.sleep(2.0 / args.tasa + 0.2)
+
+    tarea.cancel()
+    transporte.close()
+    if sio is not None:
+        await sio.disconnect()
+        await runner.cleanup()
+
+    s = receptor.estadisticas()
+    latencias = [t - datos["t"] for t, datos in recibidos]
+    print(f"Registros recibidos: {s['recibidos']} | perdidos: {s['perdidos']} ({s['perdida_pct']:.2f}%) "
+          f"| desordenados: {s['desordenados']}")
+    print(f"Latencia UDP: media {s['latencia_media_ms']:.3f} ms, máx {s['latencia_max_ms']:.3f} ms")
+    print(f"Eventos que llegaron al servidor socket.io: {len(recibidos)} "
+          f"(de {s['recibidos']} registros, tasa {args.tasa} Hz)")
+    if latencias:
+        print(f"Latencia extremo a extremo (incluye espera de coalescencia): "
+              f"media {1000 * sum(latencias) / len(latencias):.2f} ms, máx {1000 * max(latencias):.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
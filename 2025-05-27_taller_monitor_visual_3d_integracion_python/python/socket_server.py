@@ -1,15 +1,35 @@
-import socket, json
+import asyncio
 import socketio
 
-sio = socketio.Client()
-sio.connect('http://localhost:4000')   # servidor React
+from telemetria import ReceptorTelemetria
 
-# Socket UDP receptor
-sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-sock.bind(('localhost', 10000))
+SERVIDOR_REACT = 'http://localhost:4000'   # servidor React
+DIRECCION_UDP = ('localhost', 10000)       # Socket UDP receptor
+TASA_HZ = 15                               # Emisiones por segundo hacia los clientes
 
-while True:
-    data, _ = sock.recvfrom(4096)
-    d = json.loads(data.decode())
-    print("Detectados:", d['detections'])
-    sio.emit('data', d)
+
+async def reportar(receptor, intervalo=5.0):
+    # Pérdida de paquetes y latencia extremo a extremo cada pocos segundos
+    while True:
+        await asyncio.sleep(intervalo)
+        s = receptor.estadisticas()
+        print(f"Recibidos: {s['recibidos']} | Perdidos: {s['perdidos']} ({s['perdida_pct']:.1f}%) "
+              f"| Emitidos: {s['emitidos']} | Latencia: {s['latencia_media_ms']:.2f} ms "
+              f"(máx {s['latencia_max_ms']:.2f} ms)")
+
+
+async def main():
+    sio = socketio.AsyncClient()
+    await sio.connect(SERVIDOR_REACT)
+
+    receptor = ReceptorTelemetria(sio.emit, tasa_hz=TASA_HZ)
+    transporte = await receptor.escuchar(DIRECCION_UDP)
+    try:
+        await asyncio.gather(receptor.bucle_emision(), reportar(receptor))
+    finally:
+        transporte.close()
+        await sio.disconnect()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,223 @@
+"""
+Telemetría binaria entre detect_objects.py y socket_server.py
+Cada datagrama UDP lleva una cabecera fija y uno o más registros empaquetados con
+struct (número de secuencia, instante de envío y número de detecciones).
+El receptor usa asyncio, mide pérdidas y latencia y reenvía a socket.io solo el
+último estado, a una tasa configurable
+"""
+
+import asyncio
+import collections
+import socket
+import struct
+import time
+
+# Cabecera: firma, versión, número de registros
+CABECERA = struct.Struct("<2sBB")
+# Registro: secuencia, instante de envío (time.time()), detecciones
+REGISTRO = struct.Struct("<IdH")
+FIRMA = b"MV"
+VERSION = 1
+MAX_REGISTROS = 255
+
+
+def empaquetar(registros):
+    """
+    Codifica una lista de (secuencia, instante, detecciones) en un datagrama
+    """
+    partes = [CABECERA.pack(FIRMA, VERSION, len(registros))]
+    partes.extend(REGISTRO.pack(seq, t, min(det, 0xFFFF)) for seq, t, det in registros)
+    return b"".join(partes)
+
+
+def desempaquetar(datos):
+    """
+    Decodifica un datagrama; devuelve la lista de registros o [] si no es válido
+    """
+    if len(datos) < CABECERA.size:
+        return []
+    firma, version, cantidad = CABECERA.unpack_from(datos)
+    if firma != FIRMA or version != VERSION:
+        return []
+    if len(datos) != CABECERA.size + cantidad * REGISTRO.size:
+        return []
+    return [REGISTRO.unpack_from(datos, CABECERA.size + i * REGISTRO.size) for i in range(cantidad)]
+
+
+class EmisorTelemetria:
+    def __init__(self, destino=("localhost", 10000), registros_por_paquete=1):
+        """
+        Envía registros de detección por UDP
+        registros_por_paquete: registros que se acumulan antes de enviar un datagrama
+        """
+        self.destino = destino
+        self.registros_por_paquete = min(registros_por_paquete, MAX_REGISTROS)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.secuencia = 0
+        self.pendientes = []
+
+    def enviar(self, detecciones):
+        """
+        Registra el número de detecciones del fotograma actual
+        """
+        self.pendientes.append((self.secuencia, time.time(), int(detecciones)))
+        self.secuencia = (self.secuencia + 1) & 0xFFFFFFFF
+        if len(self.pendientes) >= self.registros_por_paquete:
+            self.vaciar()
+
+    def vaciar(self):
+        if self.pendientes:
+            self.sock.sendto(empaquetar(self.pendientes), self.destino)
+            self.pendientes = []
+
+    def cerrar(self):
+        self.vaciar()
+        self.sock.close()
+
+
+class _ProtocoloUDP(asyncio.DatagramProtocol):
+    def __init__(self, receptor):
+        self.receptor = receptor
+
+    def datagram_received(self, data, addr):
+        self.receptor.procesar_datagrama(data)
+
+
+class ReceptorTelemetria:
+    def __init__(self, emitir, tasa_hz=15.0, evento="data", ventana_perdidos=1024, ventana_reorden=64):
+        """
+        Recibe la telemetría y la reenvía agrupada
+        emitir: función o corrutina (evento, datos), por ejemplo sio.emit de socketio.AsyncClient
+        tasa_hz: máximo de emisiones por segundo hacia los clientes
+        ventana_perdidos: secuencias hacia atrás en las que un paquete que llega tarde
+        todavía se descuenta de los perdidos
+        ventana_reorden: un salto hacia atrás mayor, con un instante de envío que no es
+        anterior al del último estado, es un reinicio del emisor y no un paquete tardío;
+        un salto hacia adelante mayor con un instante anterior es un resto de antes del
+        reinicio
+        """
+        self.emitir = emitir
+        self.periodo = 1.0 / tasa_hz
+        self.evento = evento
+
+        self.ultimo = None
+        self.hay_nuevo = False
+        self.esperada = None
+
+        # Secuencias contadas como perdidas dentro de la ventana (en orden de llegada)
+        self.ventana_perdidos = ventana_perdidos
+        self.ventana_reorden = ventana_reorden
+        self.faltantes = set()
+        self.orden_faltantes = collections.deque()
+
+        # Estadísticas
+        self.recibidos = 0
+        self.perdidos = 0
+        self.desordenados = 0
+        self.reinicios = 0
+        self.paquetes_invalidos = 0
+        self.emitidos = 0
+        self.latencia_total = 0.0
+        self.latencia_max = 0.0
+
+    def procesar_datagrama(self, datos):
+        t_llegada = time.time()
+        registros = desempaquetar(datos)
+        if not registros:
+            self.paquetes_invalidos += 1
+            return
+
+        for seq, t_envio, detecciones in registros:
+            if self.esperada is not None:
+                salto = (seq - self.esperada) & 0xFFFFFFFF
+                if salto >= 0x80000000 and self._es_reinicio(seq, t_envio):
+                    # El emisor volvió a empezar: se retoma desde esta secuencia
+                    self.reinicios += 1
+                    self.faltantes.clear()
+                    self.orden_faltantes.clear()
+                    salto = 0
+                elif self.ventana_reorden < salto < 0x80000000 and t_envio < self.ultimo["t"]:
+                    # Adelante en la secuencia pero más viejo que el estado: quedó en
+                    # camino de antes de un reinicio del emisor
+                    self.desordenados += 1
+                    continue
+                if salto >= 0x80000000:
+                    # Llegó tarde o duplicado: se cuenta pero no reemplaza el estado
+                    self.desordenados += 1
+                    if seq not in self.faltantes:
+                        continue
+                    # Ya se había contado como perdido al ver el hueco
+                    self.faltantes.discard(seq)
+                    self.perdidos -= 1
+                    self._sumar_latencia(t_llegada - t_envio)
+                    continue
+                self.perdidos += salto
+                self._marcar_faltantes(seq, salto)
+            self.esperada = (seq + 1) & 0xFFFFFFFF
+
+            self._sumar_latencia(t_llegada - t_envio)
+            self.ultimo = {"detections": detecciones, "seq": seq, "t": t_envio}
+            self.hay_nuevo = True
+
+    def _es_reinicio(self, seq, t_envio):
+        """
+        Un paquete tardío es anterior al último estado y está cerca de la secuencia
+        esperada; si salta muy atrás y no es más viejo que el estado, el emisor se reinició
+        """
+        atras = (self.esperada - seq) & 0xFFFFFFFF
+        return atras > self.ventana_reorden and t_envio >= self.ultimo["t"]
+
+    def _sumar_latencia(self, latencia):
+        self.recibidos += 1
+        self.latencia_total += latencia
+        self.latencia_max = max(self.latencia_max, latencia)
+
+    def _marcar_faltantes(self, seq, salto):
+        """
+        Recuerda las secuencias del hueco antes de 'seq' (solo las de la ventana) y
+        olvida las que ya quedaron fuera de ella
+        """
+        for i in range(min(salto, self.ventana_perdidos), 0, -1):
+            faltante = (seq - i) & 0xFFFFFFFF
+            self.faltantes.add(faltante)
+            self.orden_faltantes.append(faltante)
+        while self.orden_faltantes and (seq - self.orden_faltantes[0]) & 0xFFFFFFFF > self.ventana_perdidos:
+            self.faltantes.discard(self.orden_faltantes.popleft())
+
+    async def escuchar(self, direccion=("localhost", 10000)):
+        """
+        Abre el socket UDP; devuelve el transporte para poder cerrarlo
+        """
+        loop = asyncio.get_running_loop()
+        transporte, _ = await loop.create_datagram_endpoint(
+            lambda: _ProtocoloUDP(self), local_addr=direccion)
+        return transporte
+
+    async def bucle_emision(self):
+        """
+        Emite el último estado como máximo tasa_hz veces por segundo
+        Mientras una emisión está en curso los paquetes nuevos solo actualizan el estado
+        """
+        while True:
+            inicio = time.perf_counter()
+            if self.hay_nuevo:
+                self.hay_nuevo = False
+                resultado = self.emitir(self.evento, self.ultimo)
+                if asyncio.iscoroutine(resultado):
+                    await resultado
+                self.emitidos += 1
+            await asyncio.sleep(max(0.0, self.periodo - (time.perf_counter() - inicio)))
+
+    def estadisticas(self):
+        total = self.recibidos + self.perdidos
+        return {
+            "recibidos": self.recibidos,
+            "perdidos": self.perdidos,
+            "perdida_pct": 100.0 * self.perdidos / total if total else 0.0,
+            "desordenados": self.desordenados,
+            "reinicios": self.reinicios,
+            "invalidos": self.paquetes_invalidos,
+            "emitidos": self.emitidos,
+            "latencia_media_ms": 1000.0 * self.latencia_total / self.recibidos if self.recibidos else 0.0,
+            "latencia_max_ms": 1000.0 * self.latencia_max,
+        }
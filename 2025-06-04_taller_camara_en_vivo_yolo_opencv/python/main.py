@@ -12,8 +12,38 @@ from ultralytics import YOLO
 # Carga el modelo
 model = YOLO("yolov8n.pt") 
 
-def aplicar_filtros(frame, opc):
-    """Aplica el filtro elegido al frame."""
+
+class CacheInferencia:
+    """Resultado de YOLO por fotograma: se calcula la primera vez que alguien lo pide
+    y los demás consumidores del mismo fotograma lo reutilizan."""
+
+    def __init__(self, model):
+        self.model = model
+        self.frame_id = None
+        self.frame = None
+        self.resultado = None
+        self.fotogramas = 0
+        self.solicitudes = 0
+        self.inferencias = 0
+
+    def nuevo_fotograma(self, frame_id, frame):
+        """Registra el fotograma actual sin ejecutar el modelo."""
+        self.frame_id = frame_id
+        self.frame = frame
+        self.resultado = None
+        self.fotogramas += 1
+
+    def detecciones(self):
+        """Devuelve las detecciones del fotograma actual (como máximo una inferencia por fotograma)."""
+        self.solicitudes += 1
+        if self.resultado is None or self.resultado[0] != self.frame_id:
+            self.resultado = (self.frame_id, self.model(self.frame)[0])
+            self.inferencias += 1
+        return self.resultado[1]
+
+
+def aplicar_filtros(frame, opc, cache):
+    """Aplica el filtro elegido al frame. Solo el filtro dinámico pide detecciones a la caché."""
     if opc == 0:
         return frame.copy()
     elif opc == 1:
@@ -25,8 +55,7 @@ def aplicar_filtros(frame, opc):
         return cv2.Canny(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), 100, 200)
     elif opc == 4:
         # Filtro dinámico: Canny si detectamos alguien
-        resultados = model(frame)
-        detections = resultados[0]
+        detections = cache.detecciones()
         classes = detections.boxes.cls
         person_count = (classes == 0).sum()
         if person_count > 0:
@@ -48,7 +77,10 @@ def nombre_filtro(opc):
 
 # Loop principal
 filter_option = 0
+mostrar_deteccion = True  # d para activar/desactivar la ventana de detección
 running = True
+cache = CacheInferencia(model)
+frame_id = 0
 
 # Capture de video
 cap = cv2.VideoCapture(0)
@@ -62,19 +94,25 @@ while running:
     if not ret:
         print("Error: no se pudo leer el fotograma.")
         break
+    frame_id += 1
+    cache.nuevo_fotograma(frame_id, frame)
     
     # Aplicar filtro
-    filtro = aplicar_filtros(frame.copy(), filter_option)
+    filtro = aplicar_filtros(frame, filter_option, cache)
 
-    # Realizar detección de objetos
-    resultados = model(frame)
-    detections = resultados[0]
-    deteccion = detections.plot()
+    if mostrar_deteccion:
+        # Realizar detección de objetos (reutiliza la del filtro dinámico si ya se hizo)
+        detections = cache.detecciones()
+        deteccion = detections.plot()
 
-    # Contar personas u objetos
-    classes = detections.boxes.cls
-    person_count = (classes == 0).sum()
-    text = f'{person_count} Persona(s) detectada(s)'    
+        # Contar personas u objetos
+        classes = detections.boxes.cls
+        person_count = (classes == 0).sum()
+        text = f'{person_count} Persona(s) detectada(s)'    
+    else:
+        # Nadie necesita la detección: no se ejecuta el modelo
+        deteccion = frame.copy()
+        text = "Deteccion desactivada (d)"
 
     # Poner el nombre del filtro en pantalla
     cv2.putText(deteccion, f"Filtro actual: {nombre_filtro(filter_option)}",
@@ -106,6 +144,8 @@ while running:
         running = False
     elif key == ord('f'):  # f para cambiar de filtro
         filter_option = (filter_option + 1) % 5
+    elif key == ord('d'):  # d para activar/desactivar la detección
+        mostrar_deteccion = not mostrar_deteccion
     elif key == ord('s'):  # guardar captura
         cv2.imwrite("captura.jpg", deteccion)
         print("Captura guardada.")
@@ -113,4 +153,6 @@ while running:
 
 cap.release()
 cv2.destroyAllWindows()
+print(f"Fotogramas: {cache.fotogramas} | solicitudes de detección: {cache.solicitudes} "
+      f"| inferencias ejecutadas: {cache.inferencias}")
 
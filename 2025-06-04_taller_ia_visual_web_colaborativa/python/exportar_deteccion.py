@@ -1,62 +1,296 @@
-import cv2
-import mediapipe as mp
+"""
+Detección de rostros con MediaPipe exportada a JSON
+Sin argumentos procesa resultados/persona.jpg y escribe deteccion.png y deteccion.json.
+Con carpetas o patrones glob procesa lotes: un pool de procesos en el que cada uno
+crea su FaceDetection una sola vez, una línea JSON por imagen escrita apenas llega
+(JSON Lines) y un manifiesto con las imágenes ya hechas para poder reanudar.
+Las imágenes anotadas son opcionales (--sin-imagenes), porque codificarlas y
+escribirlas suele costar más que la detección
+Uso: python exportar_deteccion.py [carpeta | "patron/**/*.jpg" ...] [--salida resultados/deteccion.jsonl]
+     [--procesos N] [--sin-imagenes] [--imagenes resultados/anotadas]
+"""
+
+import argparse
+import glob
 import json
+import multiprocessing
 import os
+import time
 from datetime import datetime
 
+import cv2
+import mediapipe as mp
+
 # ⚠️ NUEVAS RUTAS INTERNAS
 input_image_path = 'resultados/persona.jpg'
 output_folder = 'resultados'
-os.makedirs(output_folder, exist_ok=True)
-
-image_path = os.path.join(output_folder, 'deteccion.png')
-json_path = os.path.join(output_folder, 'deteccion.json')
-
-# Leer imagen
-image = cv2.imread(input_image_path)
-if image is None:
-    print(f"❌ No se pudo cargar la imagen en '{input_image_path}'")
-    exit()
-
-# Inicializar MediaPipe
-mp_face = mp.solutions.face_detection
-face_detection = mp_face.FaceDetection(model_selection=0, min_detection_confidence=0.5)
-
-# Procesar detección
-rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-results = face_detection.process(rgb)
-
-# Datos a exportar
-export_data = {
-    "timestamp": datetime.now().isoformat(),
-    "objects": []
-}
-
-# Dibujar detecciones y recolectar datos
-if results.detections:
-    for detection in results.detections:
-        bbox = detection.location_data.relative_bounding_box
-        ih, iw, _ = image.shape
-        x = int(bbox.xmin * iw)
-        y = int(bbox.ymin * ih)
-        w = int(bbox.width * iw)
-        h = int(bbox.height * ih)
-        conf = float(detection.score[0])
 
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.bmp', '.webp')
+ETAPAS = ('lectura', 'inferencia', 'anotado')
+
+
+def crear_detector():
+    mp_face = mp.solutions.face_detection
+    return mp_face.FaceDetection(model_selection=0, min_detection_confidence=0.5)
+
+
+def detectar_rostros(face_detection, image):
+    """
+    Lista de objetos {"class", "confidence", "x", "y", "w", "h"} en píxeles
+    """
+    rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    results = face_detection.process(rgb)
+    objects = []
+    if results.detections:
+        ih, iw = image.shape[:2]
+        for detection in results.detections:
+            bbox = detection.location_data.relative_bounding_box
+            conf = float(detection.score[0])
+            objects.append({
+                "class": "face",
+                "confidence": round(conf, 2),
+                "x": int(bbox.xmin * iw),
+                "y": int(bbox.ymin * ih),
+                "w": int(bbox.width * iw),
+                "h": int(bbox.height * ih)
+            })
+    return objects
+
+
+def dibujar_rostros(image, objects):
+    for obj in objects:
+        x, y, w, h = obj["x"], obj["y"], obj["w"], obj["h"]
         cv2.rectangle(image, (x, y), (x + w, y + h), (0, 255, 0), 2)
+    return image
+
+
+def exportar_imagen():
+    """
+    Modo original: una imagen fija y un JSON con indentación para la página web
+    """
+    os.makedirs(output_folder, exist_ok=True)
+    image_path = os.path.join(output_folder, 'deteccion.png')
+    json_path = os.path.join(output_folder, 'deteccion.json')
+
+    image = cv2.imread(input_image_path)
+    if image is None:
+        print(f"❌ No se pudo cargar la imagen en '{input_image_path}'")
+        return
+
+    export_data = {
+        "timestamp": datetime.now().isoformat(),
+        "objects": detectar_rostros(crear_detector(), image)
+    }
+
+    cv2.imwrite(image_path, dibujar_rostros(image, export_data["objects"]))
+    with open(json_path, 'w') as f:
+        json.dump(export_data, f, indent=2)
+
+    print("✅ Detección completada. Resultados guardados en 'resultados/'")
+
+
+def _dentro_de(ruta, carpetas):
+    ruta = os.path.abspath(ruta)
+    return any(ruta == carpeta or ruta.startswith(carpeta + os.sep) for carpeta in carpetas)
+
+
+def _recorrer(carpeta, excluir):
+    for raiz, subcarpetas, nombres in os.walk(carpeta):
+        # Sin descender a las carpetas excluidas
+        subcarpetas[:] = [nombre for nombre in subcarpetas
+                          if not _dentro_de(os.path.join(raiz, nombre), excluir)]
+        for nombre in nombres:
+            yield os.path.join(raiz, nombre)
+
+
+def listar_imagenes(entradas, excluir=()):
+    """
+    Imágenes de las carpetas (recursivo) y patrones glob dados, ordenadas y sin repetir
+    excluir: carpetas que no se recorren, como la de las imágenes anotadas, que suele
+    quedar dentro de la entrada y en otra ejecución se tomaría por imágenes nuevas
+    """
+    excluir = [os.path.abspath(carpeta) for carpeta in excluir]
+    rutas = set()
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatas = _recorrer(entrada, excluir)
+        else:
+            candidatas = glob.glob(entrada, recursive=True)
+        rutas.update(os.path.normpath(ruta) for ruta in candidatas
+                     if ruta.lower().endswith(EXTENSIONES) and os.path.isfile(ruta)
+                     and not _dentro_de(ruta, excluir))
+    return sorted(rutas)
+
+
+def leer_manifiesto(ruta):
+    if not os.path.exists(ruta):
+        return set()
+    with open(ruta, encoding='utf-8') as f:
+        return {linea.rstrip('\n') for linea in f if linea.strip()}
+
+
+def abrir_para_anadir(ruta):
+    """
+    Abre en modo 'a' con búfer por línea; si una ejecución anterior se cortó a mitad de
+    línea, la termina para que la siguiente no quede pegada
+    """
+    carpeta = os.path.dirname(ruta)
+    if carpeta:
+        os.makedirs(carpeta, exist_ok=True)
+    incompleta = False
+    if os.path.exists(ruta) and os.path.getsize(ruta) > 0:
+        with open(ruta, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            incompleta = f.read(1) != b'\n'
+    f = open(ruta, 'a', encoding='utf-8', buffering=1)
+    if incompleta:
+        f.write('\n')
+    return f
+
+
+# Detector de cada proceso del pool: se crea una vez en el inicializador
+_detector = None
+
+
+def _iniciar_trabajador(un_hilo):
+    global _detector
+    if un_hilo:
+        # Con varios procesos, los hilos de OpenCV de cada uno solo compiten entre sí
+        cv2.setNumThreads(1)
+    _detector = crear_detector()
+
+
+def _procesar(tarea):
+    """
+    Lee, detecta y (si hay destino) anota una imagen en el proceso trabajador
+    Devuelve (ruta, línea JSON, rostros o None si falló, segundos por etapa); la línea
+    ya va serializada para que el proceso principal solo tenga que escribirla.
+    Un error en una imagen queda en su línea y no detiene el lote: al reanudar no se
+    repite, porque también entra en el manifiesto
+    """
+    ruta, destino = tarea
+    t0 = time.perf_counter()
+    image = cv2.imread(ruta)
+    t1 = time.perf_counter()
+    if image is None:
+        registro = {"archivo": ruta, "error": "no se pudo cargar la imagen"}
+        return ruta, json.dumps(registro, ensure_ascii=False), None, (t1 - t0, 0.0, 0.0)
+
+    try:
+        objects = detectar_rostros(_detector, image)
+        t2 = time.perf_counter()
+        if destino is not None:
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            cv2.imwrite(destino, dibujar_rostros(image, objects))
+    except Exception as e:
+        registro = {"archivo": ruta, "error": f"{type(e).__name__}: {e}"}
+        return ruta, json.dumps(registro, ensure_ascii=False), None, (t1 - t0, time.perf_counter() - t1, 0.0)
+    t3 = time.perf_counter()
+
+    registro = {
+        "archivo": ruta,
+        "timestamp": datetime.now().isoformat(),
+        "ancho": image.shape[1],
+        "alto": image.shape[0],
+        "objects": objects
+    }
+    return ruta, json.dumps(registro, ensure_ascii=False), len(objects), (t1 - t0, t2 - t1, t3 - t2)
+
+
+def exportar_lote(entradas, salida, manifiesto=None, procesos=None, imagenes=None, limite=None,
+                  cada=500):
+    """
+    Procesa todas las imágenes de 'entradas' que no estén en el manifiesto
+    salida: archivo JSON Lines (se añade al final); manifiesto: por defecto salida + '.manifiesto'
+    procesos: tamaño del pool (None = núcleos disponibles; 0 o 1 = en este proceso)
+    imagenes: carpeta para las imágenes anotadas (misma estructura que la entrada) o None
+    El manifiesto se escribe después de la línea JSON: si se corta justo entre ambas,
+    esa imagen se repite al reanudar (el campo "archivo" permite descartar duplicados)
+    """
+    manifiesto = manifiesto or salida + '.manifiesto'
+    rutas = listar_imagenes(entradas, excluir=() if imagenes is None else (imagenes,))
+    hechas = leer_manifiesto(manifiesto)
+    pendientes = [ruta for ruta in rutas if os.path.abspath(ruta) not in hechas]
+    print(f"{len(rutas)} imágenes | ya procesadas {len(rutas) - len(pendientes)} | pendientes {len(pendientes)}")
+    if limite is not None:
+        pendientes = pendientes[:limite]
+    if not pendientes:
+        return
+
+    raiz = os.path.commonpath([os.path.abspath(ruta) for ruta in rutas])
+    if len(rutas) == 1:
+        raiz = os.path.dirname(raiz)
+    tareas = [(ruta, None if imagenes is None else
+               os.path.join(imagenes, os.path.relpath(os.path.abspath(ruta), raiz)))
+              for ruta in pendientes]
+
+    procesos = os.cpu_count() if procesos is None else procesos
+    pool = None
+    if procesos > 1:
+        pool = multiprocessing.Pool(procesos, initializer=_iniciar_trabajador, initargs=(True,))
+        # Bloques pequeños: los resultados llegan en flujo y se reparte bien la carga
+        resultados = pool.imap_unordered(_procesar, tareas, chunksize=4)
+    else:
+        _iniciar_trabajador(False)
+        resultados = map(_procesar, tareas)
+
+    etapas = [0.0] * len(ETAPAS)
+    escritura = 0.0
+    hechas_ahora = errores = rostros = 0
+    inicio = time.perf_counter()
+    try:
+        with abrir_para_anadir(salida) as f_salida, abrir_para_anadir(manifiesto) as f_manifiesto:
+            for ruta, linea, encontrados, tiempos in resultados:
+                t = time.perf_counter()
+                f_salida.write(linea + '\n')
+                f_manifiesto.write(os.path.abspath(ruta) + '\n')
+                escritura += time.perf_counter() - t
+
+                for i, segundos in enumerate(tiempos):
+                    etapas[i] += segundos
+                hechas_ahora += 1
+                if encontrados is None:
+                    errores += 1
+                else:
+                    rostros += encontrados
+                if hechas_ahora % cada == 0:
+                    transcurrido = time.perf_counter() - inicio
+                    print(f"  {hechas_ahora}/{len(tareas)} | {hechas_ahora / transcurrido:.1f} imágenes/s")
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    total = time.perf_counter() - inicio
+    print(f"✅ {hechas_ahora} imágenes en {total:.1f} s: {hechas_ahora / total:.1f} imágenes/s "
+          f"con {max(procesos, 1)} proceso(s) | rostros {rostros} | errores {errores}")
+    # Tiempos de los trabajadores: suman los de todos los procesos (ms por imagen)
+    detalle = ' | '.join(f"{nombre} {1000 * segundos / hechas_ahora:.2f} ms"
+                         for nombre, segundos in zip(ETAPAS, etapas))
+    print(f"  Por imagen: {detalle} | escritura JSONL {1000 * escritura / hechas_ahora:.2f} ms")
+    print(f"  Resultados en '{salida}', manifiesto en '{manifiesto}'")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detección de rostros exportada a JSON")
+    parser.add_argument("entradas", nargs="*",
+                        help="Carpetas o patrones glob; sin entradas se procesa " + input_image_path)
+    parser.add_argument("--salida", default=os.path.join(output_folder, 'deteccion.jsonl'),
+                        help="Archivo JSON Lines de resultados")
+    parser.add_argument("--manifiesto", help="Imágenes ya procesadas (por defecto SALIDA.manifiesto)")
+    parser.add_argument("--procesos", type=int, help="Procesos del pool (por defecto, los núcleos)")
+    parser.add_argument("--imagenes", default=os.path.join(output_folder, 'anotadas'),
+                        help="Carpeta de las imágenes anotadas")
+    parser.add_argument("--sin-imagenes", action="store_true", help="No escribir imágenes anotadas")
+    parser.add_argument("--limite", type=int, help="Procesar como máximo N imágenes pendientes")
+    args = parser.parse_args()
+
+    if not args.entradas:
+        exportar_imagen()
+        return
+    exportar_lote(args.entradas, args.salida, args.manifiesto, args.procesos,
+                  None if args.sin_imagenes else args.imagenes, args.limite)
+
 
-        export_data["objects"].append({
-            "class": "face",
-            "confidence": round(conf, 2),
-            "x": x,
-            "y": y,
-            "w": w,
-            "h": h
-        })
-
-# Guardar resultados
-cv2.imwrite(image_path, image)
-with open(json_path, 'w') as f:
-    json.dump(export_data, f, indent=2)
-
-print("✅ Detección completada. Resultados guardados en 'resultados/'")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark de publicación de estado con un lector concurrente
+Mide escrituras por segundo y la fracción de lecturas rotas (JSON a medias)
+para: escritura directa (como generar_json.py original), escritura atómica y
+registro en memoria mapeada
+Uso: python benchmark_publicador.py [segundos]
+"""
+
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+from publicador_estado import LectorMemoria, PublicadorJSON, PublicadorMemoria
+
+
+def datos_frame(i):
+    # frame_width lleva el índice para poder verificar la coherencia del registro leído
+    return {"person_count": i % 7, "finger_count": i % 11, "frame_width": i, "frame_height": 480}
+
+
+def coherente(d):
+    return d["person_count"] == d["frame_width"] % 7 and d["finger_count"] == d["frame_width"] % 11
+
+
+def escribir_directo(ruta, datos):
+    """
+    Escritura original: abrir, truncar y volcar el JSON
+    """
+    with open(ruta, "w") as f:
+        json.dump(datos, f)
+
+
+def lector_json(ruta, detener, resultados):
+    lecturas = rotas = 0
+    while not detener.is_set():
+        try:
+            with open(ruta, "r") as f:
+                contenido = f.read()
+            if not coherente(json.loads(contenido)):
+                rotas += 1
+        except (json.JSONDecodeError, FileNotFoundError, PermissionError):
+            rotas += 1
+        lecturas += 1
+    resultados.put((lecturas, rotas))
+
+
+def lector_memoria(ruta, detener, resultados):
+    lector = LectorMemoria(ruta)
+    lecturas = rotas = 0
+    while not detener.is_set():
+        registro = lector.leer(max_intentos=1_000_000)
+        if registro is None or not coherente(registro[2]):
+            rotas += 1
+        lecturas += 1
+    resultados.put((lecturas, rotas, lector.reintentos))
+    lector.cerrar()
+
+
+def medir(nombre, escribir, ruta, lector, segundos):
+    ctx = mp.get_context("spawn")
+    detener = ctx.Event()
+    resultados = ctx.Queue()
+    proceso = ctx.Process(target=lector, args=(ruta, detener, resultados))
+    proceso.start()
+    time.sleep(0.5)  # Dejar que el lector arranque
+
+    escrituras = 0
+    inicio = time.perf_counter()
+    while time.perf_counter() - inicio < segundos:
+        escribir(datos_frame(escrituras))
+        escrituras += 1
+    duracion = time.perf_counter() - inicio
+
+    detener.set()
+    lecturas, rotas, *extra = resultados.get()
+    proceso.join()
+    texto = f"{nombre:<22} {escrituras / duracion:>10.0f} escrituras/s | " \
+            f"{lecturas} lecturas, {rotas} rotas ({100.0 * rotas / max(lecturas, 1):.3f}%)"
+    if extra:
+        texto += f" | {extra[0]} reintentos"
+    print(texto)
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    carpeta = tempfile.mkdtemp()
+    ruta_json = os.path.join(carpeta, "person_data.json")
+    ruta_mem = os.path.join(carpeta, "person_data.bin")
+
+    escribir_directo(ruta_json, datos_frame(0))
+    medir("Escritura directa", lambda d: escribir_directo(ruta_json, d), ruta_json, lector_json, segundos)
+
+    publicador = PublicadorJSON(ruta_json, hz_max=0)
+    medir("Escritura atómica", publicador.publicar, ruta_json, lector_json, segundos)
+
+    memoria = PublicadorMemoria(ruta_mem)
+    medir("Memoria mapeada", memoria.publicar, ruta_mem, lector_memoria, segundos)
+    memoria.cerrar()
+
+
+if __name__ == "__main__":
+    main()
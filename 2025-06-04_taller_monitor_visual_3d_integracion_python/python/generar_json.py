@@ -1,36 +1,33 @@
 # python/deteccion_completa.py
 import cv2
-import json
 import os
 import time
 import mediapipe as mp
 from ultralytics import YOLO
+from postprocesado import FiltroClases, datos_deteccion
+from publicador_estado import PublicadorJSON, PublicadorMemoria
+from rasgos_mano import calcular_rasgos, landmarks_a_arreglo
 
 # Ruta al archivo que Unity va a leer
 base_dir = os.path.dirname(__file__)  # Ruta de la carpeta actual (python/)
 unity_json_path = os.path.abspath(os.path.join(base_dir, "../unity/Assets/person_data.json"))
 
+# Escritura atómica, sin repetir contenido y como máximo 15 veces por segundo
+publicador = PublicadorJSON(unity_json_path, hz_max=15)
+
+# Alternativa sin E/S de archivos por lectura: registro fijo en memoria mapeada
+USAR_MEMORIA_COMPARTIDA = False
+publicador_memoria = None
+if USAR_MEMORIA_COMPARTIDA:
+    publicador_memoria = PublicadorMemoria(unity_json_path.replace(".json", ".bin"))
+
 # Inicializar YOLO y MediaPipe
 model = YOLO("yolov8n.pt")
+filtro_personas = FiltroClases(model.names, ["person"])
 mp_hands = mp.solutions.hands.Hands(static_image_mode=False, max_num_hands=2, min_detection_confidence=0.5)
 
 cap = cv2.VideoCapture(0)
 
-def contar_dedos(mano_landmarks):
-    dedos = [False, False, False, False, False]
-    tips = [4, 8, 12, 16, 20]
-
-    # Dedo pulgar
-    if mano_landmarks.landmark[4].x < mano_landmarks.landmark[3].x:
-        dedos[0] = True
-
-    # Otros dedos
-    for i, tip in enumerate(tips[1:], start=1):
-        if mano_landmarks.landmark[tip].y < mano_landmarks.landmark[tip - 2].y:
-            dedos[i] = True
-
-    return sum(dedos)
-
 while True:
     ret, frame = cap.read()
     if not ret:
@@ -38,18 +35,15 @@ while True:
 
     # YOLO detección de personas
     results = model(frame, verbose=False)[0]
-    persons = [d for d in results.boxes.data.tolist() if int(d[5]) == 0]
-    person_count = len(persons)
+    person_count = filtro_personas.contar(datos_deteccion(results))
 
     # MediaPipe detección de manos
     frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     hand_result = mp_hands.process(frame_rgb)
 
-    total_dedos = 0
-    if hand_result.multi_hand_landmarks:
-        for hand_landmarks in hand_result.multi_hand_landmarks:
-            dedos = contar_dedos(hand_landmarks)
-            total_dedos += dedos
+    # Dedos extendidos de todas las manos a la vez (ver rasgos_mano.py)
+    manos = landmarks_a_arreglo(hand_result, escala=(frame.shape[1], frame.shape[0]))
+    total_dedos = int(calcular_rasgos(manos).dedos.sum())
 
     # Mostrar texto en pantalla
     texto = f"Personas: {person_count} | Dedos: {total_dedos}"
@@ -63,15 +57,17 @@ while True:
         "frame_height": frame.shape[0]
     }
 
-    os.makedirs(os.path.dirname(unity_json_path), exist_ok=True)
-    with open(unity_json_path, "w") as f:
-        json.dump(data, f)
-
-    print(f"[JSON] {data}")
+    if publicador.publicar(data):
+        print(f"[JSON] {data}")
+    if publicador_memoria is not None:
+        publicador_memoria.publicar(data)
     cv2.imshow("Cam", frame)
 
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
+publicador.cerrar()
+if publicador_memoria is not None:
+    publicador_memoria.cerrar()
 cap.release()
 cv2.destroyAllWindows()
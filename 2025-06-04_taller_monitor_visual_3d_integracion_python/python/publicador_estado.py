@@ -0,0 +1,157 @@
+"""
+Publicación del estado de detección para Unity
+PublicadorJSON escribe el JSON de forma atómica (archivo temporal + os.replace),
+omite escrituras si el contenido no cambió y limita la frecuencia de escritura.
+PublicadorMemoria guarda el mismo estado en un registro de tamaño fijo en un
+archivo mapeado en memoria que el consumidor puede sondear sin abrir archivos
+"""
+
+import json
+import mmap
+import os
+import struct
+import time
+
+
+class PublicadorJSON:
+    def __init__(self, ruta, hz_max=15.0):
+        """
+        ruta: archivo JSON que lee el consumidor
+        hz_max: escrituras por segundo como máximo (0 = sin límite)
+        """
+        self.ruta = os.path.abspath(ruta)
+        self.ruta_temporal = self.ruta + ".tmp"
+        self.periodo = 1.0 / hz_max if hz_max else 0.0
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+
+        self.ultimo_escrito = None
+        self.pendiente = None
+        self.t_ultima = 0.0
+
+        # Estadísticas
+        self.escrituras = 0
+        self.omitidas = 0
+
+    def publicar(self, datos):
+        """
+        Publica el estado; devuelve True si se escribió en disco
+        """
+        contenido = json.dumps(datos, sort_keys=True)
+        if contenido == self.ultimo_escrito:
+            self.pendiente = None
+            self.omitidas += 1
+            return False
+
+        self.pendiente = contenido
+        if time.perf_counter() - self.t_ultima < self.periodo:
+            # Se escribirá en la próxima llamada permitida o en vaciar()
+            self.omitidas += 1
+            return False
+        return self.vaciar()
+
+    def vaciar(self):
+        """
+        Escribe el estado pendiente aunque no haya pasado el periodo mínimo
+        """
+        if self.pendiente is None:
+            return False
+        try:
+            with open(self.ruta_temporal, "w") as f:
+                f.write(self.pendiente)
+            # Reemplazo atómico: el lector ve el archivo anterior o el nuevo, nunca uno a medias
+            os.replace(self.ruta_temporal, self.ruta)
+        except PermissionError:
+            # En Windows falla si el lector tiene el archivo abierto; se reintenta luego
+            return False
+
+        self.ultimo_escrito = self.pendiente
+        self.pendiente = None
+        self.t_ultima = time.perf_counter()
+        self.escrituras += 1
+        return True
+
+    def cerrar(self):
+        self.vaciar()
+
+
+class PublicadorMemoria:
+    """
+    Registro de tamaño fijo en un archivo mapeado en memoria
+    Distribución (little-endian):
+        uint32 secuencia (impar mientras se escribe)
+        float64 instante (time.time())
+        int32 por cada campo, en el orden de 'campos'
+    El lector repite la lectura si la secuencia es impar o cambió durante la copia
+    """
+
+    CABECERA = struct.Struct("<Id")
+
+    def __init__(self, ruta, campos=("person_count", "finger_count", "frame_width", "frame_height")):
+        self.ruta = os.path.abspath(ruta)
+        self.campos = tuple(campos)
+        self.formato_valores = struct.Struct("<" + "i" * len(self.campos))
+        self.tamaño = self.CABECERA.size + self.formato_valores.size
+        os.makedirs(os.path.dirname(self.ruta), exist_ok=True)
+
+        with open(self.ruta, "wb") as f:
+            f.write(b"\0" * self.tamaño)
+        self.archivo = open(self.ruta, "r+b")
+        self.mapa = mmap.mmap(self.archivo.fileno(), self.tamaño)
+        self.secuencia = 0
+        self.ultimos_valores = None
+        self.escrituras = 0
+        self.omitidas = 0
+
+    def publicar(self, datos):
+        valores = tuple(int(datos[c]) for c in self.campos)
+        if valores == self.ultimos_valores:
+            self.omitidas += 1
+            return False
+
+        # Secuencia impar: escritura en curso
+        self.secuencia += 1
+        struct.pack_into("<I", self.mapa, 0, self.secuencia)
+        self.formato_valores.pack_into(self.mapa, self.CABECERA.size, *valores)
+        struct.pack_into("<d", self.mapa, 4, time.time())
+        # Secuencia par: registro consistente
+        self.secuencia += 1
+        struct.pack_into("<I", self.mapa, 0, self.secuencia)
+
+        self.ultimos_valores = valores
+        self.escrituras += 1
+        return True
+
+    def cerrar(self):
+        self.mapa.close()
+        self.archivo.close()
+
+
+class LectorMemoria:
+    """
+    Lector del registro de PublicadorMemoria (útil para pruebas y otros procesos Python)
+    """
+
+    def __init__(self, ruta, campos=("person_count", "finger_count", "frame_width", "frame_height")):
+        self.campos = tuple(campos)
+        self.formato_valores = struct.Struct("<" + "i" * len(self.campos))
+        tamaño = PublicadorMemoria.CABECERA.size + self.formato_valores.size
+        self.archivo = open(ruta, "rb")
+        self.mapa = mmap.mmap(self.archivo.fileno(), tamaño, access=mmap.ACCESS_READ)
+        self.reintentos = 0
+
+    def leer(self, max_intentos=100):
+        """
+        Devuelve (secuencia, instante, diccionario) consistente, o None si no se logró
+        """
+        for _ in range(max_intentos):
+            secuencia, instante = PublicadorMemoria.CABECERA.unpack_from(self.mapa, 0)
+            if secuencia % 2 == 0:
+                valores = self.formato_valores.unpack_from(self.mapa, PublicadorMemoria.CABECERA.size)
+                if struct.unpack_from("<I", self.mapa, 0)[0] == secuencia:
+                    return secuencia, instante, dict(zip(self.campos, valores))
+            self.reintentos += 1
+        return None
+
+    def cerrar(self):
+        self.mapa.close()
+        self.archivo.close()
@@ -0,0 +1,157 @@
+"""
+Rasgos de gestos a partir de los landmarks de MediaPipe Hands
+Los resultados se convierten una sola vez en un arreglo (manos, 21, 3) float32 y
+los rasgos (dedos extendidos, flexión de cada dedo, distancias de pinza) se
+calculan para todas las manos a la vez con NumPy, en lugar de leer
+hand_landmarks.landmark[i].x/.y atributo por atributo en cada regla.
+Los rasgos son invariantes a la rotación y al tamaño de la mano: la extensión se
+decide por el ángulo de cada dedo y las distancias se normalizan por la palma.
+El clasificador es intercambiable: reglas con nombre o cualquier modelo con predict()
+"""
+
+import collections
+
+import numpy as np
+
+NUM_LANDMARKS = 21
+MUNECA = 0
+# Por dedo (pulgar, índice, medio, anular, meñique): nudillo, articulación media y punta
+NUDILLOS = np.array([2, 5, 9, 13, 17])
+MEDIAS = np.array([3, 6, 10, 14, 18])
+PUNTAS = np.array([4, 8, 12, 16, 20])
+DEDOS = ("pulgar", "indice", "medio", "anular", "menique")
+
+
+def landmarks_a_arreglo(resultados, escala=None):
+    """
+    Convierte resultados de MediaPipe (o una lista de hand_landmarks) en (manos, 21, 3) float32
+    escala: (ancho, alto) del fotograma para pasar a píxeles; así los ángulos no se
+    deforman por la relación de aspecto (z usa la escala de x, como en MediaPipe)
+    """
+    manos = getattr(resultados, "multi_hand_landmarks", resultados) or []
+    # Una sola lista plana y una sola conversión para todas las manos del fotograma
+    arreglo = np.array([(p.x, p.y, p.z) for mano in manos for p in mano.landmark],
+                       dtype=np.float32).reshape(len(manos), NUM_LANDMARKS, 3)
+    if escala is not None:
+        ancho, alto = escala
+        arreglo *= np.array([ancho, alto, ancho], dtype=np.float32)
+    return arreglo
+
+
+# Landmarks que usan los rasgos, reunidos con un solo índice: nudillos, medias, puntas, muñeca
+_INDICES = np.concatenate((NUDILLOS, MEDIAS, PUNTAS, [MUNECA]))
+
+
+def _norma(v):
+    return np.sqrt((v * v).sum(axis=-1))
+
+
+def _flexion(nudillo, media, punta):
+    u = media - nudillo
+    v = punta - media
+    coseno = (u * v).sum(axis=-1) / (_norma(u) * _norma(v) + 1e-6)
+    return np.degrees(np.arccos(np.clip(coseno, -1.0, 1.0)))
+
+
+def flexion_dedos(manos):
+    """
+    Ángulo (grados) entre el segmento nudillo-articulación y articulación-punta de
+    cada dedo: ~0 con el dedo estirado, cerca de 90 o más con el dedo doblado. (manos, 5)
+    """
+    return _flexion(manos[:, NUDILLOS], manos[:, MEDIAS], manos[:, PUNTAS])
+
+
+class Rasgos(collections.namedtuple("Rasgos", "extendidos flexion pinza tam_palma")):
+    """
+    extendidos: (manos, 5) bool | flexion: (manos, 5) grados
+    pinza: (manos, 4) distancia de la punta del pulgar a las otras puntas, en palmas
+    tam_palma: (manos,) distancia muñeca-nudillo del dedo medio (unidades de entrada)
+    """
+    __slots__ = ()
+
+    @property
+    def dedos(self):
+        return self.extendidos.sum(axis=1)
+
+    def vector(self):
+        """
+        Rasgos de cada mano como vector (manos, 9) para un clasificador entrenado
+        """
+        return np.hstack((self.flexion / 180.0, self.pinza)).astype(np.float32)
+
+
+def calcular_rasgos(manos, umbral_flexion=50.0):
+    """
+    manos: (manos, 21, 3) de landmarks_a_arreglo
+    Un dedo está extendido si su flexión es menor que umbral_flexion; el pulgar además
+    debe alejarse del meñique (su punta más lejos del nudillo del meñique que su articulación),
+    lo que funciona igual para la mano izquierda, la derecha y la imagen en espejo
+    """
+    manos = np.asarray(manos, dtype=np.float32).reshape(-1, NUM_LANDMARKS, 3)
+    puntos = manos[:, _INDICES]
+    nudillos, medias, puntas, muneca = puntos[:, 0:5], puntos[:, 5:10], puntos[:, 10:15], puntos[:, 15]
+    flexion = _flexion(nudillos, medias, puntas)
+    extendidos = flexion < umbral_flexion
+    base_menique = nudillos[:, 4]
+    extendidos[:, 0] &= _norma(puntas[:, 0] - base_menique) > _norma(medias[:, 0] - base_menique)
+
+    tam_palma = _norma(nudillos[:, 2] - muneca)
+    pinza = _norma(puntas[:, 1:] - puntas[:, :1]) / (tam_palma[:, None] + 1e-6)
+    return Rasgos(extendidos, flexion, pinza, tam_palma)
+
+
+def reglas_base(umbral_pinza=0.3):
+    """
+    Reglas por defecto, en orden de prioridad: cada una devuelve un (manos,) bool
+    """
+    def solo(*dedos):
+        patron = np.zeros(5, bool)
+        patron[list(dedos)] = True
+        # El pulgar no cuenta: cuesta mantenerlo quieto en estos gestos
+        return lambda r: (r.extendidos[:, 1:] == patron[1:]).all(axis=1)
+
+    return collections.OrderedDict([
+        ("mano_abierta", lambda r: r.extendidos.all(axis=1)),
+        ("pinza", lambda r: r.pinza[:, 0] < umbral_pinza),
+        ("mano_cerrada", lambda r: ~r.extendidos.any(axis=1)),
+        ("senalar", solo(1)),
+        ("dos_dedos", solo(1, 2)),
+    ])
+
+
+class ClasificadorReglas:
+    def __init__(self, reglas=None, desconocido=None):
+        """
+        reglas: dict ordenado nombre -> función(Rasgos) -> (manos,) bool
+        Cada mano recibe el primer gesto cuya regla se cumple, o 'desconocido'
+        """
+        self.reglas = collections.OrderedDict(reglas_base() if reglas is None else reglas)
+        self.desconocido = desconocido
+
+    def registrar(self, nombre, regla, primero=False):
+        self.reglas[nombre] = regla
+        if primero:
+            self.reglas.move_to_end(nombre, last=False)
+
+    def __call__(self, rasgos):
+        n = len(rasgos.extendidos)
+        if n == 0 or not self.reglas:
+            return [self.desconocido] * n
+        nombres = list(self.reglas) + [self.desconocido]
+        # Todas las reglas de una vez; cada mano toma la primera que se cumple
+        cumple = np.vstack([regla(rasgos) for regla in self.reglas.values()] + [np.ones(n, bool)])
+        return [nombres[i] for i in cumple.argmax(axis=0)]
+
+
+class ClasificadorModelo:
+    def __init__(self, modelo):
+        """
+        Envuelve cualquier modelo con predict(X) (p. ej. de scikit-learn) entrenado
+        sobre Rasgos.vector()
+        """
+        self.modelo = modelo
+
+    def __call__(self, rasgos):
+        if len(rasgos.extendidos) == 0:
+            return []
+        return list(self.modelo.predict(rasgos.vector()))
@@ -0,0 +1,203 @@
+"""
+Gráfica en vivo con blitting para varias series (conteo de personas, FPS, temperatura...)
+El fondo (ejes, cuadrícula, etiquetas) se guarda una vez y en cada actualización
+solo se redibujan las líneas y los textos. Los ejes se reescalan (redibujado
+completo) únicamente cuando los datos salen del rango visible
+"""
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+from serie_temporal import VentanaAnillo
+
+
+class GraficaEnVivo:
+    def __init__(self, series, ventana=300, colores=None, margen_x=0.25, margen_y=0.1, figsize=(8, 6)):
+        """
+        series: nombres de las series; cada una va en su propio eje, con el eje X compartido
+        ventana: muestras visibles por serie
+        margen_x: fracción de la ventana que se adelanta el eje X al desplazarse
+        margen_y: margen relativo al ampliar el eje Y
+        """
+        self.nombres = list(series)
+        self.ventana = ventana
+        self.margen_x = margen_x
+        self.margen_y = margen_y
+        colores = colores or plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+        self.fig, ejes = plt.subplots(len(self.nombres), 1, sharex=True, figsize=figsize, squeeze=False)
+        self.ejes = {}
+        self.lineas = {}
+        self.textos = {}
+        self.datos = {}
+        for i, (nombre, ax) in enumerate(zip(self.nombres, ejes[:, 0])):
+            ax.set_ylabel(nombre)
+            ax.grid()
+            ax.set_ylim(0, 1)
+            # animated=True: el dibujo normal de la figura las omite y quedan fuera del fondo
+            linea, = ax.plot([], [], color=colores[i % len(colores)], animated=True)
+            texto = ax.text(0.02, 0.9, '', transform=ax.transAxes, verticalalignment='top',
+                            bbox=dict(boxstyle='round', facecolor='yellow'), animated=True)
+            self.ejes[nombre] = ax
+            self.lineas[nombre] = linea
+            self.textos[nombre] = texto
+            self.datos[nombre] = VentanaAnillo(ventana)
+        ejes[-1, 0].set_xlim(0, ventana)
+
+        self.fondo = None
+        self.escaladas = set()
+        self.redibujados = 0
+        self.actualizaciones = 0
+        # Cualquier redibujado completo (reescalado, cambio de tamaño) renueva el fondo
+        self.fig.canvas.mpl_connect('draw_event', self._al_dibujar)
+
+    def agregar(self, x, **valores):
+        """
+        Agrega un punto a cada serie nombrada: grafica.agregar(x, fps=30.0, personas=2)
+        """
+        for nombre, valor in valores.items():
+            self.datos[nombre].agregar(x, valor)
+
+    def texto(self, nombre, contenido):
+        self.textos[nombre].set_text(contenido)
+
+    def _al_dibujar(self, event):
+        self.fondo = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self._dibujar_artistas()
+
+    def _dibujar_artistas(self):
+        for nombre in self.nombres:
+            ax = self.ejes[nombre]
+            ax.draw_artist(self.lineas[nombre])
+            ax.draw_artist(self.textos[nombre])
+
+    def _ajustar_ejes(self):
+        """
+        Ajusta los límites solo si algún dato quedó fuera; devuelve True si cambiaron
+        """
+        cambio = False
+        x_max = max((d.vista()[0][-1] for d in self.datos.values() if len(d)), default=None)
+        if x_max is None:
+            return False
+
+        ax_x = self.ejes[self.nombres[-1]]
+        _, x1 = ax_x.get_xlim()
+        if x_max > x1:
+            # Adelantar el eje X un tramo para no reescalar en cada muestra
+            x1 = x_max + self.ventana * self.margen_x
+            ax_x.set_xlim(x1 - self.ventana * (1 + self.margen_x), x1)
+            cambio = True
+
+        for nombre in self.nombres:
+            _, y = self.datos[nombre].vista()
+            if not len(y):
+                continue
+            ax = self.ejes[nombre]
+            y0, y1 = ax.get_ylim()
+            y_min, y_max = float(y.min()), float(y.max())
+            if nombre not in self.escaladas:
+                # Primer dato de la serie: el rango inicial (0, 1) no se conserva
+                y0, y1 = y_min, y_max
+                self.escaladas.add(nombre)
+            elif y0 <= y_min and y_max <= y1:
+                continue
+            alto = (y_max - y_min) or abs(y_max) or 1.0
+            ax.set_ylim(min(y0, y_min - self.margen_y * alto), max(y1, y_max + self.margen_y * alto))
+            cambio = True
+        return cambio
+
+    def actualizar(self):
+        """
+        Redibuja las series; devuelve True si fue un redibujado completo
+        """
+        for nombre in self.nombres:
+            self.lineas[nombre].set_data(*self.datos[nombre].vista())
+        self.actualizaciones += 1
+
+        canvas = self.fig.canvas
+        if self.fondo is None or self._ajustar_ejes():
+            # El draw_event guarda el nuevo fondo y dibuja las líneas encima
+            canvas.draw()
+            canvas.flush_events()
+            self.redibujados += 1
+            return True
+
+        canvas.restore_region(self.fondo)
+        self._dibujar_artistas()
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+        return False
+
+    def guardar(self, ruta, historiales=None):
+        """
+        Guarda la figura en un archivo con las líneas incluidas
+        historiales: {nombre: (x, y)} para reemplazar la ventana de esas series (p. ej.
+        el historial diezmado de SerieTemporal)
+        """
+        for nombre in self.nombres:
+            linea = self.lineas[nombre]
+            if historiales and nombre in historiales:
+                linea.set_data(*historiales[nombre])
+            linea.set_animated(False)
+            self.textos[nombre].set_animated(False)
+            ax = self.ejes[nombre]
+            ax.relim()
+            ax.autoscale_view()
+        self.fig.savefig(ruta)
+
+
+def main():
+    """
+    Benchmark sin ventana (Agg): tiempo por actualización con blitting contra el
+    enfoque de main.py original (relim + autoscale_view + redibujado completo)
+    Uso: python grafica_en_vivo.py [actualizaciones]
+    """
+    import sys
+    import time
+
+    import matplotlib
+    matplotlib.use("Agg")
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    rng = np.random.default_rng(0)
+    personas = rng.integers(0, 6, n)
+    fps = 30 + rng.normal(0, 2, n)
+    temperatura = 22 + np.sin(np.arange(n) / 40.0)
+
+    # Enfoque original: una línea por serie, reescalado y dibujo completo en cada tick
+    fig, ejes = plt.subplots(3, 1, sharex=True, figsize=(8, 6))
+    lineas = [ax.plot([], [])[0] for ax in ejes]
+    for ax in ejes:
+        ax.grid()
+    tiempos_original = []
+    for i in range(n):
+        inicio = time.perf_counter()
+        x = np.arange(max(0, i - 299), i + 1)
+        for linea, ax, serie in zip(lineas, ejes, (personas, fps, temperatura)):
+            linea.set_data(x, serie[x])
+            ax.relim()
+            ax.autoscale_view()
+        fig.canvas.draw()
+        tiempos_original.append(time.perf_counter() - inicio)
+    plt.close(fig)
+
+    grafica = GraficaEnVivo(["personas", "fps", "temperatura"], ventana=300)
+    grafica.fig.canvas.draw()
+    tiempos_blit = []
+    for i in range(n):
+        inicio = time.perf_counter()
+        grafica.agregar(i, personas=personas[i], fps=fps[i], temperatura=temperatura[i])
+        grafica.texto("fps", f"FPS: {fps[i]:.1f}")
+        grafica.actualizar()
+        tiempos_blit.append(time.perf_counter() - inicio)
+    plt.close(grafica.fig)
+
+    for nombre, tiempos in (("Redibujado completo", tiempos_original), ("Blitting", tiempos_blit)):
+        t = np.array(tiempos) * 1000
+        print(f"{nombre:<20} media {t.mean():7.2f} ms | p95 {np.percentile(t, 95):7.2f} ms | "
+              f"{1000 / t.mean():7.1f} actualizaciones/s")
+    print(f"Redibujados completos con blitting: {grafica.redibujados} de {grafica.actualizaciones}")
+
+
+if __name__ == "__main__":
+    main()
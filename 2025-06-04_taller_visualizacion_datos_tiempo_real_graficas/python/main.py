@@ -1,37 +1,37 @@
 # Real-Time Plotting with Optional Object Detection and Simulated Temperature
 
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import numpy as np
 import time
-import csv
 import cv2
 from ultralytics import YOLO
+from postprocesado import FiltroClases, datos_deteccion
+from serie_temporal import EscritorPorBloques, SerieTemporal
+from grafica_en_vivo import GraficaEnVivo
 
 # Carga el modelo de detección
 model = YOLO("yolov8n.pt")  # Asegúrate de tener el modelo downloaded
+filtro_personas = FiltroClases(model.names, ["person"])
 
 
 # 0 = modo simulado, 1 = modo detección, 2 = modo temperatura
 modo = 0
 
-# Listas para guardar los datos
-datos = []
-
-# CSV opcional
-with open("resultados.csv", "w", newline='') as f:
-    writer = csv.writer(f)
-    writer.writerow(['indice', 'valor'])
+# Serie acotada: la ventana en pantalla la lleva GraficaEnVivo (ventana=300 más abajo);
+# aquí solo se conserva el historial completo diezmado para el PNG final y el CSV
+# se escribe por bloques (usar .parquet para Parquet)
+datos = SerieTemporal(ventana=None, escritor=EscritorPorBloques("resultados.csv", tam_bloque=200))
 
 # Capture de video opcional
 cap = cv2.VideoCapture(0)
 
+# Instante de la actualización anterior, para el FPS real de la gráfica
+ultimo_tick = None
 
-def update(frame):
-    """Función que se llama en cada frame de la animación.""" 
-    global modo, datos, text
 
-    inicio = time.time()
+def update():
+    """Función que se llama en cada tick del temporizador.""" 
+    global modo, datos, ultimo_tick
 
     if modo == 0:
         # Simulamos nuevos datos
@@ -47,8 +47,8 @@ def update(frame):
         else:
             resultados = model(video_frame)
             detections = resultados[0]
-            # Filtramos solamente detecciones de Persona
-            nuevo_dato = sum(1 for box in detections.boxes if int(box.cls.item()) == 0)  # 0 = person
+            # Filtramos solamente detecciones de Persona (conteo vectorizado)
+            nuevo_dato = filtro_personas.contar(datos_deteccion(detections))
 
             # También podemos mostrar el video en una ventana aparte
             annotated = resultados[0].plot()
@@ -56,7 +56,7 @@ def update(frame):
             if cv2.waitKey(1) == ord('q'):
                 cap.release()
                 cv2.destroyAllWindows()
-                return line, text
+                return
 
         modo_text = "Detectar número de personas"
 
@@ -64,29 +64,18 @@ def update(frame):
         nuevo_dato = np.sin(time.time())  # Temperatura simulated
         modo_text = "Temperatura (sin)"
 
-    # Agregar nuevo dato
-    datos.append(nuevo_dato)
-
-    # Actualizamos gráfica
-    line.set_data(range(len(datos)), datos)
-    ax.relim()
-    ax.autoscale_view()
-
-    # También podemos guardar CSV opcional
-    with open("resultados.csv", "a", newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow([len(datos), nuevo_dato])
-
-    # Medir FPS sin division por cero
-    fin = time.time()
-    duracion = fin - inicio
-    fps = 1.0 / (duracion + 1e-6)
-    fps_text = f"FPS: {fps:.2f}"
+    # Agregar nuevo dato (también queda en el CSV)
+    datos.agregar(nuevo_dato)
 
-    # Actualizamos texto
-    text.set_text(f'{fps_text}\nValor actual: {nuevo_dato}\nModo: {modo_text}')
+    # Medir FPS entre actualizaciones sin division por cero
+    ahora = time.perf_counter()
+    fps = 1.0 / (ahora - ultimo_tick + 1e-6) if ultimo_tick is not None else 0.0
+    ultimo_tick = ahora
 
-    return line, text
+    # Actualizamos gráfica: solo se redibujan las líneas salvo que haya que reescalar
+    grafica.agregar(datos.total, valor=nuevo_dato, fps=fps, temperatura=20 + 5 * np.sin(time.time() / 10))
+    grafica.texto("valor", f'FPS: {fps:.2f}\nValor actual: {nuevo_dato}\nModo: {modo_text}')
+    grafica.actualizar()
 
 
 def key_event(event):
@@ -97,20 +86,15 @@ def key_event(event):
         print(f"Cambiado el modo a: {modo}")
 
 
-# Creamos la gráfica
-fig, ax = plt.subplots()
-ax.set_xlabel("Valor")
-ax.set_ylabel("Conteo")
-ax.grid()
+# Creamos la gráfica: valor del modo actual, FPS y temperatura simulada en una figura
+grafica = GraficaEnVivo(["valor", "fps", "temperatura"], ventana=300)
+fig = grafica.fig
+grafica.ejes["temperatura"].set_xlabel("Muestra")
 
-line, = ax.plot([], [], color='blue')
-
-# Creamos el texto que se va actualizando
-text = ax.text(0.05, 0.95, '',
-               transform=ax.transAxes, bbox=dict(boxstyle='round', facecolor='yellow'), verticalalignment='top')
-
-# Animamr
-ani = animation.FuncAnimation(fig, update, interval=500, blit=False)
+# Animamos con un temporizador (~30 actualizaciones/s) en lugar de FuncAnimation
+timer = fig.canvas.new_timer(interval=33)
+timer.add_callback(update)
+timer.start()
 fig.canvas.mpl_connect("key_press_event", key_event)
 plt.show()
 
@@ -122,7 +106,11 @@ if cap.isOpened():
 cv2.destroyAllWindows()
 print("Ventanas cerradas.")
 
-# Guardamos la gráfica como PNG
+# Escribimos las muestras pendientes del CSV
+datos.cerrar()
+print(f"{datos.total} muestras guardadas en resultados.csv.")
+
+# Guardamos la gráfica como PNG con el historial completo (mínimo/máximo por tramo)
 output_file = "grafica.png"
-fig.savefig(output_file)
+grafica.guardar(output_file, historiales={"valor": datos.historial(2000)})
 print(f"Grafica guardada en {output_file}.")
\ No newline at end of file
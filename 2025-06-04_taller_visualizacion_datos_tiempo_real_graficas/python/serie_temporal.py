@@ -0,0 +1,246 @@
+"""
+Almacenamiento acotado de series de tiempo para las gráficas en vivo
+- VentanaAnillo: últimas N muestras en arreglos NumPy preasignados (vista sin copias)
+- ResumenMinMax: historial completo diezmado por mínimo/máximo con memoria fija
+- EscritorPorBloques: guarda las muestras en CSV o Parquet por bloques
+- SerieTemporal: combina las tres piezas
+El costo por muestra y por redibujado no crece con el tiempo de ejecución
+"""
+
+import os
+
+import numpy as np
+
+
+class VentanaAnillo:
+    def __init__(self, capacidad):
+        """
+        Cada muestra se escribe dos veces (en i y en i + capacidad), así las
+        últimas 'capacidad' muestras siempre forman un bloque contiguo
+        """
+        self.capacidad = capacidad
+        self.x = np.zeros(2 * capacidad, dtype=np.float64)
+        self.y = np.zeros(2 * capacidad, dtype=np.float64)
+        self.posicion = 0
+        self.cantidad = 0
+
+    def agregar(self, x, y):
+        i = self.posicion
+        self.x[i] = self.x[i + self.capacidad] = x
+        self.y[i] = self.y[i + self.capacidad] = y
+        self.posicion = (i + 1) % self.capacidad
+        self.cantidad = min(self.cantidad + 1, self.capacidad)
+
+    def vista(self):
+        """
+        Devuelve (x, y) en orden cronológico como vistas (sin copiar)
+        """
+        fin = self.posicion + self.capacidad if self.cantidad == self.capacidad else self.posicion
+        inicio = fin - self.cantidad
+        return self.x[inicio:fin], self.y[inicio:fin]
+
+    def __len__(self):
+        return self.cantidad
+
+
+def decimar_minmax(x, y, puntos):
+    """
+    Reduce (x, y) a unos 'puntos' valores conservando el mínimo y el máximo de
+    cada cubeta, para que los picos sigan viéndose en la gráfica
+    """
+    n = len(y)
+    cubetas = puntos // 2
+    if n <= puntos or cubetas == 0:
+        return x, y
+
+    tam = n // cubetas
+    usados = tam * cubetas
+    # Las muestras más viejas que no completan una cubeta se conservan tal cual
+    bloques = y[n - usados:].reshape(cubetas, tam)
+    x_bloques = x[n - usados:].reshape(cubetas, tam)
+    i_min = bloques.argmin(axis=1)
+    i_max = bloques.argmax(axis=1)
+    # Mantener el orden temporal dentro de cada cubeta
+    primero = np.minimum(i_min, i_max)
+    segundo = np.maximum(i_min, i_max)
+    filas = np.arange(cubetas)
+    indices = np.stack((primero, segundo), axis=1)
+    x_out = x_bloques[filas[:, None], indices].ravel()
+    y_out = bloques[filas[:, None], indices].ravel()
+    if n > usados:
+        x_out = np.concatenate((x[:n - usados], x_out))
+        y_out = np.concatenate((y[:n - usados], y_out))
+    return x_out, y_out
+
+
+class ResumenMinMax:
+    def __init__(self, max_cubetas=2048, tam_cubeta=1):
+        """
+        Guarda (x, mínimo, máximo) por cubeta de 'tam_cubeta' muestras
+        Al llenarse, une las cubetas de dos en dos y duplica su tamaño: la memoria
+        queda fija y el historial cubre toda la ejecución
+        """
+        if max_cubetas % 2:
+            raise ValueError("max_cubetas debe ser par")
+        self.max_cubetas = max_cubetas
+        self.tam_cubeta = tam_cubeta
+        self.x_min = np.zeros(max_cubetas)
+        self.x_max = np.zeros(max_cubetas)
+        self.y_min = np.zeros(max_cubetas)
+        self.y_max = np.zeros(max_cubetas)
+        self.cubetas = 0
+
+        # Cubeta en construcción
+        self.pendientes = 0
+        self.p_x_min = self.p_x_max = 0.0
+        self.p_y_min = np.inf
+        self.p_y_max = -np.inf
+
+    def agregar(self, x, y):
+        if y < self.p_y_min:
+            self.p_y_min, self.p_x_min = y, x
+        if y > self.p_y_max:
+            self.p_y_max, self.p_x_max = y, x
+        self.pendientes += 1
+        if self.pendientes < self.tam_cubeta:
+            return
+
+        if self.cubetas == self.max_cubetas:
+            self._compactar()
+        i = self.cubetas
+        self.x_min[i], self.y_min[i] = self.p_x_min, self.p_y_min
+        self.x_max[i], self.y_max[i] = self.p_x_max, self.p_y_max
+        self.cubetas += 1
+        self.pendientes = 0
+        self.p_y_min = np.inf
+        self.p_y_max = -np.inf
+
+    def _compactar(self):
+        """
+        Une cada par de cubetas vecinas quedándose con el menor mínimo y el mayor máximo
+        """
+        mitad = self.max_cubetas // 2
+        for valores, posiciones, elegir in ((self.y_min, self.x_min, np.argmin),
+                                            (self.y_max, self.x_max, np.argmax)):
+            pares_y = valores.reshape(mitad, 2)
+            pares_x = posiciones.reshape(mitad, 2)
+            cual = elegir(pares_y, axis=1)
+            filas = np.arange(mitad)
+            valores[:mitad] = pares_y[filas, cual]
+            posiciones[:mitad] = pares_x[filas, cual]
+        self.cubetas = mitad
+        self.tam_cubeta *= 2
+
+    def puntos(self):
+        """
+        Devuelve (x, y) alternando mínimo y máximo de cada cubeta en orden temporal
+        """
+        n = self.cubetas
+        x = np.stack((self.x_min[:n], self.x_max[:n]), axis=1)
+        y = np.stack((self.y_min[:n], self.y_max[:n]), axis=1)
+        if self.pendientes:
+            # Incluir la cubeta en construcción
+            x = np.vstack((x, [[self.p_x_min, self.p_x_max]]))
+            y = np.vstack((y, [[self.p_y_min, self.p_y_max]]))
+            n += 1
+        orden = np.argsort(x, axis=1, kind="stable")
+        filas = np.arange(n)[:, None]
+        return x[filas, orden].ravel(), y[filas, orden].ravel()
+
+
+class EscritorPorBloques:
+    def __init__(self, ruta, columnas=("indice", "valor"), tam_bloque=1000, formato=None):
+        """
+        Acumula filas en un bloque preasignado y lo escribe completo al llenarse
+        formato: "csv" o "parquet" (por defecto se deduce de la extensión de 'ruta')
+        Parquet requiere pyarrow
+        """
+        self.ruta = ruta
+        self.columnas = tuple(columnas)
+        self.formato = formato or ("parquet" if ruta.endswith(".parquet") else "csv")
+        self.bloque = np.zeros((tam_bloque, len(self.columnas)), dtype=np.float64)
+        self.filas = 0
+        self.escritas = 0
+        self.bloques_escritos = 0
+
+        carpeta = os.path.dirname(os.path.abspath(ruta))
+        os.makedirs(carpeta, exist_ok=True)
+        if self.formato == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            self._pa = pa
+            self.esquema = pa.schema([(c, pa.float64()) for c in self.columnas])
+            self.escritor = pq.ParquetWriter(ruta, self.esquema)
+        else:
+            self.archivo = open(ruta, "w", newline='')
+            self.archivo.write(",".join(self.columnas) + "\n")
+
+    def agregar(self, *valores):
+        self.bloque[self.filas] = valores
+        self.filas += 1
+        if self.filas == len(self.bloque):
+            self.vaciar()
+
+    def vaciar(self):
+        if self.filas == 0:
+            return
+        datos = self.bloque[:self.filas]
+        if self.formato == "parquet":
+            tabla = self._pa.Table.from_arrays([self._pa.array(datos[:, j]) for j in range(len(self.columnas))],
+                                               schema=self.esquema)
+            self.escritor.write_table(tabla)
+        else:
+            np.savetxt(self.archivo, datos, delimiter=",", fmt="%.10g")
+            self.archivo.flush()
+        self.escritas += self.filas
+        self.bloques_escritos += 1
+        self.filas = 0
+
+    def cerrar(self):
+        self.vaciar()
+        if self.formato == "parquet":
+            self.escritor.close()
+        else:
+            self.archivo.close()
+
+
+class SerieTemporal:
+    def __init__(self, ventana=500, max_cubetas=2048, escritor=None):
+        """
+        ventana: muestras recientes que se grafican a resolución completa; None si la
+        gráfica guarda su propia ventana y aquí solo se quiere el historial
+        max_cubetas: tamaño fijo del historial diezmado
+        escritor: EscritorPorBloques opcional para guardar todas las muestras
+        """
+        self.reciente = VentanaAnillo(ventana) if ventana else None
+        self.resumen = ResumenMinMax(max_cubetas)
+        self.escritor = escritor
+        self.total = 0
+
+    def agregar(self, y, x=None):
+        """
+        Agrega una muestra; si no se da x se usa el índice de la muestra
+        """
+        self.total += 1
+        x = self.total if x is None else x
+        if self.reciente is not None:
+            self.reciente.agregar(x, y)
+        self.resumen.agregar(x, y)
+        if self.escritor is not None:
+            self.escritor.agregar(x, y)
+
+    def ventana(self):
+        if self.reciente is None:
+            return np.empty(0), np.empty(0)
+        return self.reciente.vista()
+
+    def historial(self, puntos=1000):
+        """
+        Historial completo reducido a unos 'puntos' valores (mínimo/máximo por cubeta)
+        """
+        return decimar_minmax(*self.resumen.puntos(), puntos)
+
+    def cerrar(self):
+        if self.escritor is not None:
+            self.escritor.cerrar()
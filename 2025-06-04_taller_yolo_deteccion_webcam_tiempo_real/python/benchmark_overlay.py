@@ -0,0 +1,69 @@
+"""
+Benchmark de la gráfica de FPS sobre fotogramas 1080p
+Compara el dibujo original (lista con pop(0), copia completa del fotograma y
+un cv2.line por segmento) contra GraficaFPS
+Uso: python benchmark_overlay.py [repeticiones]
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from overlay_fps import GraficaFPS
+
+
+def overlay_original(annotated, fps_vals, fps):
+    """
+    Copia del bloque de dibujo de main.py antes de GraficaFPS
+    """
+    fps_vals.append(fps)
+    if len(fps_vals) > 50:
+        fps_vals.pop(0)
+
+    graph_height = 100
+    graph_width = 200
+    base = annotated.copy()
+    cv2.rectangle(base, (base.shape[1] - graph_width - 10, base.shape[0] - graph_height - 10),
+                  (base.shape[1] - 10, base.shape[0] - 10), (50, 50, 50), -1)
+
+    if len(fps_vals) > 1:
+        max_fps = max(fps_vals)
+        min_fps = min(fps_vals)
+        range_fps = max_fps - min_fps if max_fps - min_fps > 0 else 1
+        for i in range(1, len(fps_vals)):
+            x1 = base.shape[1] - graph_width - 10 + (i - 1) * (graph_width // len(fps_vals))
+            y1 = base.shape[0] - 10 - int((fps_vals[i - 1] - min_fps) * graph_height / range_fps)
+            x2 = base.shape[1] - graph_width - 10 + i * (graph_width // len(fps_vals))
+            y2 = base.shape[0] - 10 - int((fps_vals[i] - min_fps) * graph_height / range_fps)
+            cv2.line(base, (x1, y1), (x2, y2), (0, 255, 0), 2)
+    return base
+
+
+def main():
+    repeticiones = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 255, size=(1080, 1920, 3), dtype=np.uint8)
+    fps_serie = rng.uniform(15, 30, size=repeticiones)
+
+    fps_vals = []
+    inicio = time.perf_counter()
+    for fps in fps_serie:
+        overlay_original(frame, fps_vals, fps)
+    t_original = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    grafica = GraficaFPS()
+    inicio = time.perf_counter()
+    for fps in fps_serie:
+        grafica.agregar(fps)
+        grafica.dibujar(frame)
+    t_nuevo = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    print(f"1080p, {repeticiones} fotogramas")
+    print(f"Gráfica original: {t_original:8.1f} us por fotograma")
+    print(f"GraficaFPS:       {t_nuevo:8.1f} us por fotograma ({t_original / t_nuevo:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Microbenchmark del post-procesado de detecciones
+Compara el filtrado/conteo caja por caja (como en main.py original) contra
+FiltroClases sobre fotogramas sintéticos con cientos de detecciones
+Uso: python benchmark_postprocesado.py [num_detecciones] [repeticiones]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from postprocesado import FiltroClases, agrupar_por_clase
+
+# Nombres de las 80 clases de COCO como en model.names (solo importan los ids)
+NAMES = {i: f"clase_{i}" for i in range(80)}
+NAMES.update({0: "person", 15: "cat", 67: "cell phone"})
+
+
+def detecciones_sinteticas(n, rng):
+    datos = np.empty((n, 6), dtype=np.float32)
+    xy = rng.uniform(0, 1200, size=(n, 2))
+    wh = rng.uniform(10, 200, size=(n, 2))
+    datos[:, 0:2] = xy
+    datos[:, 2:4] = xy + wh
+    datos[:, 4] = rng.uniform(0.25, 1.0, size=n)
+    datos[:, 5] = rng.integers(0, 80, size=n)
+    return datos
+
+
+def filtrar_por_caja(filas, names, etiqueta):
+    """
+    Versión original: una búsqueda en model.names por cada caja
+    """
+    filtradas = []
+    for fila in filas:
+        class_id = int(fila[5].item())
+        if names[class_id] == etiqueta:
+            filtradas.append(fila)
+    return filtradas
+
+
+def medir(funcion, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones * 1e6
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    rng = np.random.default_rng(0)
+    datos = detecciones_sinteticas(n, rng)
+
+    # Con torch disponible la versión por caja recorre un tensor, como ultralytics
+    try:
+        import torch
+        filas = torch.from_numpy(datos)
+    except ImportError:
+        filas = datos
+
+    filtro = FiltroClases(NAMES, ["person"])
+    assert len(filtrar_por_caja(filas, NAMES, "person")) == filtro.contar(datos)
+
+    print(f"{n} detecciones por fotograma, {repeticiones} repeticiones")
+    t_caja = medir(lambda: filtrar_por_caja(filas, NAMES, "person"), repeticiones)
+    t_filtro = medir(lambda: filtro.filtrar(datos), repeticiones)
+    t_conteo = medir(lambda: filtro.contar(datos), repeticiones)
+    t_grupos = medir(lambda: agrupar_por_clase(datos), repeticiones)
+
+    print(f"Filtrado caja por caja:   {t_caja:10.1f} us")
+    print(f"FiltroClases.filtrar:     {t_filtro:10.1f} us  ({t_caja / t_filtro:.0f}x)")
+    print(f"FiltroClases.contar:      {t_conteo:10.1f} us")
+    print(f"agrupar_por_clase:        {t_grupos:10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
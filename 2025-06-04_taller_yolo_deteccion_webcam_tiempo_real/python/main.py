@@ -1,20 +1,26 @@
 # Real-time Object Detection with YOLOv8 and OpenCV
 import cv2  # Se usa OpenCV para la captura de video y visualización
+import sys  # Se usa sys para elegir la fuente de video desde la línea de comandos
 import time  # Se usa time para calcular el FPS
 from ultralytics import YOLO  # Se usa la librería ultralytics para cargar el modelo YOLOv8
+from captura import CapturaAsincrona  # Captura en un hilo de fondo con buffer acotado
+from postprocesado import FiltroClases, datos_deteccion  # Filtrado vectorizado por clase
+from overlay_fps import GraficaFPS  # Gráfica de FPS con buffer circular
 
 # Carga el modelo (YOLOv8n)
 model = YOLO("yolov8n.pt")
 
 # Filtra opcionalmente según las clases que deseas detectar
 filter_labels = [None, "person", "cat", "cell phone"]
+# Máscaras nombre -> id precalculadas para cada modo de filtrado
+filtros = [None if label is None else FiltroClases(model.names, [label]) for label in filter_labels]
 
-# Inicializa la captura de video
-cap = cv2.VideoCapture(0)
-
-if not cap.isOpened():
+# Inicializa la captura de video (cámara 0, archivo de video o "sintetica")
+fuente = sys.argv[1] if len(sys.argv) > 1 else 0
+try:
+    cap = CapturaAsincrona(fuente)
+except IOError:
     print("Error: no se pudo acceder a la cámara.")
-    cap.release()
     exit(1)
 
 print("Presiona 'q' para salir")
@@ -23,32 +29,29 @@ print("Presiona 'f' para cambiar el modo de filtrado")
 # Filtrado activado o desactivado
 filter_index = 0
 
-# Almacena histórico de FPS
-fps_vals = []
+# Almacena histórico de FPS (últimos 50 valores) y dibuja su gráfica
+grafica_fps = GraficaFPS(capacidad=50, ancho=200, alto=100)
 
 # Loop principal
 try:
     while True:
         inicio = time.time()
-        ret, frame = cap.read()
-        if not ret:
+        # Siempre se toma el fotograma más reciente; los anteriores se descartan
+        fotograma = cap.leer(timeout=2.0)
+        if fotograma is None:
             print("Error: no se pudo leer el fotograma.")
             break
+        frame = fotograma.imagen
 
         # Realiza detección de objetos en el fotograma
         resultados = model.predict(source=frame, stream=False)
         detections = resultados[0]
+        cap.registrar_inferencia(fotograma)
 
-        # Filtra según el modo vigente
-        if filter_labels[filter_index] is not None:
-            filter_name = filter_labels[filter_index]
-            filtered_boxes = []
-            for box in detections.boxes:
-                class_id = int(box.cls.item())  # el id de la detección
-                class_name = model.names[class_id]  # nombre de la detección
-                if class_name == filter_name:
-                    filtered_boxes.append(box)
-            detections.boxes = filtered_boxes
+        # Filtra según el modo vigente (una sola pasada sobre el tensor de cajas)
+        filtro = filtros[filter_index]
+        if filtro is not None:
+            detections = detections[filtro.indices(datos_deteccion(detections))]
 
         # Dibuja las detecciones en el fotograma
         annotated = detections.plot()
@@ -56,9 +59,7 @@ try:
         # Calcula el FPS
         fin = time.time()
         fps = 1.0 / (fin - inicio)
-        fps_vals.append(fps)
-        if len(fps_vals) > 50:
-            fps_vals.pop(0)
+        grafica_fps.agregar(fps)
 
         fps_text = f"FPS: {fps:.2f}"
 
@@ -76,32 +77,11 @@ try:
                     fontFace=cv2.FONT_HERSHEY_SIMPLEX,
                     fontScale=1, color=color, thickness=2)
 
-        # --- Dibujar gráfica de los FPS --- 
-        graph_height = 100
-        graph_width = 200
-        graph_background_color = (50, 50, 50)
-        base = annotated.copy()
-
-        
-        # Dibuja el fondo de la gráfica
-        cv2.rectangle(base, (base.shape[1] - graph_width - 10, base.shape[0] - graph_height - 10),
-                       (base.shape[1] - 10, base.shape[0] - 10),
-                       graph_background_color, -1)
-
-        if len(fps_vals) > 1:
-            max_fps = max(fps_vals)
-            min_fps = min(fps_vals)
-            range_fps = max_fps - min_fps if max_fps - min_fps > 0 else 1
-            for i in range(1, len(fps_vals)):
-                x1 = base.shape[1] - graph_width - 10 + (i - 1) * (graph_width // len(fps_vals))
-                y1 = base.shape[0] - 10 - int((fps_vals[i - 1] - min_fps) * graph_height / range_fps)
-                x2 = base.shape[1] - graph_width - 10 + i * (graph_width // len(fps_vals))
-                y2 = base.shape[0] - 10 - int((fps_vals[i] - min_fps) * graph_height / range_fps)
-                color = (0, 255, 0)
-                cv2.line(base, (x1, y1), (x2, y2), color, 2)
+        # --- Dibujar gráfica de los FPS --- (solo se toca la región de la gráfica)
+        grafica_fps.dibujar(annotated)
 
         # Muestra el resultado
-        cv2.imshow("Deteccion en Tiempo Real", base)
+        cv2.imshow("Deteccion en Tiempo Real", annotated)
 
         # Control con teclado
         key = cv2.waitKey(1) & 0xFF
@@ -114,3 +94,10 @@ try:
 finally:
     cap.release()
     cv2.destroyAllWindows()
+
+    # Resumen de la captura: fotogramas descartados y latencia captura -> inferencia
+    stats = cap.estadisticas()
+    print(f"Fotogramas capturados: {stats['capturados']} | procesados: {stats['entregados']} "
+          f"| descartados: {stats['descartados']}")
+    print(f"Latencia captura -> inferencia: {stats['latencia_inferencia_ms']:.1f} ms "
+          f"(p95 {stats['latencia_inferencia_p95_ms']:.1f} ms)")
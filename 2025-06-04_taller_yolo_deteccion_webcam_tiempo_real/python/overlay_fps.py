@@ -0,0 +1,93 @@
+"""
+Gráfica de FPS superpuesta al video
+Guarda el historial en un buffer circular de NumPy, dibuja la curva con una sola
+llamada a cv2.polylines sobre una imagen pequeña y solo copia esa región al fotograma
+"""
+
+import cv2
+import numpy as np
+
+
+class GraficaFPS:
+    def __init__(self, capacidad=50, ancho=200, alto=100, margen=10,
+                 color_fondo=(50, 50, 50), color_linea=(0, 255, 0), grosor=2, opacidad=1.0):
+        """
+        capacidad: número de valores que se muestran en la gráfica
+        ancho, alto: tamaño de la gráfica en píxeles
+        margen: separación respecto a la esquina inferior derecha del fotograma
+        opacidad: 1.0 copia la gráfica tal cual, menor que 1 la mezcla con el fondo
+        """
+        self.capacidad = capacidad
+        self.ancho = ancho
+        self.alto = alto
+        self.margen = margen
+        self.color_linea = color_linea
+        self.grosor = grosor
+        self.opacidad = opacidad
+
+        # Buffer circular con los valores
+        self.valores = np.zeros(capacidad, dtype=np.float32)
+        self.siguiente = 0
+        self.cantidad = 0
+
+        # Fondo precalculado y lienzo reutilizable del tamaño de la gráfica
+        self.fondo = np.full((alto, ancho, 3), color_fondo, dtype=np.uint8)
+        self.lienzo = self.fondo.copy()
+
+        # Coordenadas x fijas y buffer de puntos reutilizable
+        self.xs = np.linspace(0, ancho - 1, capacidad).astype(np.int32)
+        self.puntos = np.zeros((capacidad, 2), dtype=np.int32)
+
+    def agregar(self, valor):
+        """
+        Añade un valor en O(1) sobrescribiendo el más antiguo
+        """
+        self.valores[self.siguiente] = valor
+        self.siguiente = (self.siguiente + 1) % self.capacidad
+        self.cantidad = min(self.cantidad + 1, self.capacidad)
+
+    def historial(self):
+        """
+        Valores en orden cronológico
+        """
+        if self.cantidad < self.capacidad:
+            return self.valores[:self.cantidad]
+        return np.concatenate((self.valores[self.siguiente:], self.valores[:self.siguiente]))
+
+    def _actualizar_lienzo(self):
+        self.lienzo[:] = self.fondo
+        n = self.cantidad
+        if n < 2:
+            return
+
+        valores = self.historial()
+        minimo = valores.min()
+        rango = valores.max() - minimo
+        if rango <= 0:
+            rango = 1.0
+
+        # Escala todos los valores a píxeles de una vez
+        escala = (self.alto - 1) / rango
+        self.puntos[:n, 0] = self.xs[:n]
+        self.puntos[:n, 1] = (self.alto - 1) - ((valores - minimo) * escala).astype(np.int32)
+        cv2.polylines(self.lienzo, [self.puntos[:n]], False, self.color_linea, self.grosor)
+
+    def dibujar(self, frame):
+        """
+        Dibuja la gráfica en la esquina inferior derecha del fotograma (en el sitio)
+        """
+        h, w = frame.shape[:2]
+        y1 = h - self.margen
+        x1 = w - self.margen
+        y0 = y1 - self.alto
+        x0 = x1 - self.ancho
+        if x0 < 0 or y0 < 0:
+            return frame
+
+        self._actualizar_lienzo()
+        roi = frame[y0:y1, x0:x1]
+        if self.opacidad >= 1.0:
+            roi[:] = self.lienzo
+        else:
+            cv2.addWeighted(self.lienzo, self.opacidad, roi, 1.0 - self.opacidad, 0, dst=roi)
+        return frame
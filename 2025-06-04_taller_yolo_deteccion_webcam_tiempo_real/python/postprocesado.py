@@ -0,0 +1,106 @@
+"""
+Post-procesado vectorizado de detecciones YOLO
+Filtra, cuenta y agrupa detecciones por clase en una sola pasada de NumPy,
+sin crear un objeto de Python por cada caja
+"""
+
+import numpy as np
+
+# Columnas de boxes.data en ultralytics: x1, y1, x2, y2, confianza, clase
+COL_CONF = 4
+COL_CLASE = 5
+
+
+def datos_deteccion(resultado):
+    """
+    Devuelve las detecciones de un resultado YOLO como arreglo (N, 6) float32
+    Acepta un Results de ultralytics, su atributo boxes, un tensor o un arreglo
+    """
+    datos = getattr(resultado, "boxes", resultado)
+    datos = getattr(datos, "data", datos)
+    if hasattr(datos, "cpu"):
+        datos = datos.cpu().numpy()
+    return np.asarray(datos, dtype=np.float32).reshape(-1, 6)
+
+
+class FiltroClases:
+    def __init__(self, names, etiquetas=None, conf_min=0.0):
+        """
+        Precalcula la máscara nombre -> id de clase
+        names: diccionario id -> nombre (model.names)
+        etiquetas: nombres de clase a conservar (None = todas)
+        conf_min: confianza mínima para conservar una detección
+        """
+        self.names = dict(names)
+        self.ids_por_nombre = {nombre: i for i, nombre in self.names.items()}
+        self.num_clases = max(self.names) + 1 if self.names else 0
+        self.conf_min = conf_min
+
+        self.mascara = np.zeros(self.num_clases, dtype=bool)
+        if etiquetas is None:
+            self.mascara[:] = True
+        else:
+            for etiqueta in etiquetas:
+                self.mascara[self.ids_por_nombre[etiqueta]] = True
+
+    def seleccion(self, datos):
+        """
+        Máscara booleana (N,) de las detecciones que pasan el filtro
+        """
+        clases = datos[:, COL_CLASE].astype(np.intp)
+        seleccion = self.mascara[clases]
+        if self.conf_min > 0:
+            seleccion &= datos[:, COL_CONF] >= self.conf_min
+        return seleccion
+
+    def indices(self, datos):
+        """
+        Índices de las detecciones que pasan el filtro (para indexar un Results)
+        """
+        return np.flatnonzero(self.seleccion(datos))
+
+    def filtrar(self, datos):
+        """
+        Detecciones (M, 6) que pasan el filtro
+        """
+        return datos[self.seleccion(datos)]
+
+    def contar(self, datos):
+        """
+        Número de detecciones que pasan el filtro
+        """
+        return int(np.count_nonzero(self.seleccion(datos)))
+
+    def contar_por_clase(self, datos):
+        """
+        Conteo por id de clase: arreglo (num_clases,)
+        """
+        return contar_por_clase(self.filtrar(datos), self.num_clases)
+
+    def conteo_por_nombre(self, datos):
+        """
+        Diccionario nombre -> conteo, solo con las clases presentes
+        """
+        conteo = self.contar_por_clase(datos)
+        return {self.names[i]: int(conteo[i]) for i in np.flatnonzero(conteo)}
+
+
+def contar_por_clase(datos, num_clases):
+    """
+    Conteo de detecciones por id de clase con np.bincount
+    """
+    return np.bincount(datos[:, COL_CLASE].astype(np.intp), minlength=num_clases)
+
+
+def agrupar_por_clase(datos):
+    """
+    Agrupa las detecciones por clase: diccionario id -> arreglo (M, 6)
+    Ordena una vez por clase y parte el arreglo en bloques contiguos
+    """
+    if len(datos) == 0:
+        return {}
+    clases = datos[:, COL_CLASE].astype(np.intp)
+    orden = np.argsort(clases, kind="stable")
+    ordenadas = datos[orden]
+    ids, inicios = np.unique(clases[orden], return_index=True)
+    return dict(zip(ids.tolist(), np.split(ordenadas, inicios[1:])))
@@ -0,0 +1,350 @@
+"""
+Anotación de videos sin conexión: decodificar -> YOLO -> dibujar + codificar
+Las tres etapas corren a la vez unidas por colas acotadas: un hilo decodifica y arma
+lotes de fotogramas, la inferencia corre en un hilo (YOLO suelta el GIL mientras
+calcula) o en N procesos con su propio modelo, y el hilo principal reordena los
+resultados, dibuja, codifica el video y escribe las detecciones de cada fotograma
+(JSON Lines). Las colas acotadas limitan la memoria: si una etapa es más lenta, las
+anteriores esperan en lugar de acumular fotogramas.
+Al final se informa de cada etapa su capacidad (fps si nunca esperara), el tiempo
+ocupado y el que pasó esperando a las demás; la más ocupada es el cuello de botella
+Uso: python anotar_video.py video.mp4 [--salida video_anotado.mp4] [--procesos 2] [--lote 4]
+     python anotar_video.py sintetica --simulado 30   (sin modelo ni video)
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from captura import FuenteSintetica
+
+
+class Etapa:
+    def __init__(self, nombre, paralelo=1):
+        """
+        Tiempos acumulados de una etapa (s); paralelo: hilos o procesos que la ejecutan
+        """
+        self.nombre = nombre
+        self.paralelo = paralelo
+        self.fotogramas = 0
+        self.ocupado = 0.0
+        self.espera_entrada = 0.0
+        self.espera_salida = 0.0
+
+    def sumar(self, fotogramas, ocupado, espera_entrada, espera_salida):
+        self.fotogramas += fotogramas
+        self.ocupado += ocupado
+        self.espera_entrada += espera_entrada
+        self.espera_salida += espera_salida
+
+
+def predictor_yolo(modelo="yolov8n.pt", conf=0.25):
+    """
+    Devuelve (función lista_de_frames -> lista de arreglos (N, 6) x1 y1 x2 y2 conf clase, nombres)
+    """
+    from ultralytics import YOLO
+
+    yolo = YOLO(modelo)
+
+    def predecir(frames):
+        resultados = yolo.predict(source=frames, conf=conf, verbose=False)
+        return [np.hstack((r.boxes.xyxy.cpu().numpy(),
+                           r.boxes.conf.cpu().numpy()[:, None],
+                           r.boxes.cls.cpu().numpy()[:, None])).astype(np.float32)
+                for r in resultados]
+
+    return predecir, yolo.names
+
+
+def predictor_sintetico(ms=0.0):
+    """
+    Sustituto de YOLO para probar sin modelo: detecta el cuadro naranja de FuenteSintetica
+    por color y espera 'ms' por fotograma como si fuera la inferencia
+    """
+    def predecir(frames):
+        salida = []
+        for frame in frames:
+            mascara = cv2.inRange(frame, (0, 150, 200), (80, 255, 255))
+            contornos, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+            cajas = [cv2.boundingRect(c) for c in contornos]
+            salida.append(np.array([(x, y, x + w, y + h, 1.0, 0) for x, y, w, h in cajas],
+                                   dtype=np.float32).reshape(-1, 6))
+        if ms:
+            time.sleep(ms * len(frames) / 1000.0)
+        return salida
+
+    return predecir, {0: "cuadro"}
+
+
+def dibujar_detecciones(frame, detecciones, nombres):
+    """
+    Cajas y etiquetas como en main.py, y el contador de detecciones
+    """
+    for x1, y1, x2, y2, conf, cls in detecciones:
+        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(frame, f"{nombres[int(cls)]} {conf:.2f}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 2)
+    cv2.putText(frame, f"Detecciones: {len(detecciones)}", (10, 30),
+                cv2.FONT_HERSHEY_SIMPLEX, 1.0, (0, 255, 0), 2)
+    return frame
+
+
+def linea_detecciones(indice, fps, detecciones, nombres):
+    """
+    Registro JSON de un fotograma: índice, instante (s) y cajas en píxeles
+    """
+    return json.dumps({
+        "frame": indice,
+        "t": round(indice / fps, 3),
+        "detecciones": [{"clase": nombres[int(cls)], "confianza": round(float(conf), 3),
+                         "caja": [round(float(v), 1) for v in (x1, y1, x2, y2)]}
+                        for x1, y1, x2, y2, conf, cls in detecciones],
+    }, ensure_ascii=False)
+
+
+def abrir_video(fuente, max_frames=None):
+    """
+    Devuelve (captura, fps); "sintetica" genera max_frames (300 por defecto) sin esperar
+    """
+    if fuente == "sintetica":
+        return FuenteSintetica(fps=0, num_frames=max_frames or 300), 30.0
+    cap = cv2.VideoCapture(fuente)
+    if not cap.isOpened():
+        raise IOError(f"No se pudo abrir el video: {fuente}")
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    return cap, fps if fps and fps > 0 else 30.0
+
+
+def crear_escritor(ruta, fps, frame):
+    fourcc = cv2.VideoWriter_fourcc(*('XVID' if ruta.lower().endswith('.avi') else 'mp4v'))
+    escritor = cv2.VideoWriter(ruta, fourcc, fps, (frame.shape[1], frame.shape[0]))
+    if not escritor.isOpened():
+        raise IOError(f"No se pudo crear el video de salida: {ruta}")
+    return escritor
+
+
+def _inferir(fabrica, opciones, entrada, salida):
+    """
+    Etapa de inferencia (hilo o proceso): lotes (índices, frames) -> (índices, detecciones, nombres)
+    Al terminar envía (None, tiempos, error) para que el consumidor sepa que acabó
+    """
+    fotogramas = 0
+    ocupado = espera_entrada = espera_salida = carga = 0.0
+    error = None
+    try:
+        inicio = time.perf_counter()
+        predecir, nombres = fabrica(**opciones)
+        carga = time.perf_counter() - inicio
+        while True:
+            t0 = time.perf_counter()
+            lote = entrada.get()
+            t1 = time.perf_counter()
+            espera_entrada += t1 - t0
+            if lote is None:
+                break
+            indices, frames = lote
+            detecciones = predecir(frames)
+            t2 = time.perf_counter()
+            ocupado += t2 - t1
+            fotogramas += len(indices)
+            salida.put((indices, detecciones, nombres))
+            espera_salida += time.perf_counter() - t2
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    salida.put((None, (fotogramas, ocupado, espera_entrada, espera_salida, carga), error))
+
+
+def _decodificar(cap, entrada, pendientes, lote, trabajadores, etapa, max_frames, detenido):
+    """
+    Lee el video, guarda cada fotograma en 'pendientes' para la etapa final y envía
+    lotes de fotogramas consecutivos a la inferencia
+    """
+    indices, frames = [], []
+    i = 0
+    try:
+        while (max_frames is None or i < max_frames) and not detenido.is_set():
+            t0 = time.perf_counter()
+            ret, frame = cap.read()
+            etapa.ocupado += time.perf_counter() - t0
+            if not ret:
+                break
+            pendientes[i] = frame
+            indices.append(i)
+            frames.append(frame)
+            i += 1
+            if len(frames) == lote:
+                t0 = time.perf_counter()
+                entrada.put((indices, frames))
+                etapa.espera_salida += time.perf_counter() - t0
+                indices, frames = [], []
+        if frames:
+            t0 = time.perf_counter()
+            entrada.put((indices, frames))
+            etapa.espera_salida += time.perf_counter() - t0
+    finally:
+        etapa.fotogramas = i
+        for _ in range(trabajadores):
+            entrada.put(None)
+
+
+def anotar_video(fuente, salida, detecciones=None, fabrica=predictor_yolo, opciones=None,
+                 procesos=0, lote=1, tam_cola=4, max_frames=None):
+    """
+    Anota un video completo y devuelve (fotogramas, segundos, carga del modelo, etapas)
+    salida: video anotado (.mp4 o .avi) o None para no codificarlo
+    detecciones: archivo JSON Lines con las cajas de cada fotograma, o None
+    fabrica(**opciones) -> (predecir, nombres); con procesos debe poder importarse
+    desde el módulo (se ejecuta en cada proceso)
+    procesos: 0 = inferencia en un hilo de este proceso; N = N procesos con su modelo
+    lote: fotogramas por llamada al modelo | tam_cola: lotes en cada cola
+    """
+    opciones = opciones or {}
+    cap, fps = abrir_video(fuente, max_frames)
+    trabajadores = max(procesos, 1)
+    if procesos:
+        ctx = mp.get_context("spawn")
+        entrada, cola_salida = ctx.Queue(maxsize=tam_cola), ctx.Queue(maxsize=tam_cola)
+        hilos_inferencia = [ctx.Process(target=_inferir, args=(fabrica, opciones, entrada, cola_salida),
+                                        daemon=True) for _ in range(procesos)]
+    else:
+        entrada, cola_salida = queue.Queue(maxsize=tam_cola), queue.Queue(maxsize=tam_cola)
+        hilos_inferencia = [threading.Thread(target=_inferir, args=(fabrica, opciones, entrada, cola_salida),
+                                             daemon=True)]
+
+    decodificar = Etapa("decodificar")
+    inferir = Etapa("inferencia YOLO", trabajadores)
+    codificar = Etapa("dibujar + codificar")
+    # Fotogramas decodificados que aún no se escribieron (acotado por las colas)
+    pendientes = {}
+    detenido = threading.Event()
+    lector = threading.Thread(target=_decodificar, daemon=True,
+                              args=(cap, entrada, pendientes, lote, trabajadores, decodificar,
+                                    max_frames, detenido))
+
+    inicio = time.perf_counter()
+    for hilo in hilos_inferencia:
+        hilo.start()
+    lector.start()
+
+    escritor = None
+    archivo = open(detecciones, 'w', encoding='utf-8') if detecciones else None
+    listos = {}
+    siguiente = terminados = 0
+    errores, carga = [], 0.0
+    try:
+        while terminados < trabajadores:
+            t0 = time.perf_counter()
+            indices, resultado, nombres = cola_salida.get()
+            codificar.espera_entrada += time.perf_counter() - t0
+            if indices is None:
+                terminados += 1
+                inferir.sumar(*resultado[:4])
+                carga = max(carga, resultado[4])
+                if nombres is not None:
+                    errores.append(nombres)
+                    detenido.set()
+                continue
+
+            # Los procesos pueden terminar sus lotes en otro orden: se escriben en orden
+            for i, det in zip(indices, resultado):
+                listos[i] = (det, nombres)
+            t0 = time.perf_counter()
+            while siguiente in listos:
+                det, nombres = listos.pop(siguiente)
+                frame = pendientes.pop(siguiente)
+                if salida:
+                    dibujar_detecciones(frame, det, nombres)
+                    if escritor is None:
+                        escritor = crear_escritor(salida, fps, frame)
+                    escritor.write(frame)
+                if archivo:
+                    archivo.write(linea_detecciones(siguiente, fps, det, nombres) + '\n')
+                siguiente += 1
+            codificar.ocupado += time.perf_counter() - t0
+    finally:
+        detenido.set()
+        # Vaciar la cola de entrada por si el lector quedó bloqueado tras un error
+        while lector.is_alive():
+            try:
+                entrada.get_nowait()
+            except queue.Empty:
+                lector.join(timeout=0.05)
+        for hilo in hilos_inferencia:
+            if hilo.is_alive():
+                try:
+                    entrada.put_nowait(None)
+                except queue.Full:
+                    pass
+            hilo.join(timeout=5.0)
+        if procesos:
+            # Si un proceso murió quedan fotogramas sin leer en la tubería; al salir no
+            # hay que esperar a que se envíen
+            entrada.cancel_join_thread()
+        if escritor is not None:
+            escritor.release()
+        if archivo:
+            archivo.close()
+        cap.release()
+    if errores:
+        raise RuntimeError(f"Falló la inferencia: {errores[0]}")
+
+    codificar.fotogramas = siguiente
+    total = time.perf_counter() - inicio
+    return siguiente, total, carga, [decodificar, inferir, codificar]
+
+
+def informe(fotogramas, total, carga, etapas):
+    print(f"{fotogramas} fotogramas en {total:.2f} s -> {fotogramas / total:.1f} fps "
+          f"(carga del modelo {carga:.2f} s)")
+    for etapa in etapas:
+        # Con varios procesos los tiempos se suman: se dividen entre ellos
+        ocupado = etapa.ocupado / etapa.paralelo
+        capacidad = etapa.fotogramas / ocupado if ocupado else float('inf')
+        nombre = etapa.nombre + (f" x{etapa.paralelo}" if etapa.paralelo > 1 else "")
+        print(f"  {nombre:<22} capacidad {capacidad:8.1f} fps | ocupada {100 * ocupado / total:3.0f}% | "
+              f"esperando entrada {100 * etapa.espera_entrada / etapa.paralelo / total:3.0f}% | "
+              f"bloqueada a la salida {100 * etapa.espera_salida / etapa.paralelo / total:3.0f}%")
+    cuello = max(etapas, key=lambda e: e.ocupado / e.paralelo)
+    print(f"  Cuello de botella: {cuello.nombre}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Anotación de videos con YOLO sin conexión")
+    parser.add_argument("video", help="Video de entrada o 'sintetica'")
+    parser.add_argument("--salida", help="Video anotado (por defecto VIDEO_anotado.mp4)")
+    parser.add_argument("--detecciones", help="JSON Lines por fotograma (por defecto VIDEO_detecciones.jsonl)")
+    parser.add_argument("--sin-video", action="store_true", help="Solo escribir las detecciones")
+    parser.add_argument("--modelo", default="yolov8n.pt")
+    parser.add_argument("--procesos", type=int, default=0,
+                        help="Procesos de inferencia (0 = un hilo en este proceso)")
+    parser.add_argument("--lote", type=int, default=1, help="Fotogramas por llamada al modelo")
+    parser.add_argument("--cola", type=int, default=4, help="Lotes en cada cola entre etapas")
+    parser.add_argument("--frames", type=int, help="Procesar como máximo N fotogramas")
+    parser.add_argument("--simulado", type=float, metavar="MS",
+                        help="Usar el detector sintético con MS ms por fotograma en lugar de YOLO")
+    args = parser.parse_args()
+
+    base = os.path.splitext(os.path.basename(args.video))[0]
+    salida = None if args.sin_video else args.salida or f"{base}_anotado.mp4"
+    detecciones = args.detecciones or f"{base}_detecciones.jsonl"
+    if args.simulado is not None:
+        fabrica, opciones = predictor_sintetico, {"ms": args.simulado}
+    else:
+        fabrica, opciones = predictor_yolo, {"modelo": args.modelo}
+
+    resultado = anotar_video(args.video, salida, detecciones, fabrica, opciones, args.procesos,
+                             args.lote, args.cola, args.frames)
+    informe(*resultado)
+    print(f"Resultados: {salida or '(sin video)'} | {detecciones}")
+
+
+if __name__ == "__main__":
+    main()
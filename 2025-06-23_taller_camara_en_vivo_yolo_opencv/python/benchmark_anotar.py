@@ -0,0 +1,95 @@
+"""
+Benchmark de la anotación sin conexión: bucle secuencial contra el pipeline por etapas
+El bucle secuencial lee, infiere, dibuja y codifica un fotograma tras otro; el pipeline
+solapa las tres etapas (inferencia en un hilo o en varios procesos)
+Sin video se genera uno sintético; --simulado reemplaza YOLO por el detector
+sintético con una latencia fija por fotograma
+Uso: python benchmark_anotar.py [video.mp4] [--frames 300] [--simulado 30] [--procesos 2] [--lote 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from anotar_video import (abrir_video, anotar_video, crear_escritor, dibujar_detecciones, informe,
+                          linea_detecciones, predictor_sintetico, predictor_yolo)
+from captura import FuenteSintetica
+
+
+def video_sintetico(ruta, frames, ancho=1280, alto=720):
+    fuente = FuenteSintetica(ancho, alto, fps=0, num_frames=frames)
+    escritor = None
+    while True:
+        ret, frame = fuente.read()
+        if not ret:
+            break
+        if escritor is None:
+            escritor = crear_escritor(ruta, 30.0, frame)
+        escritor.write(frame)
+    escritor.release()
+
+
+def anotar_secuencial(fuente, salida, detecciones, fabrica, opciones, max_frames):
+    """
+    Referencia: todo en un solo bucle, como el resto de scripts del taller
+    """
+    predecir, nombres = fabrica(**opciones)
+    cap, fps = abrir_video(fuente, max_frames)
+    escritor = None
+    n = 0
+    inicio = time.perf_counter()
+    with open(detecciones, 'w', encoding='utf-8') as archivo:
+        while max_frames is None or n < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            det = predecir([frame])[0]
+            dibujar_detecciones(frame, det, nombres)
+            if escritor is None:
+                escritor = crear_escritor(salida, fps, frame)
+            escritor.write(frame)
+            archivo.write(linea_detecciones(n, fps, det, nombres) + '\n')
+            n += 1
+    total = time.perf_counter() - inicio
+    escritor.release()
+    cap.release()
+    return n, total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("video", nargs="?", help="Video grabado (por defecto uno sintético de 1280x720)")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--modelo", default="yolov8n.pt")
+    parser.add_argument("--simulado", type=float, metavar="MS", help="Detector sintético con MS ms por fotograma")
+    parser.add_argument("--procesos", type=int, default=2, help="Procesos de la variante multiproceso")
+    parser.add_argument("--lote", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.simulado is not None:
+        fabrica, opciones = predictor_sintetico, {"ms": args.simulado}
+    else:
+        fabrica, opciones = predictor_yolo, {"modelo": args.modelo}
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        video = args.video
+        if video is None:
+            video = os.path.join(carpeta, "sintetico.mp4")
+            video_sintetico(video, args.frames)
+        salida = os.path.join(carpeta, "anotado.mp4")
+        detecciones = os.path.join(carpeta, "detecciones.jsonl")
+
+        n, total = anotar_secuencial(video, salida, detecciones, fabrica, opciones, args.frames)
+        print(f"Secuencial: {n} fotogramas en {total:.2f} s -> {n / total:.1f} fps\n")
+
+        for procesos in (0, args.procesos):
+            print("Pipeline, inferencia en " + (f"{procesos} procesos" if procesos else "un hilo")
+                  + f", lote {args.lote}:")
+            informe(*anotar_video(video, salida, detecciones, fabrica, opciones, procesos,
+                                  args.lote, max_frames=args.frames))
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,29 +1,39 @@
 # main.py
 
+import sys
+
 import cv2
 import numpy as np
 from ultralytics import YOLO
 
+from captura import CapturaAsincrona
+
 def main():
     # Cargar modelo YOLO (YOLOv8)
     model = YOLO('yolov8n.pt')  # o 'yolov5s.pt'
 
-    # Iniciar captura de la webcam
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    # Iniciar captura en segundo plano (webcam, archivo de video o "sintetica")
+    fuente = sys.argv[1] if len(sys.argv) > 1 else 0
+    try:
+        cap = CapturaAsincrona(fuente)
+    except IOError:
         print("Error: no se pudo abrir la cámara.")
         return
 
     # Modo de filtro: 0=original, 1=gris, 2=binary, 3=canny
     filter_mode = 0
     paused = False
+    # Grabación del clip en curso (se escribe un fotograma por iteración, sin bloquear)
+    grabacion = None
+    restantes = 0
 
     while True:
         if not paused:
-            ret, frame = cap.read()
-            if not ret:
+            fotograma = cap.leer(timeout=2.0)
+            if fotograma is None:
                 print("Error: no se recibió frame.")
                 break
+            frame = fotograma.imagen
 
             # Filtros clásicos
             gray   = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
@@ -33,6 +43,7 @@ def main():
             # Detección con YOLO
             det_frame = frame.copy()
             results = model(frame)
+            cap.registrar_inferencia(fotograma)
             detections = 0
             for r in results:
                 for box in r.boxes:
@@ -67,6 +78,14 @@ def main():
             cv2.imshow('Original / Filtro', display)
             cv2.imshow('Detección YOLO', det_frame)
 
+            if grabacion is not None:
+                grabacion.write(det_frame)
+                restantes -= 1
+                if restantes == 0:
+                    grabacion.release()
+                    grabacion = None
+                    print("Grabación finalizada.")
+
         # Lectura de tecla
         key = cv2.waitKey(1) & 0xFF
         if key == ord('q'):
@@ -78,22 +97,23 @@ def main():
         elif key == ord('s'):
             cv2.imwrite('captura.png', display)
             print("Imagen guardada como captura.png")
-        elif key == ord('v'):
-            # Grabar 5 segundos de vídeo
+        elif key == ord('v') and grabacion is None:
+            # Grabar 5 segundos de vídeo con las detecciones; los videos completos se
+            # anotan sin conexión con anotar_video.py
             fourcc = cv2.VideoWriter_fourcc(*'XVID')
-            out = cv2.VideoWriter('clip.avi', fourcc, 20.0,
-                                  (frame.shape[1], frame.shape[0]))
+            grabacion = cv2.VideoWriter('clip.avi', fourcc, 20.0,
+                                        (frame.shape[1], frame.shape[0]))
+            restantes = 100  # ~5 segundos a 20 FPS
             print("Grabando video clip.avi...")
-            for _ in range(100):  # ~5 segundos a 20 FPS
-                ret2, f2 = cap.read()
-                if not ret2:
-                    break
-                out.write(f2)
-            out.release()
-            print("Grabación finalizada.")
 
+    if grabacion is not None:
+        grabacion.release()
     cap.release()
     cv2.destroyAllWindows()
 
+    stats = cap.estadisticas()
+    print(f"Fotogramas descartados: {stats['descartados']} de {stats['capturados']}")
+    print(f"Latencia captura -> inferencia: {stats['latencia_inferencia_ms']:.1f} ms")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
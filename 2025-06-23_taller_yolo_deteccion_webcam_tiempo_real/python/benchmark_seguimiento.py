@@ -0,0 +1,85 @@
+"""
+Benchmark del seguidor SORT con objetos sintéticos
+Mide el tiempo por fotograma (con detección y solo predicción), los cambios de
+ID y el conteo de objetos únicos frente a la verdad; son métricas, no requisitos:
+con muchos objetos cruzándose el seguidor cambia IDs y puede contar de más
+Uso: python benchmark_seguimiento.py [--objetos 300] [--frames 300] [--cada 3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from seguimiento import Seguidor, iou_matriz
+
+
+def escena(objetos, frames, ancho=1920, alto=1080, ruido=2.0, perdida=0.05, semilla=0):
+    """
+    Objetos que se mueven a velocidad constante y rebotan en los bordes
+    Devuelve por fotograma (cajas verdaderas, ids verdaderos, cajas detectadas)
+    """
+    rng = np.random.default_rng(semilla)
+    tam = rng.uniform([20, 40], [40, 80], size=(objetos, 2))
+    pos = rng.uniform([0, 0], [ancho - 40, alto - 80], size=(objetos, 2))
+    vel = rng.uniform(-4, 4, size=(objetos, 2))
+    for _ in range(frames):
+        pos += vel
+        fuera = (pos < 0) | (pos + tam > [ancho, alto])
+        vel[fuera] *= -1
+        cajas = np.hstack((pos, pos + tam))
+        visibles = rng.random(objetos) > perdida
+        detectadas = cajas[visibles] + rng.normal(0, ruido, (visibles.sum(), 4))
+        yield cajas, np.arange(objetos), detectadas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del seguidor")
+    parser.add_argument("--objetos", type=int, default=300)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--cada", type=int, default=3, help="Ejecutar el detector cada N fotogramas")
+    args = parser.parse_args()
+
+    seguidor = Seguidor()
+    t_deteccion, t_prediccion = [], []
+    id_asignado = {}
+    cambios_id = 0
+    iou_propagadas = []
+
+    for i, (verdad, ids_verdad, detectadas) in enumerate(escena(args.objetos, args.frames)):
+        con_detector = i % args.cada == 0
+        inicio = time.perf_counter()
+        if con_detector:
+            ids, cajas, _ = seguidor.actualizar(detectadas, np.zeros(len(detectadas), int))
+        else:
+            ids, cajas, _ = seguidor.actualizar()
+        (t_deteccion if con_detector else t_prediccion).append(time.perf_counter() - inicio)
+
+        if len(ids) == 0:
+            continue
+        # Cada pista se asigna al objeto verdadero con el que más se solapa
+        iou = iou_matriz(cajas, verdad)
+        mejor = iou.argmax(axis=1)
+        for id_pista, objeto, valor in zip(ids, mejor, iou[np.arange(len(ids)), mejor]):
+            if valor < 0.3:
+                continue
+            if objeto in id_asignado and id_asignado[objeto] != id_pista:
+                cambios_id += 1
+            id_asignado[objeto] = id_pista
+        if not con_detector:
+            iou_propagadas.append(iou.max(axis=1).mean())
+
+    td = np.array(t_deteccion) * 1000
+    tp = np.array(t_prediccion) * 1000
+    print(f"{args.objetos} objetos, {args.frames} fotogramas, detector cada {args.cada}")
+    print(f"Fotograma con detector:  media {td.mean():.3f} ms | p95 {np.percentile(td, 95):.3f} ms")
+    if len(tp):
+        print(f"Fotograma solo predicción: media {tp.mean():.3f} ms | p95 {np.percentile(tp, 95):.3f} ms")
+        print(f"IoU medio de las cajas propagadas con la verdad: {np.mean(iou_propagadas):.3f}")
+    unicos = seguidor.conteo_unico(0)
+    print(f"Objetos únicos contados: {unicos} (verdad: {args.objetos}, error {unicos - args.objetos:+d})")
+    print(f"Cambios de ID: {cambios_id} ({cambios_id / args.objetos:.2f} por objeto)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: servidor de inferencia por lotes vs N bucles independientes
+Cada bucle independiente es un proceso con su propio modelo y lotes de tamaño 1,
+como cuando se ejecuta main.py una vez por cámara
+Uso: python benchmark_servidor.py video1.mp4 video2.mp4 ... [--frames 200]
+"""
+
+import argparse
+import multiprocessing as mp
+import time
+
+import cv2
+
+from servidor_inferencia import FlujoCamara, ServidorInferencia
+
+
+def bucle_independiente(ruta, modelo, max_frames, barrera, cola_resultados):
+    """
+    Un proceso = un modelo cargado + inferencia fotograma a fotograma
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(modelo)
+    cap = cv2.VideoCapture(ruta)
+    # Calentamiento y espera a que todos los procesos estén listos
+    ret, frame = cap.read()
+    if ret:
+        model.predict(source=frame, verbose=False)
+    barrera.wait()
+    procesados = 0
+    while procesados < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        model.predict(source=frame, verbose=False)
+        procesados += 1
+    cap.release()
+    cola_resultados.put(procesados)
+
+
+def medir_independientes(videos, modelo, max_frames):
+    ctx = mp.get_context("spawn")
+    cola = ctx.Queue()
+    barrera = ctx.Barrier(len(videos) + 1)
+    procesos = [ctx.Process(target=bucle_independiente, args=(v, modelo, max_frames, barrera, cola))
+                for v in videos]
+
+    for p in procesos:
+        p.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    total = sum(cola.get() for _ in procesos)
+    for p in procesos:
+        p.join()
+    return total, time.perf_counter() - inicio
+
+
+def medir_servidor(videos, modelo, max_frames, espera_max_ms):
+    servidor = ServidorInferencia(modelo, max_lote=len(videos), espera_max_ms=espera_max_ms)
+    # Calentamiento para no medir la primera carga del modelo
+    cap = cv2.VideoCapture(videos[0])
+    ret, frame = cap.read()
+    cap.release()
+    if ret:
+        servidor.inferir(-1, frame)
+
+    inicio = time.perf_counter()
+    flujos = [FlujoCamara(servidor, i, v, max_frames=max_frames).iniciar()
+              for i, v in enumerate(videos)]
+    for f in flujos:
+        f.esperar()
+    duracion = time.perf_counter() - inicio
+
+    servidor.detener()
+    return sum(f.procesados for f in flujos), duracion, servidor.estadisticas()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("videos", nargs="+", help="Videos grabados, uno por flujo")
+    parser.add_argument("--modelo", default="yolov8n.pt")
+    parser.add_argument("--frames", type=int, default=200, help="Fotogramas por flujo")
+    parser.add_argument("--espera", type=float, default=10.0, help="Espera máxima del lote (ms)")
+    args = parser.parse_args()
+
+    print(f"Flujos: {len(args.videos)} | Fotogramas por flujo: {args.frames}")
+
+    total, duracion = medir_independientes(args.videos, args.modelo, args.frames)
+    print(f"Bucles independientes: {total} fotogramas en {duracion:.2f} s "
+          f"-> {total / duracion:.1f} FPS totales ({len(args.videos)} modelos cargados)")
+
+    total, duracion, stats = medir_servidor(args.videos, args.modelo, args.frames, args.espera)
+    print(f"Servidor por lotes:    {total} fotogramas en {duracion:.2f} s "
+          f"-> {total / duracion:.1f} FPS totales")
+    print(f"Lote medio: {stats['lote_medio']:.2f} | {stats['ms_por_lote']:.1f} ms por lote")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,61 @@
 from ultralytics import YOLO
 import cv2, time
 
+from seguimiento import Seguidor
+
 # Cargar el modelo YOLO preentrenado
 model = YOLO('yolov8n.pt')  # Puedes usar 'yolov5s.pt' si prefieres YOLOv5
 
+# Ejecutar el detector cada N fotogramas; entre medias el seguidor propaga las cajas
+DETECTAR_CADA = 3
+seguidor = Seguidor()
+clase_persona = next(i for i, nombre in model.names.items() if nombre == 'person')
+
 # Abrir la cámara web
 cap = cv2.VideoCapture(0)
+frame_idx = 0
 
 while True:
     ret, frame = cap.read()
     if not ret:
         break
-    
+
     start_time = time.time()  # Medir el tiempo de inicio
-    results = model.predict(source=frame, stream=True)  # Detección de objetos
-    
-    # Dibujar las detecciones sobre el frame
-    for result in results:
-        for box in result.boxes:
-            x1, y1, x2, y2 = map(int, box.xyxy[0])  # Coordenadas de la caja
-            conf = box.conf[0]  # Confianza
-            label = result.names[int(box.cls[0])]  # Etiqueta
-            
-            # Dibujar la caja y la etiqueta
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-            cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1-10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
-    
+    if frame_idx % DETECTAR_CADA == 0:
+        result = model.predict(source=frame, verbose=False)[0]  # Detección de objetos
+        boxes = result.boxes
+        ids, cajas, clases = seguidor.actualizar(boxes.xyxy.cpu().numpy(), boxes.cls.cpu().numpy(),
+                                                 boxes.conf.cpu().numpy())
+    else:
+        ids, cajas, clases = seguidor.actualizar()  # Solo predicción
+    frame_idx += 1
+
+    # Dibujar las pistas sobre el frame
+    for id_pista, (x1, y1, x2, y2), cls in zip(ids, cajas.astype(int), clases):
+        label = model.names[int(cls)]  # Etiqueta
+
+        # Dibujar la caja y la etiqueta con el ID estable
+        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+        cv2.putText(frame, f"{label} #{id_pista}", (x1, y1-10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0, 255, 0), 2)
+
     # Calcular FPS
     end_time = time.time()
-    fps = 1 / (end_time - start_time)
-    
-    # Mostrar FPS en el frame
+    fps = 1 / (end_time - start_time + 1e-6)
+
+    # Mostrar FPS y el conteo de personas distintas vistas (no por fotograma)
     cv2.putText(frame, f"FPS: {fps:.2f}", (10, 30),
                 cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-    
+    cv2.putText(frame, f"Personas unicas: {seguidor.conteo_unico(clase_persona)}", (10, 65),
+                cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
     # Mostrar el resultado
     cv2.imshow("Detección de Objetos en Vivo", frame)
-    
+
     # Salir con la tecla 'q'
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
 cap.release()
 cv2.destroyAllWindows()
+print(f"Personas únicas vistas: {seguidor.conteo_unico(clase_persona)}")
@@ -0,0 +1,303 @@
+"""
+Seguimiento multiobjeto estilo SORT
+Cada pista tiene un filtro de Kalman de velocidad constante sobre (cx, cy, w, h);
+todas las pistas se predicen y corrigen a la vez con operaciones NumPy por lotes.
+Como F, Q y R no acoplan coordenadas distintas, la covarianza 8x8 de cada pista se
+guarda como tres bloques (4, N) (posición-posición, posición-velocidad,
+velocidad-velocidad) y la corrección es elemento a elemento, sin invertir matrices.
+La asociación calcula el IoU (vectorizado) solo para los pares que se solapan en x
+y empareja de forma voraz por IoU descendente; las pistas y detecciones que quedan
+sin pareja (objetos pequeños o rápidos) se emparejan después por distancia entre
+centros, con una puerta que crece con los fotogramas predichos sin corregir.
+Entre fotogramas sin detección el seguidor solo predice, así el detector puede
+ejecutarse cada N fotogramas
+Latencia medida con benchmark_seguimiento.py (un núcleo, 300 fotogramas): un
+fotograma con detector tarda ~0.3 ms con 100 pistas, ~0.55 ms con 200 y ~1.0 ms
+con 300 (p95 ~1.2 ms), así que el objetivo de <1 ms solo se cumple hasta unas
+250 pistas; los fotogramas solo de predicción quedan por debajo de 0.1 ms
+"""
+
+import collections
+
+import numpy as np
+
+
+def iou_matriz(a, b):
+    """
+    IoU entre cada caja de a (N, 4) y cada caja de b (M, 4) en formato x1, y1, x2, y2
+    """
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def pares_candidatos(a, b):
+    """
+    Pares (i, j) cuyas cajas se solapan, sin construir la matriz completa
+    Con cientos de objetos repartidos en la imagen son una fracción pequeña de N x M
+    """
+    orden = np.argsort(b[:, 0], kind="stable")
+    b = b[orden]
+    x1_b = b[:, 0].copy()
+    ancho_max = (b[:, 2] - x1_b).max()
+    inicio = np.searchsorted(x1_b, a[:, 0] - ancho_max, side="left")
+    fin = np.searchsorted(x1_b, a[:, 2], side="left")
+    cuenta = fin - inicio
+    filas = np.repeat(np.arange(len(a)), cuenta)
+    # Índices consecutivos desde 'inicio' para cada fila: posición en la salida menos
+    # el comienzo del tramo de la fila, más su inicio
+    indices = np.arange(len(filas)) + np.repeat(inicio - (np.cumsum(cuenta) - cuenta), cuenta)
+    # La búsqueda ordenada solo acota x; se descartan los que no se solapan en y
+    solapan = ((b[:, 1].take(indices) < a[:, 3].take(filas)) &
+               (b[:, 3].take(indices) > a[:, 1].take(filas)))
+    return filas[solapan], orden[indices[solapan]]
+
+
+def iou_pares(a, b, filas, columnas):
+    """
+    IoU de las cajas a[filas] con b[columnas]
+    """
+    ax1, ay1, ax2, ay2 = (a[:, k].take(filas) for k in range(4))
+    bx1, by1, bx2, by2 = (b[:, k].take(columnas) for k in range(4))
+    inter = (np.maximum(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0) *
+             np.maximum(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0))
+    return inter / ((ax2 - ax1) * (ay2 - ay1) + (bx2 - bx1) * (by2 - by1) - inter + 1e-9)
+
+
+def emparejar(filas, columnas, iou, iou_min, n_filas, n_columnas):
+    """
+    Emparejamiento voraz por IoU descendente; devuelve (filas, columnas) elegidas
+    Solo recorre los pares que superan iou_min, que suelen ser pocos por detección
+    """
+    validos = iou >= iou_min
+    filas, columnas, iou = filas[validos], columnas[validos], iou[validos]
+    if len(filas) == 0:
+        return np.empty(0, int), np.empty(0, int)
+    orden = np.argsort(-iou, kind="stable")
+    filas, columnas = filas[orden], columnas[orden]
+
+    # Los pares que son el mejor de su fila y de su columna los elegiría igual el
+    # recorrido voraz: se aceptan de una vez y el bucle solo ve los conflictos
+    mejor_f = np.zeros(len(filas), bool)
+    mejor_f[np.unique(filas, return_index=True)[1]] = True
+    mejor_c = np.zeros(len(filas), bool)
+    mejor_c[np.unique(columnas, return_index=True)[1]] = True
+    mutuos = mejor_f & mejor_c
+    usadas_f = np.zeros(n_filas, bool)
+    usadas_c = np.zeros(n_columnas, bool)
+    usadas_f[filas[mutuos]] = True
+    usadas_c[columnas[mutuos]] = True
+    sel_f, sel_c = filas[mutuos].tolist(), columnas[mutuos].tolist()
+
+    resto = ~mutuos & ~usadas_f[filas] & ~usadas_c[columnas]
+    for f, c in zip(filas[resto].tolist(), columnas[resto].tolist()):
+        if not usadas_f[f] and not usadas_c[c]:
+            usadas_f[f] = usadas_c[c] = True
+            sel_f.append(f)
+            sel_c.append(c)
+    return np.array(sel_f, int), np.array(sel_c, int)
+
+
+def a_centro(cajas):
+    """
+    (4, N) x1, y1, x2, y2 -> (4, N) cx, cy, w, h (una fila por coordenada)
+    """
+    wh = cajas[2:] - cajas[:2]
+    return np.concatenate((cajas[:2] + wh / 2, wh))
+
+
+def a_esquinas(z):
+    """
+    (4, N) cx, cy, w, h -> (4, N) x1, y1, x2, y2
+    """
+    mitad = z[2:] / 2
+    return np.concatenate((z[:2] - mitad, z[:2] + mitad))
+
+
+class Seguidor:
+    # Filas del arreglo de estado (una columna por pista): cada magnitud es una fila
+    # contigua, así las operaciones por bloques no recorren memoria con saltos
+    POS, VEL, P_PP, P_PV, P_VV = (slice(0, 4), slice(4, 8), slice(8, 12), slice(12, 16), slice(16, 20))
+    CONF = 20
+    # Filas del arreglo de enteros
+    ID, CLASE, ACIERTOS, PERDIDOS, PREDICHOS = range(5)
+
+    def __init__(self, iou_min=0.3, dist_max=0.5, max_perdidos=5, min_aciertos=3,
+                 ruido_proceso=1.0, ruido_medicion=10.0):
+        """
+        iou_min: IoU mínimo entre la caja predicha y la detección para asociarlas
+        dist_max: sin IoU suficiente, distancia máxima entre centros en tamaños de caja
+        (raíz del área) por cada fotograma predicho desde la última corrección
+        max_perdidos: actualizaciones con detector sin asociar antes de borrar la pista
+        min_aciertos: asociaciones necesarias para confirmar la pista (y contarla)
+        """
+        self.iou_min = iou_min
+        self.dist_max = dist_max
+        self.max_perdidos = max_perdidos
+        self.min_aciertos = min_aciertos
+        self.q_pos = ruido_proceso
+        # La velocidad tiene que poder seguir cambios de dirección (rebotes, giros) en
+        # pocos fotogramas; con 0.01 la pista se queda atrás y se pierde
+        self.q_vel = ruido_proceso * 0.3
+        self.r = ruido_medicion
+
+        # Estado de todas las pistas en dos arreglos, para que crear y borrar pistas
+        # cueste una sola operación: posición (cx, cy, w, h), velocidad, covarianza
+        # por coordenada (pp, pv, vv) y confianza; e id, clase, aciertos, perdidos y
+        # fotogramas predichos desde la última corrección
+        self.estado = np.zeros((21, 0))
+        self.enteros = np.zeros((5, 0), int)
+
+        self.siguiente_id = 1
+        self.unicos = collections.Counter()  # Pistas confirmadas por clase
+
+    def __len__(self):
+        return self.enteros.shape[1]
+
+    @property
+    def ids(self):
+        return self.enteros[self.ID]
+
+    def _predecir(self):
+        """
+        x = F x y P = F P F' + Q con F = [[1, 1], [0, 1]] en cada coordenada
+        """
+        e = self.estado
+        e[self.POS] += e[self.VEL]
+        # Ancho y alto no pueden volverse negativos
+        np.maximum(e[2:4], 1.0, out=e[2:4])
+        e[self.P_PP] += 2 * e[self.P_PV] + e[self.P_VV] + self.q_pos
+        e[self.P_PV] += e[self.P_VV]
+        e[self.P_VV] += self.q_vel
+        self.enteros[self.PREDICHOS] += 1
+
+    def _corregir(self, asociadas, z):
+        """
+        Corrige todas las pistas a la vez; las no asociadas tienen ganancia cero
+        z: (4, N) medición de cada pista (se ignora donde asociadas es False)
+        """
+        e = self.estado
+        p_pp, p_pv = e[self.P_PP], e[self.P_PV]
+        k_pos = p_pp / (p_pp + self.r) * asociadas
+        k_vel = p_pv / (p_pp + self.r) * asociadas
+        residuo = z - e[self.POS]
+        e[self.POS] += k_pos * residuo
+        e[self.VEL] += k_vel * residuo
+        e[self.P_VV] -= k_vel * p_pv
+        # p_pp y p_pv al final: las expresiones anteriores usan sus valores previos
+        p_pv *= 1 - k_pos
+        p_pp *= 1 - k_pos
+
+    def _crear(self, z, clases, confs):
+        n = z.shape[1]
+        estado = np.zeros((21, n))
+        estado[self.POS] = z
+        estado[self.P_PP] = 10.0
+        estado[self.P_VV] = 1e3
+        estado[self.CONF] = confs
+        enteros = np.zeros((5, n), int)
+        enteros[self.ID] = np.arange(self.siguiente_id, self.siguiente_id + n)
+        enteros[self.CLASE] = clases
+        enteros[self.ACIERTOS] = 1
+        self.siguiente_id += n
+        self.estado = np.concatenate((self.estado, estado), axis=1)
+        self.enteros = np.concatenate((self.enteros, enteros), axis=1)
+        if self.min_aciertos <= 1:
+            self.unicos.update(clases.tolist())
+
+    def _emparejar_distancia(self, filas, columnas, z, clases):
+        """
+        Empareja las pistas 'filas' con las detecciones 'columnas' (las que no alcanzaron
+        iou_min) por distancia entre centros, voraz de la más cercana a la más lejana
+        La distancia se mide en tamaños de la caja predicha y se admite hasta dist_max por
+        fotograma predicho: un objeto de 20 px a 4 px por fotograma con el detector cada
+        3 fotogramas se desplaza 12 px entre detecciones y su IoU cae por debajo de 0.3
+        """
+        pos = self.estado[self.POS, filas]
+        puerta = self.dist_max * np.sqrt(pos[2] * pos[3]) * self.enteros[self.PREDICHOS, filas]
+        d = np.hypot(pos[0, :, None] - z[0, columnas], pos[1, :, None] - z[1, columnas]) / puerta[:, None]
+        d[self.enteros[self.CLASE, filas, None] != clases[columnas]] = np.inf
+        f, c = np.nonzero(d <= 1.0)
+        # emparejar() elige por puntuación descendente: la puntuación es -distancia
+        f, c = emparejar(f, c, -d[f, c], -1.0, len(filas), len(columnas))
+        return filas[f], columnas[c]
+
+    def actualizar(self, cajas=None, clases=None, confs=None):
+        """
+        Avanza un fotograma. Sin 'cajas' solo se predicen las pistas (fotograma sin detector)
+        cajas: (M, 4) x1, y1, x2, y2 | clases: (M,) enteros | confs: (M,)
+        Devuelve (ids, cajas, clases) de las pistas confirmadas
+        """
+        self._predecir()
+        if cajas is None:
+            return self.pistas()
+
+        cajas = np.asarray(cajas, dtype=np.float64).reshape(-1, 4)
+        m = len(cajas)
+        clases = np.zeros(m, int) if clases is None else np.asarray(clases, int)
+        confs = np.ones(m) if confs is None else np.asarray(confs, np.float64)
+
+        n = len(self)
+        asociadas = np.zeros(n, bool)
+        nuevas = np.ones(m, bool)
+        z = a_centro(np.ascontiguousarray(cajas.T))
+        if n and m:
+            # Vista (N, 4) sobre las filas de esquinas: cada columna sigue siendo contigua
+            predichas = a_esquinas(self.estado[self.POS]).T
+            filas, columnas = pares_candidatos(predichas, cajas)
+            iou = iou_pares(predichas, cajas, filas, columnas)
+            # Solo se asocian pistas y detecciones de la misma clase
+            iou[self.enteros[self.CLASE, filas] != clases[columnas]] = 0.0
+            f, c = emparejar(filas, columnas, iou, self.iou_min, n, m)
+            asociadas[f] = True
+            nuevas[c] = False
+            libres_f, libres_c = np.flatnonzero(~asociadas), np.flatnonzero(nuevas)
+            if len(libres_f) and len(libres_c):
+                f2, c2 = self._emparejar_distancia(libres_f, libres_c, z, clases)
+                asociadas[f2] = True
+                nuevas[c2] = False
+                f, c = np.concatenate((f, f2)), np.concatenate((c, c2))
+            if len(f):
+                # Las pistas sin asociar se miden en su propia predicción (residuo cero)
+                medidas = self.estado[self.POS].copy()
+                medidas[:, f] = z[:, c]
+                self._corregir(asociadas, medidas)
+                self.estado[self.CONF, f] = confs[c]
+                self.enteros[self.PREDICHOS, f] = 0
+
+        aciertos = self.enteros[self.ACIERTOS]
+        recien = asociadas & (aciertos == self.min_aciertos - 1)
+        if recien.any():
+            self.unicos.update(self.enteros[self.CLASE, recien].tolist())
+        aciertos += asociadas
+        perdidos = self.enteros[self.PERDIDOS]
+        perdidos += 1
+        perdidos[asociadas] = 0
+        vivas = perdidos <= self.max_perdidos
+        if not vivas.all():
+            self.estado = self.estado[:, vivas]
+            self.enteros = self.enteros[:, vivas]
+
+        if nuevas.any():
+            self._crear(z[:, nuevas], clases[nuevas], confs[nuevas])
+        return self.pistas()
+
+    def pistas(self):
+        """
+        (ids, cajas x1 y1 x2 y2, clases) de las pistas confirmadas y vistas recientemente
+        """
+        enteros = self.enteros
+        visibles = (enteros[self.ACIERTOS] >= self.min_aciertos) & (enteros[self.PERDIDOS] == 0)
+        return (enteros[self.ID, visibles], a_esquinas(self.estado[self.POS][:, visibles]).T,
+                enteros[self.CLASE, visibles])
+
+    def conteo_unico(self, clase):
+        """
+        Objetos distintos de 'clase' vistos desde el inicio (pistas confirmadas)
+        """
+        return self.unicos[clase]
@@ -0,0 +1,245 @@
+"""
+Servidor de inferencia YOLO para varias cámaras
+Carga el modelo una sola vez, agrupa los fotogramas de N fuentes en micro-lotes
+dinámicos (con un tiempo máximo de espera) y devuelve el resultado a cada flujo
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+
+
+class ServidorDetenido(RuntimeError):
+    """
+    El servidor se detuvo antes de procesar el fotograma
+    """
+
+
+class ServidorInferencia:
+    def __init__(self, modelo="yolov8n.pt", max_lote=8, espera_max_ms=10.0, predictor=None):
+        """
+        Inicia el hilo que arma y ejecuta los lotes
+        modelo: pesos de YOLO (se cargan una sola vez para todos los flujos)
+        max_lote: número máximo de fotogramas por llamada al modelo
+        espera_max_ms: tiempo máximo que espera el primer fotograma de un lote a que se llene
+        predictor: función lista_de_frames -> lista_de_resultados (reemplaza al modelo YOLO)
+        """
+        if predictor is None:
+            from ultralytics import YOLO
+            yolo = YOLO(modelo)
+            self.names = yolo.names
+
+            def predictor(frames):
+                return yolo.predict(source=frames, verbose=False)
+        else:
+            self.names = None
+
+        self.predictor = predictor
+        self.max_lote = max_lote
+        self.espera_max = espera_max_ms / 1000.0
+
+        self.cola = queue.Queue()
+        self.activo = True
+        # Ordena enviar() y detener(): nada entra a la cola después de detener
+        self.candado = threading.Lock()
+
+        # Estadísticas
+        self.lotes = 0
+        self.procesados = 0
+        self.tiempo_inferencia = 0.0
+
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+        self.hilo.start()
+
+    def enviar(self, id_flujo, frame):
+        """
+        Encola un fotograma del flujo id_flujo
+        Devuelve un Future que se completa con el resultado de ese fotograma; si el
+        servidor ya se detuvo, el Future lleva la excepción ServidorDetenido
+        """
+        futuro = Future()
+        with self.candado:
+            if self.activo:
+                self.cola.put((id_flujo, frame, futuro))
+                return futuro
+        futuro.set_exception(ServidorDetenido("el servidor de inferencia está detenido"))
+        return futuro
+
+    def inferir(self, id_flujo, frame, timeout=None):
+        """
+        Envía un fotograma y espera su resultado
+        """
+        return self.enviar(id_flujo, frame).result(timeout)
+
+    def _armar_lote(self):
+        """
+        Espera el primer fotograma y completa el lote hasta max_lote o hasta el plazo
+        """
+        try:
+            primero = self.cola.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        lote = [primero]
+        plazo = time.perf_counter() + self.espera_max
+        while len(lote) < self.max_lote:
+            restante = plazo - time.perf_counter()
+            try:
+                if restante <= 0:
+                    lote.append(self.cola.get_nowait())
+                else:
+                    lote.append(self.cola.get(timeout=restante))
+            except queue.Empty:
+                break
+        return lote
+
+    def _bucle(self):
+        while self.activo:
+            lote = self._armar_lote()
+            if not lote:
+                continue
+
+            frames = [frame for _, frame, _ in lote]
+            inicio = time.perf_counter()
+            try:
+                resultados = list(self.predictor(frames))
+                if len(resultados) != len(lote):
+                    # Con zip los fotogramas sobrantes quedarían sin resultado para siempre
+                    raise RuntimeError(f"el predictor devolvió {len(resultados)} resultados "
+                                       f"para un lote de {len(lote)} fotogramas")
+            except Exception as e:
+                for _, _, futuro in lote:
+                    futuro.set_exception(e)
+                continue
+            self.tiempo_inferencia += time.perf_counter() - inicio
+            self.lotes += 1
+            self.procesados += len(lote)
+
+            for (_, _, futuro), resultado in zip(lote, resultados):
+                futuro.set_result(resultado)
+
+    def estadisticas(self):
+        """
+        Devuelve lotes ejecutados, tamaño medio de lote y tiempo medio por lote (ms)
+        """
+        return {
+            "lotes": self.lotes,
+            "procesados": self.procesados,
+            "lote_medio": self.procesados / self.lotes if self.lotes else 0.0,
+            "ms_por_lote": 1000.0 * self.tiempo_inferencia / self.lotes if self.lotes else 0.0,
+        }
+
+    def detener(self):
+        """
+        Detiene el hilo del servidor; los fotogramas pendientes terminan con ServidorDetenido
+        """
+        with self.candado:
+            self.activo = False
+        self.hilo.join(timeout=1.0)
+        while True:
+            try:
+                _, _, futuro = self.cola.get_nowait()
+            except queue.Empty:
+                break
+            futuro.set_exception(ServidorDetenido("el servidor de inferencia se detuvo"))
+
+
+class FlujoCamara:
+    def __init__(self, servidor, id_flujo, fuente, max_frames=None, al_resultado=None):
+        """
+        Lee una fuente en su propio hilo y envía cada fotograma al servidor
+        Cada flujo mantiene un único fotograma en vuelo, así un lote junta un
+        fotograma de cada cámara
+        al_resultado: función (id_flujo, frame, resultado) llamada por cada fotograma
+        """
+        self.servidor = servidor
+        self.id_flujo = id_flujo
+        self.fuente = fuente
+        self.max_frames = max_frames
+        self.al_resultado = al_resultado
+        self.procesados = 0
+        self.latencias = []
+        self.detenido = threading.Event()
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+
+    def iniciar(self):
+        self.hilo.start()
+        return self
+
+    def esperar(self, timeout=None):
+        self.hilo.join(timeout)
+
+    def detener(self):
+        """
+        Pide al hilo que termine después del fotograma en curso
+        """
+        self.detenido.set()
+
+    def _bucle(self):
+        cap = cv2.VideoCapture(self.fuente)
+        try:
+            while (self.max_frames is None or self.procesados < self.max_frames) and not self.detenido.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                inicio = time.perf_counter()
+                try:
+                    resultado = self.servidor.inferir(self.id_flujo, frame)
+                except ServidorDetenido:
+                    break
+                self.latencias.append(time.perf_counter() - inicio)
+                self.procesados += 1
+                if self.al_resultado is not None:
+                    self.al_resultado(self.id_flujo, frame, resultado)
+        finally:
+            cap.release()
+
+
+def main():
+    """
+    Muestra las detecciones de varias fuentes usando un único modelo
+    Uso: python servidor_inferencia.py 0 1 video.mp4 ...
+    """
+    import sys
+
+    fuentes = [int(f) if f.isdigit() else f for f in sys.argv[1:]] or [0]
+    servidor = ServidorInferencia(max_lote=len(fuentes))
+
+    # Último fotograma anotado de cada flujo (se muestra desde el hilo principal)
+    ultimos = {}
+    candado = threading.Lock()
+
+    def al_resultado(id_flujo, frame, resultado):
+        anotado = resultado.plot()
+        with candado:
+            ultimos[id_flujo] = anotado
+
+    flujos = [FlujoCamara(servidor, i, f, al_resultado=al_resultado).iniciar()
+              for i, f in enumerate(fuentes)]
+
+    print("Presiona 'q' para salir")
+    while any(f.hilo.is_alive() for f in flujos):
+        with candado:
+            pendientes = list(ultimos.items())
+            ultimos.clear()
+        for id_flujo, anotado in pendientes:
+            cv2.imshow(f"Flujo {id_flujo}", anotado)
+        if cv2.waitKey(10) & 0xFF == ord('q'):
+            break
+
+    for f in flujos:
+        f.detener()
+    servidor.detener()
+    for f in flujos:
+        f.esperar(timeout=2.0)
+    cv2.destroyAllWindows()
+    stats = servidor.estadisticas()
+    print(f"Lotes: {stats['lotes']} | Lote medio: {stats['lote_medio']:.2f} "
+          f"| {stats['ms_por_lote']:.1f} ms por lote")
+
+
+if __name__ == "__main__":
+    main()
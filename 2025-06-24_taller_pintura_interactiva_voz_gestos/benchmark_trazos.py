@@ -0,0 +1,113 @@
+"""
+Benchmark del motor de trazos contra el sello cuadrado original
+Simula el dedo moviéndose rápido (posiciones a 30 fps) y mide: huecos en el trazo,
+píxeles pintados por el índice negativo que da la vuelta al lienzo, tiempo por
+actualización en lienzos de distinto tamaño, tiempo de deshacer y memoria del historial
+Uso: python benchmark_trazos.py [--trazos 40] [--puntos 60] [--velocidad 40] [--radio 10]
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from trazos import LienzoTrazos
+
+TAMANOS = {"800x600": (600, 800), "1920x1080": (1080, 1920), "3840x2160": (2160, 3840)}
+
+
+def recorridos(trazos, puntos, velocidad, semilla=0):
+    """
+    Recorridos del dedo en coordenadas normalizadas: curvas suaves con 'velocidad'
+    píxeles por fotograma (sobre 800 de ancho) que rebotan en los bordes del lienzo,
+    donde el sello original usa índices negativos
+    """
+    rng = np.random.default_rng(semilla)
+    salida = []
+    for _ in range(trazos):
+        angulo = np.cumsum(rng.normal(0, 0.3, puntos)) + rng.uniform(0, 2 * np.pi)
+        pasos = velocidad / 800 * np.stack((np.cos(angulo), np.sin(angulo)), axis=1)
+        camino = rng.uniform(0, 1, 2) + np.cumsum(pasos, axis=0)
+        # Reflejar en [0, 1]: el dedo sigue dentro del cuadro de la cámara
+        camino = np.abs(camino) % 2
+        salida.append(np.where(camino > 1, 2 - camino, camino))
+    return salida
+
+
+def sello_original(canvas, x, y, b, color):
+    canvas[y - b:y + b, x - b:x + b] = color
+
+
+def huecos(canvas, recorrido, alto, ancho, radio):
+    """
+    Fracción del trazo ideal (polilínea gruesa) que quedó sin pintar
+    """
+    ideal = np.zeros((alto, ancho), np.uint8)
+    puntos = np.rint(recorrido * [ancho, alto]).astype(np.int32)
+    cv2.polylines(ideal, [puntos], False, 1, thickness=2 * radio - 4)
+    pintado = (canvas != 255).any(axis=2)
+    dentro = ideal.astype(bool)
+    return 1.0 - pintado[dentro].mean() if dentro.any() else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del motor de trazos")
+    parser.add_argument("--trazos", type=int, default=40)
+    parser.add_argument("--puntos", type=int, default=60, help="Fotogramas por trazo")
+    parser.add_argument("--velocidad", type=float, default=40.0, help="Píxeles por fotograma")
+    parser.add_argument("--radio", type=int, default=10)
+    args = parser.parse_args()
+
+    caminos = recorridos(args.trazos, args.puntos, args.velocidad)
+    color = (0, 0, 255)
+
+    # Calidad en el lienzo de la aplicación: huecos y píxeles que dan la vuelta
+    alto, ancho = TAMANOS["800x600"]
+    h_original, h_motor, vuelta = [], [], 0
+    for camino in caminos:
+        canvas = np.full((alto, ancho, 3), 255, np.uint8)
+        for x, y in camino:
+            xi, yi = int(x * ancho), int(y * alto)
+            sello_original(canvas, xi, yi, args.radio, color)
+            b = args.radio
+            # Un índice negativo toma píxeles del otro extremo (o no pinta nada)
+            if xi - b < 0 or yi - b < 0:
+                vuelta += 1
+        h_original.append(huecos(canvas, camino, alto, ancho, args.radio))
+        lienzo = LienzoTrazos(alto, ancho)
+        for x, y in camino:
+            lienzo.mover(x * ancho, y * alto, color, args.radio)
+        lienzo.levantar()
+        h_motor.append(huecos(lienzo.canvas, camino, alto, ancho, args.radio))
+    print(f"{args.trazos} trazos de {args.puntos} puntos a {args.velocidad:.0f} px/fotograma, radio {args.radio}")
+    print(f"  Huecos en el trazo: sello original {100 * np.mean(h_original):.1f}% | "
+          f"motor {100 * np.mean(h_motor):.1f}%")
+    print(f"  Sellos del original con índice negativo (dan la vuelta o se pierden): {vuelta}")
+
+    # Costo por actualización y de deshacer según el tamaño del lienzo
+    for nombre, (alto, ancho) in TAMANOS.items():
+        lienzo = LienzoTrazos(alto, ancho, max_historial=args.trazos)
+        escala = np.array([800, 600])  # Mismo recorrido en píxeles en todos los lienzos
+        tiempos = []
+        for camino in caminos:
+            for x, y in camino * escala:
+                inicio = time.perf_counter()
+                lienzo.mover(x, y, color, args.radio)
+                tiempos.append(time.perf_counter() - inicio)
+            lienzo.levantar()
+        kb_historial = lienzo.bytes_historial() / 1024
+        t_deshacer = []
+        for _ in range(min(10, len(lienzo.historial))):
+            inicio = time.perf_counter()
+            lienzo.deshacer()
+            t_deshacer.append(time.perf_counter() - inicio)
+        t = np.array(tiempos) * 1000
+        print(f"\n  Lienzo {nombre}: mover {t.mean():.3f} ms (p95 {np.percentile(t, 95):.3f}) | "
+              f"deshacer {1000 * np.mean(t_deshacer):.2f} ms")
+        print(f"    Historial de {args.trazos} trazos: {kb_historial:.1f} KB | "
+              f"una copia del lienzo por trazo: {args.trazos * alto * ancho * 3 / 2 ** 20:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Benchmark de los comandos de voz: bucle bloqueante contra SubsistemaVoz
+Reproduce un WAV en tiempo real como si fuera el micrófono y mide los fps del bucle
+de dibujo, el peor fotograma y la latencia desde el fin de la frase hasta que el
+comando se aplica en el lienzo.
+Sin WAV se genera uno sintético con frases (ráfagas tonales) separadas por silencio;
+el reconocedor se simula con un guion de comandos y una latencia de red fija
+(--google usa el reconocedor real y necesita conexión)
+Uso: python benchmark_voz.py [audio.wav ...] [--comandos 5] [--latencia-ms 400] [--google]
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+import wave
+
+import cv2
+import numpy as np
+
+from voz_comandos import COMANDOS, DetectorVoz, FuenteWav, SubsistemaVoz, interpretar, reconocedor_google
+
+
+def wav_sintetico(ruta, comandos, tasa=16000, semilla=0):
+    """
+    Silencio con ruido de fondo y una "frase" de 0.6-1.2 s cada ~3 s
+    """
+    rng = np.random.default_rng(semilla)
+    partes = []
+    for _ in range(comandos):
+        partes.append(rng.normal(0, 60, int(tasa * rng.uniform(1.0, 2.0))))
+        duracion = rng.uniform(0.6, 1.2)
+        t = np.arange(int(tasa * duracion)) / tasa
+        # Armónicos de una voz de ~150 Hz con envolvente silábica
+        voz = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+        envolvente = 0.5 + 0.5 * np.abs(np.sin(2 * np.pi * 3 * t))
+        partes.append(4000 * voz * envolvente + rng.normal(0, 60, len(t)))
+    partes.append(rng.normal(0, 60, tasa))
+    muestras = np.clip(np.concatenate(partes), -32768, 32767).astype(np.int16)
+    with wave.open(ruta, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(tasa)
+        wav.writeframes(muestras.tobytes())
+
+
+def reconocedor_guion(latencia_ms):
+    """
+    Simula el reconocedor: devuelve las palabras de COMANDOS en orden tras latencia_ms
+    """
+    palabras = [palabra for palabra, _, _ in COMANDOS]
+    contador = [0]
+
+    def reconocer(segmento):
+        time.sleep(latencia_ms / 1000.0)
+        texto = palabras[contador[0] % len(palabras)]
+        contador[0] += 1
+        return texto
+
+    return reconocer
+
+
+def dibujar(frame, lienzo, i):
+    """
+    Trabajo de un fotograma del bucle de pintura (sin cámara ni MediaPipe)
+    """
+    frame = cv2.flip(frame, 1)
+    x, y = 100 + (i * 7) % 600, 100 + (i * 3) % 400
+    cv2.circle(frame, (x, y), 10, (0, 0, 255), -1)
+    lienzo[y - 10:y + 10, x - 10:x + 10] = (0, 0, 255)
+    return frame
+
+
+def resumen(nombre, tiempos, latencias, aplicados, total):
+    t = np.array(tiempos) * 1000
+    lat = np.array(latencias) * 1000
+    print(f"  {nombre}")
+    print(f"    {len(t) / (t.sum() / 1000):6.1f} fps | fotograma medio {t.mean():7.2f} ms | "
+          f"p95 {np.percentile(t, 95):7.2f} ms | máximo {t.max():7.1f} ms")
+    if len(lat):
+        print(f"    Comandos aplicados {aplicados}/{total} | latencia fin de frase -> lienzo: "
+              f"media {lat.mean():.0f} ms | máx {lat.max():.0f} ms")
+    else:
+        print(f"    Comandos aplicados 0/{total}")
+
+
+def bucle_bloqueante(ruta, reconocer, total):
+    """
+    Como el main.py original: cada fotograma espera una frase completa y su reconocimiento
+    """
+    fuente = FuenteWav(ruta)
+    detector = DetectorVoz(fuente.tasa)
+    bloques = fuente.bloques(threading.Event())
+    frame = np.zeros((480, 640, 3), np.uint8)
+    lienzo = np.full((600, 800, 3), 255, np.uint8)
+    tiempos, latencias = [], []
+    aplicados, i = 0, 0
+    terminado = False
+    while not terminado:
+        inicio = time.perf_counter()
+        dibujar(frame, lienzo, i)
+        # Equivalente a recognizer.listen(source) + recognize_google(audio)
+        segmento = None
+        for bloque, t in bloques:
+            segmento = detector.procesar(bloque, t)
+            if segmento is not None:
+                break
+        else:
+            terminado = True
+        if segmento is not None and interpretar(reconocer(segmento)) is not None:
+            aplicados += 1
+            latencias.append(time.perf_counter() - segmento.t_fin_voz)
+        tiempos.append(time.perf_counter() - inicio)
+        i += 1
+    resumen("Bloqueante (listen en cada fotograma)", tiempos, latencias, aplicados, total)
+
+
+def bucle_no_bloqueante(ruta, reconocer, total):
+    voz = SubsistemaVoz(FuenteWav(ruta), reconocer=reconocer, mostrar=False).iniciar()
+    frame = np.zeros((480, 640, 3), np.uint8)
+    lienzo = np.full((600, 800, 3), 255, np.uint8)
+    tiempos, latencias = [], []
+    aplicados, i = 0, 0
+    while voz.activo:
+        inicio = time.perf_counter()
+        dibujar(frame, lienzo, i)
+        for comando in voz.comandos():
+            aplicados += 1
+            latencias.append(time.perf_counter() - comando.t_fin_voz)
+        # Ritmo de cámara a 30 fps: el resto del fotograma se espera como en cap.read()
+        time.sleep(max(0.0, 1 / 30 - (time.perf_counter() - inicio)))
+        tiempos.append(time.perf_counter() - inicio)
+        i += 1
+    voz.cerrar()
+    s = voz.estadisticas()
+    resumen("SubsistemaVoz (cámara a 30 fps)", tiempos, latencias, aplicados, total)
+    print(f"    Frases {s['frases']} | descartadas {s['descartadas']} | "
+          f"reconocimiento medio {s['reconocimiento_ms']:.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de comandos de voz")
+    parser.add_argument("wavs", nargs="*", help="Grabaciones con comandos (PCM 16 bits)")
+    parser.add_argument("--comandos", type=int, default=5, help="Frases del WAV sintético")
+    parser.add_argument("--latencia-ms", type=float, default=400.0, help="Latencia simulada del reconocedor")
+    parser.add_argument("--google", action="store_true", help="Usar el reconocedor real")
+    args = parser.parse_args()
+
+    nuevo_reconocedor = reconocedor_google if args.google else lambda: reconocedor_guion(args.latencia_ms)
+    with tempfile.TemporaryDirectory() as carpeta:
+        wavs = args.wavs
+        if not wavs:
+            wavs = [os.path.join(carpeta, "sintetico.wav")]
+            wav_sintetico(wavs[0], args.comandos)
+        for ruta in wavs:
+            fuente = FuenteWav(ruta)
+            print(f"\n{os.path.basename(ruta)}: {len(fuente.muestras) / fuente.tasa:.1f} s de audio"
+                  + ("" if args.wavs else f", {args.comandos} frases"))
+            total = args.comandos if not args.wavs else "?"
+            bucle_bloqueante(ruta, nuevo_reconocedor(), total)
+            bucle_no_bloqueante(ruta, nuevo_reconocedor(), total)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,19 @@
 import cv2
 import mediapipe as mp
-import speech_recognition as sr
-import numpy as np
+
+from trazos import LienzoTrazos
+from voz_comandos import FuenteMicrofono, FuenteWav, SubsistemaVoz
 
 # Inicializar MediaPipe Hands
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands()
 mp_drawing = mp.solutions.drawing_utils
 
-# Inicializar el reconocimiento de voz
-recognizer = sr.Recognizer()
+# Reconocimiento de voz en segundo plano: captura, detección de voz y reconocimiento
+# en sus propios hilos; el bucle solo recoge los comandos ya interpretados
+FUENTE_WAV = None  # Ruta a un .wav para probar sin micrófono
+fuente = FuenteWav(FUENTE_WAV) if FUENTE_WAV else FuenteMicrofono()
+voz = SubsistemaVoz(fuente).iniciar()
 
 # Configurar la webcam
 cap = cv2.VideoCapture(0)
@@ -17,18 +21,9 @@ cap = cv2.VideoCapture(0)
 # Variables
 brush_color = (0, 0, 255)  # Color inicial: rojo
 brush_size = 10  # Tamaño del pincel
-canvas = np.ones((600, 800, 3), dtype=np.uint8) * 255  # Lienzo blanco
-
-# Función para escuchar comandos de voz
-def listen_for_commands():
-    with sr.Microphone() as source:
-        audio = recognizer.listen(source)
-        try:
-            command = recognizer.recognize_google(audio).lower()
-            print("Comando de voz:", command)
-            return command
-        except sr.UnknownValueError:
-            return None
+# Lienzo blanco; los trazos unen las posiciones del dedo y se pueden deshacer
+lienzo = LienzoTrazos(600, 800, max_salto=150)
+canvas = lienzo.canvas
 
 # Función para detectar gestos de la mano
 def detect_hand_gestures(frame):
@@ -50,22 +45,23 @@ while True:
     x, y = detect_hand_gestures(frame)
 
     if x is not None and y is not None:
-        x, y = int(x * w), int(y * h)
-        cv2.circle(frame, (x, y), brush_size, brush_color, -1)
-        canvas[y - brush_size:y + brush_size, x - brush_size:x + brush_size] = brush_color
+        cv2.circle(frame, (int(x * w), int(y * h)), brush_size, brush_color, -1)
+        # Coordenadas normalizadas al tamaño del lienzo (no al de la cámara)
+        lienzo.mover(x * canvas.shape[1], y * canvas.shape[0], brush_color, brush_size)
+    else:
+        lienzo.levantar()
 
-    # Leer comando de voz
-    command = listen_for_commands()
-    if command:
-        if "rojo" in command:
-            brush_color = (0, 0, 255)  # Rojo
-        elif "verde" in command:
-            brush_color = (0, 255, 0)  # Verde
-        elif "pincel" in command:
-            brush_size = 10  # Tamaño de pincel normal
-        elif "limpiar" in command:
-            canvas.fill(255)  # Limpiar el lienzo
-        elif "guardar" in command:
+    # Comandos de voz reconocidos desde el último fotograma (no bloquea)
+    for comando in voz.comandos():
+        if comando.accion == "color":
+            brush_color = comando.valor  # Rojo o verde
+        elif comando.accion == "tamano":
+            brush_size = comando.valor  # Tamaño de pincel normal
+        elif comando.accion == "limpiar":
+            lienzo.limpiar()  # Limpiar el lienzo
+        elif comando.accion == "deshacer":
+            lienzo.deshacer()  # Quitar el último trazo
+        elif comando.accion == "guardar":
             cv2.imwrite('obra.png', canvas)  # Guardar la imagen
 
     # Mostrar el lienzo y la cámara
@@ -75,5 +71,6 @@ while True:
     if cv2.waitKey(1) & 0xFF == ord('q'):
         break
 
+voz.cerrar()
 cap.release()
 cv2.destroyAllWindows()
@@ -0,0 +1,252 @@
+"""
+Motor de trazos para el lienzo de pintura
+Cada nueva posición del dedo se une con la anterior con un segmento de pincel redondo,
+así los movimientos rápidos no dejan huecos entre fotogramas. El segmento se rasteriza
+con antialiasing en una sola pasada NumPy sobre su rectángulo sucio (recortado al
+lienzo), de modo que el costo depende del tamaño del pincel y del recorrido, no del
+lienzo. La cobertura de cada píxel dentro de un trazo se acumula con el máximo, así
+las uniones entre segmentos no se oscurecen.
+Para deshacer se guarda cada trazo como sus puntos, color y radio (no copias del
+lienzo); deshacer restaura solo los píxeles que cubría el trazo y vuelve a pintar
+allí únicamente los segmentos de otros trazos que los tocan
+"""
+
+import collections
+import math
+
+import numpy as np
+
+Trazo = collections.namedtuple("Trazo", "color radio puntos caja")
+
+
+class LienzoTrazos:
+    def __init__(self, alto, ancho, fondo=(255, 255, 255), max_historial=200, max_salto=None):
+        """
+        max_historial: trazos que se pueden deshacer; los más antiguos se fijan en la base
+        max_salto: distancia (px) a partir de la cual un salto del dedo empieza un trazo
+        nuevo en lugar de unirse (p. ej. al perder y recuperar la mano); None no corta
+        """
+        self.fondo = np.array(fondo, dtype=np.uint8)
+        self.canvas = np.empty((alto, ancho, 3), dtype=np.uint8)
+        self.canvas[:] = self.fondo
+        # Lienzo con los trazos que ya no se pueden deshacer (se crea al necesitarlo)
+        self.base = None
+        self.max_historial = max_historial
+        self.max_salto = max_salto
+        self.historial = collections.deque()
+        # Cobertura del trazo en curso y huella del trazo que se deshace; solo se
+        # toca (y se limpia) su caja sucia
+        self.cobertura = np.zeros((alto, ancho), dtype=np.float32)
+        self.huella = np.zeros((alto, ancho), dtype=bool)
+
+        self.actual = None  # (color, radio, lista de puntos, caja)
+
+    @property
+    def forma(self):
+        return self.canvas.shape[:2]
+
+    def mover(self, x, y, color, radio):
+        """
+        Nueva posición del dedo en coordenadas del lienzo; continúa el trazo en curso
+        o empieza uno si no hay, si cambió el pincel o si el salto es demasiado grande
+        """
+        color = tuple(int(c) for c in color)
+        # Redondeado a float32 como se guarda en el historial, para repintar igual al deshacer
+        punto = tuple(np.float32((x, y)).tolist())
+        if self.actual is not None:
+            c, r, puntos, _ = self.actual
+            x0, y0 = puntos[-1]
+            salto = self.max_salto is not None and math.hypot(x - x0, y - y0) > self.max_salto
+            if c != color or r != radio or salto:
+                self.levantar()
+        if self.actual is None:
+            self.actual = (color, radio, [punto], None)
+            caja = self._segmento(punto, punto, radio, color)
+        else:
+            caja = self._segmento(self.actual[2][-1], punto, radio, color)
+            self.actual[2].append(punto)
+        self.actual = self.actual[:3] + (_unir(self.actual[3], caja),)
+        return caja
+
+    def levantar(self):
+        """
+        Termina el trazo en curso (mano fuera de cuadro) y lo guarda en el historial
+        """
+        if self.actual is None:
+            return
+        color, radio, puntos, caja = self.actual
+        self.actual = None
+        if caja is None:
+            return
+        x0, y0, x1, y1 = caja
+        self.cobertura[y0:y1, x0:x1] = 0.0
+        self.historial.append(Trazo(color, radio, np.array(puntos, dtype=np.float32), caja))
+        while len(self.historial) > self.max_historial:
+            self._fijar(self.historial.popleft())
+
+    def deshacer(self):
+        """
+        Quita el último trazo; devuelve su caja o None si no hay nada que deshacer
+        """
+        self.levantar()
+        if not self.historial:
+            return None
+        trazo = self.historial.pop()
+        x0, y0, x1, y1 = trazo.caja
+
+        # Huella: píxeles que el trazo llegó a cubrir; se vuelven al fondo (o a la base)
+        huella = self.huella[y0:y1, x0:x1]
+        for p0, p1 in _pares(trazo.puntos):
+            caja = self._caja(p0, p1, trazo.radio, trazo.caja)
+            if caja is not None:
+                cx0, cy0, cx1, cy1 = caja
+                huella[cy0 - y0:cy1 - y0, cx0 - x0:cx1 - x0] |= self._cobertura(p0, p1, trazo.radio, caja) > 0
+        region = self.canvas[y0:y1, x0:x1]
+        region[huella] = self.fondo if self.base is None else self.base[y0:y1, x0:x1][huella]
+
+        # Solo los segmentos cuya caja toca la huella (tabla de sumas acumuladas)
+        integral = np.zeros((y1 - y0 + 1, x1 - x0 + 1), dtype=np.int32)
+        integral[1:, 1:] = huella.cumsum(axis=0, dtype=np.int32).cumsum(axis=1)
+        for otro in self.historial:
+            ox0, oy0, ox1, oy1 = otro.caja
+            if not (ox0 < x1 and x0 < ox1 and oy0 < y1 and y0 < oy1):
+                continue
+            cajas = _cajas_segmentos(otro.puntos, otro.radio, trazo.caja)
+            cx0, cy0, cx1, cy1 = (cajas - (x0, y0, x0, y0)).T
+            tocan = np.flatnonzero((cx1 > cx0) & (cy1 > cy0) &
+                                   (integral[cy1, cx1] - integral[cy0, cx1] - integral[cy1, cx0] +
+                                    integral[cy0, cx0] > 0))
+            if len(tocan) == 0:
+                continue
+            pares = _pares(otro.puntos)
+            pintadas = [self._segmento(*pares[i], otro.radio, otro.color, trazo.caja, mascara=self.huella)
+                        for i in tocan]
+            self._limpiar_cobertura(pintadas)
+        huella[:] = False
+        return trazo.caja
+
+    def limpiar(self):
+        self.actual = None
+        self.cobertura[:] = 0.0
+        self.historial.clear()
+        self.base = None
+        self.canvas[:] = self.fondo
+
+    def bytes_historial(self):
+        return sum(t.puntos.nbytes + 64 for t in self.historial)
+
+    def _fijar(self, trazo):
+        """
+        Pinta un trazo antiguo en la base: ya no se podrá deshacer
+        """
+        if self.base is None:
+            self.base = np.empty_like(self.canvas)
+            self.base[:] = self.fondo
+        self._dibujar_trazo(trazo, trazo.caja, destino=self.base)
+
+    def _dibujar_trazo(self, trazo, recorte, destino=None):
+        cajas = [self._segmento(p0, p1, trazo.radio, trazo.color, recorte, destino=destino)
+                 for p0, p1 in _pares(trazo.puntos)]
+        self._limpiar_cobertura(cajas)
+
+    def _limpiar_cobertura(self, cajas):
+        for caja in cajas:
+            if caja is not None:
+                x0, y0, x1, y1 = caja
+                self.cobertura[y0:y1, x0:x1] = 0.0
+
+    def _caja(self, p0, p1, radio, recorte=None):
+        """
+        Rectángulo (x0, y0, x1, y1) que puede tocar el segmento, recortado al lienzo
+        """
+        alto, ancho = self.forma
+        borde = radio + 1.0
+        x0 = max(int(math.floor(min(p0[0], p1[0]) - borde)), 0)
+        y0 = max(int(math.floor(min(p0[1], p1[1]) - borde)), 0)
+        x1 = min(int(math.ceil(max(p0[0], p1[0]) + borde)) + 1, ancho)
+        y1 = min(int(math.ceil(max(p0[1], p1[1]) + borde)) + 1, alto)
+        if recorte is not None:
+            x0, y0 = max(x0, recorte[0]), max(y0, recorte[1])
+            x1, y1 = min(x1, recorte[2]), min(y1, recorte[3])
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    @staticmethod
+    def _cobertura(p0, p1, radio, caja):
+        """
+        Cobertura con antialiasing (0 a 1) del segmento redondo en cada píxel de la caja
+        """
+        x0, y0, x1, y1 = caja
+        # Distancia de cada centro de píxel al segmento
+        xs = np.arange(x0, x1, dtype=np.float32)[None, :] - p0[0]
+        ys = np.arange(y0, y1, dtype=np.float32)[:, None] - p0[1]
+        dx, dy = p1[0] - p0[0], p1[1] - p0[1]
+        largo2 = dx * dx + dy * dy
+        if largo2 > 0:
+            t = np.clip((xs * dx + ys * dy) / largo2, 0.0, 1.0)
+            xs = xs - t * dx
+            ys = ys - t * dy
+        distancia = np.sqrt(xs * xs + ys * ys)
+        return np.clip(radio + 0.5 - distancia, 0.0, 1.0)
+
+    def _segmento(self, p0, p1, radio, color, recorte=None, destino=None, mascara=None):
+        """
+        Rasteriza el segmento redondo p0-p1 con antialiasing en su caja sucia
+        mascara: (alto, ancho) bool; solo se pintan los píxeles marcados
+        Devuelve la caja (x0, y0, x1, y1) pintada o None si cae fuera
+        """
+        caja = self._caja(p0, p1, radio, recorte)
+        if caja is None:
+            return None
+        x0, y0, x1, y1 = caja
+        cobertura = self._cobertura(p0, p1, radio, caja)
+        if mascara is not None:
+            cobertura *= mascara[y0:y1, x0:x1]
+
+        # Solo se aplica lo que este segmento añade a la cobertura del trazo:
+        # llevar de 'previa' a 'nueva' equivale a mezclar hacia el color con
+        # (nueva - previa) / (1 - previa)
+        previa = self.cobertura[y0:y1, x0:x1]
+        nueva = np.maximum(previa, cobertura)
+        mezcla = (nueva - previa) / np.maximum(1.0 - previa, 1e-6)
+        previa[:] = nueva
+
+        region = (self.canvas if destino is None else destino)[y0:y1, x0:x1]
+        valores = region.astype(np.float32)
+        valores += (np.array(color, dtype=np.float32) - valores) * mezcla[:, :, None]
+        region[:] = np.rint(valores)
+        return caja
+
+
+def _pares(puntos):
+    """
+    Segmentos de un trazo: el disco del primer punto y cada par de puntos seguidos
+    """
+    puntos = [tuple(p) for p in np.asarray(puntos).tolist()]
+    return [(puntos[0], puntos[0])] + list(zip(puntos, puntos[1:]))
+
+
+def _cajas_segmentos(puntos, radio, recorte):
+    """
+    Cajas (S, 4) de todos los segmentos de _pares(puntos), recortadas a 'recorte'
+    (pueden quedar vacías) y algo más amplias que las de _caja: solo sirven para descartar
+    """
+    p0 = np.concatenate((puntos[:1], puntos[:-1]))
+    borde = radio + 2
+    x0 = np.floor(np.minimum(p0[:, 0], puntos[:, 0]) - borde)
+    y0 = np.floor(np.minimum(p0[:, 1], puntos[:, 1]) - borde)
+    x1 = np.ceil(np.maximum(p0[:, 0], puntos[:, 0]) + borde) + 1
+    y1 = np.ceil(np.maximum(p0[:, 1], puntos[:, 1]) + borde) + 1
+    cajas = np.stack((x0, y0, x1, y1), axis=1).astype(np.int64)
+    cajas[:, 0::2] = np.clip(cajas[:, 0::2], recorte[0], recorte[2])
+    cajas[:, 1::2] = np.clip(cajas[:, 1::2], recorte[1], recorte[3])
+    return cajas
+
+
+def _unir(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
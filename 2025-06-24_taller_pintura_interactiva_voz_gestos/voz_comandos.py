@@ -0,0 +1,285 @@
+"""
+Comandos de voz sin bloquear el bucle de video
+Un hilo captura el audio en bloques cortos y detecta la voz por energía; cada frase
+completa pasa a un hilo que la reconoce e interpreta, y los comandos quedan en un
+deque (append/popleft son atómicos, sin candados) que el bucle de dibujo vacía en
+cada fotograma sin esperar. La fuente de audio es intercambiable: micrófono o WAV,
+así la latencia de los comandos y los fps se pueden medir sin micrófono
+"""
+
+import collections
+import queue
+import threading
+import time
+import wave
+
+import numpy as np
+
+Segmento = collections.namedtuple("Segmento", "audio tasa t_inicio t_fin_voz")
+Comando = collections.namedtuple("Comando", "accion valor texto t_fin_voz t_listo")
+
+# Palabra clave -> (acción, valor), en orden de prioridad como la cadena de elif original
+COMANDOS = (
+    ("rojo", "color", (0, 0, 255)),
+    ("verde", "color", (0, 255, 0)),
+    ("pincel", "tamano", 10),
+    ("limpiar", "limpiar", None),
+    ("guardar", "guardar", None),
+    ("deshacer", "deshacer", None),
+)
+
+
+def interpretar(texto):
+    """
+    Devuelve (acción, valor) del primer comando presente en el texto, o None
+    """
+    if not texto:
+        return None
+    texto = texto.lower()
+    for palabra, accion, valor in COMANDOS:
+        if palabra in texto:
+            return accion, valor
+    return None
+
+
+class FuenteMicrofono:
+    def __init__(self, tasa=16000, bloque_ms=30):
+        self.tasa = tasa
+        self.muestras_bloque = int(tasa * bloque_ms / 1000)
+
+    def bloques(self, detenido):
+        """
+        Genera (bytes PCM 16 bits mono, instante de captura) hasta que 'detenido' se active
+        """
+        import speech_recognition as sr
+
+        with sr.Microphone(sample_rate=self.tasa, chunk_size=self.muestras_bloque) as source:
+            while not detenido.is_set():
+                yield source.stream.read(self.muestras_bloque), time.perf_counter()
+
+
+class FuenteWav:
+    def __init__(self, ruta, bloque_ms=30, tiempo_real=True, silencio_final_ms=1000):
+        """
+        tiempo_real: entregar los bloques al ritmo del audio, como un micrófono
+        silencio_final_ms: silencio añadido al final para que se cierre la última frase
+        """
+        self.ruta = ruta
+        self.tiempo_real = tiempo_real
+        with wave.open(ruta, "rb") as wav:
+            if wav.getsampwidth() != 2:
+                raise ValueError(f"{ruta}: se esperaba PCM de 16 bits")
+            self.tasa = wav.getframerate()
+            canales = wav.getnchannels()
+            muestras = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+        if canales > 1:
+            muestras = muestras.reshape(-1, canales).mean(axis=1).astype(np.int16)
+        silencio = np.zeros(int(self.tasa * silencio_final_ms / 1000), dtype=np.int16)
+        self.muestras = np.concatenate((muestras, silencio))
+        self.muestras_bloque = int(self.tasa * bloque_ms / 1000)
+        self.t_inicio = None
+
+    def bloques(self, detenido):
+        duracion = self.muestras_bloque / self.tasa
+        self.t_inicio = time.perf_counter()
+        for i, pos in enumerate(range(0, len(self.muestras), self.muestras_bloque)):
+            if detenido.is_set():
+                return
+            if self.tiempo_real:
+                espera = self.t_inicio + (i + 1) * duracion - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+            yield self.muestras[pos:pos + self.muestras_bloque].tobytes(), time.perf_counter()
+
+
+class DetectorVoz:
+    def __init__(self, tasa, factor=3.0, rms_minimo=300.0, inicio_bloques=3, silencio_bloques=20,
+                 previo_bloques=10, max_bloques=300):
+        """
+        Detección de actividad de voz por energía con piso de ruido adaptativo
+        factor: la voz supera 'factor' veces el ruido de fondo (y rms_minimo)
+        inicio_bloques: bloques con voz seguidos para abrir una frase
+        silencio_bloques: bloques sin voz que la cierran (20 x 30 ms = 0.6 s)
+        previo_bloques: audio previo que se conserva para no cortar el comienzo
+        max_bloques: longitud máxima de una frase
+        """
+        self.tasa = tasa
+        self.factor = factor
+        self.rms_minimo = rms_minimo
+        self.inicio_bloques = inicio_bloques
+        self.silencio_bloques = silencio_bloques
+        self.max_bloques = max_bloques
+        self.previo = collections.deque(maxlen=previo_bloques)
+        self.ruido = None
+        self.frase = None
+        self.con_voz = 0
+        self.sin_voz = 0
+        self.t_inicio = self.t_fin_voz = 0.0
+
+    def es_voz(self, bloque):
+        x = np.frombuffer(bloque, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(x * x))) if len(x) else 0.0
+        if self.ruido is None:
+            self.ruido = rms
+        voz = rms > max(self.factor * self.ruido, self.rms_minimo)
+        if not voz:
+            self.ruido = 0.95 * self.ruido + 0.05 * rms
+        return voz
+
+    def procesar(self, bloque, t):
+        """
+        Devuelve un Segmento cuando termina una frase, si no None
+        """
+        voz = self.es_voz(bloque)
+        if self.frase is None:
+            self.previo.append(bloque)
+            self.con_voz = self.con_voz + 1 if voz else 0
+            if self.con_voz >= self.inicio_bloques:
+                self.frase = list(self.previo)
+                self.previo.clear()
+                self.sin_voz = 0
+                self.t_inicio = self.t_fin_voz = t
+            return None
+
+        self.frase.append(bloque)
+        if voz:
+            self.sin_voz = 0
+            self.t_fin_voz = t
+        else:
+            self.sin_voz += 1
+        if self.sin_voz >= self.silencio_bloques or len(self.frase) >= self.max_bloques:
+            segmento = Segmento(b"".join(self.frase), self.tasa, self.t_inicio, self.t_fin_voz)
+            self.frase = None
+            self.con_voz = 0
+            return segmento
+        return None
+
+
+def reconocedor_google(idioma="es-ES"):
+    """
+    Reconocimiento con speech_recognition (Google); devuelve el texto o None
+    """
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+
+    def reconocer(segmento):
+        audio = sr.AudioData(segmento.audio, segmento.tasa, 2)
+        try:
+            return recognizer.recognize_google(audio, language=idioma).lower()
+        except sr.UnknownValueError:
+            return None
+        except sr.RequestError as e:
+            print(f"[VOZ] Error del servicio de reconocimiento: {e}")
+            return None
+
+    return reconocer
+
+
+class SubsistemaVoz:
+    def __init__(self, fuente, reconocer=None, detector=None, max_frases=4, max_comandos=64, mostrar=True):
+        """
+        fuente: FuenteMicrofono o FuenteWav | reconocer: función(Segmento) -> texto o None
+        max_frases: frases esperando reconocimiento; si el reconocedor no da abasto se
+        descartan las nuevas en lugar de frenar la captura
+        mostrar: imprimir cada texto reconocido
+        """
+        self.fuente = fuente
+        self.mostrar = mostrar
+        self.reconocer = reconocer or reconocedor_google()
+        self.detector = detector or DetectorVoz(fuente.tasa)
+        self.frases = queue.Queue(maxsize=max_frases)
+        self.cola_comandos = collections.deque(maxlen=max_comandos)
+        self.detenido = threading.Event()
+        self.hilos = [threading.Thread(target=self._capturar, daemon=True),
+                      threading.Thread(target=self._reconocer, daemon=True)]
+
+        self.frases_detectadas = 0
+        self.frases_descartadas = 0
+        self.reconocidas = 0
+        self.errores = 0
+        self.tiempos_reconocimiento = []
+
+    def iniciar(self):
+        for hilo in self.hilos:
+            hilo.start()
+        return self
+
+    def _capturar(self):
+        try:
+            for bloque, t in self.fuente.bloques(self.detenido):
+                segmento = self.detector.procesar(bloque, t)
+                if segmento is None:
+                    continue
+                self.frases_detectadas += 1
+                try:
+                    self.frases.put_nowait(segmento)
+                except queue.Full:
+                    self.frases_descartadas += 1
+        finally:
+            # Fin de la fuente: el reconocedor termina tras las pendientes. Si el hilo de
+            # reconocimiento ya no existe nadie vaciará la cola: no esperar por espacio
+            while self.hilos[1].is_alive():
+                try:
+                    self.frases.put(None, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def _reconocer(self):
+        while True:
+            segmento = self.frases.get()
+            if segmento is None:
+                return
+            inicio = time.perf_counter()
+            try:
+                texto = self.reconocer(segmento)
+            except Exception as e:
+                # Un fallo en una frase no debe detener el reconocimiento de las siguientes
+                self.errores += 1
+                print(f"[VOZ] Error al reconocer la frase: {type(e).__name__}: {e}")
+                continue
+            finally:
+                self.tiempos_reconocimiento.append(time.perf_counter() - inicio)
+            orden = interpretar(texto)
+            if texto:
+                self.reconocidas += 1
+                if self.mostrar:
+                    print(f"[VOZ] Comando de voz: {texto}")
+            if orden is not None:
+                self.cola_comandos.append(Comando(orden[0], orden[1], texto, segmento.t_fin_voz,
+                                                  time.perf_counter()))
+
+    def comandos(self):
+        """
+        Vacía los comandos pendientes sin bloquear (lista vacía si no hay)
+        """
+        salida = []
+        while True:
+            try:
+                salida.append(self.cola_comandos.popleft())
+            except IndexError:
+                return salida
+
+    @property
+    def activo(self):
+        """
+        False cuando la fuente se agotó y todas las frases se reconocieron
+        """
+        return self.hilos[1].is_alive()
+
+    def estadisticas(self):
+        t = np.array(self.tiempos_reconocimiento) * 1000
+        return {
+            "frases": self.frases_detectadas,
+            "descartadas": self.frases_descartadas,
+            "reconocidas": self.reconocidas,
+            "errores": self.errores,
+            "reconocimiento_ms": float(t.mean()) if len(t) else 0.0,
+        }
+
+    def cerrar(self, espera=2.0):
+        self.detenido.set()
+        for hilo in self.hilos:
+            if hilo.is_alive():
+                hilo.join(timeout=espera)
@@ -0,0 +1,155 @@
+"""
+Benchmark del planificador de inferencia por movimiento sobre videos grabados
+Compara inferir en cada fotograma contra PlanificadorMovimiento: fracción de
+fotogramas omitidos, tiempo total y deriva de las detecciones (diferencia de
+conteo e IoU de las cajas) respecto a inferir siempre
+Uso: python benchmark_movimiento.py [video ...] [--modelo yolov5n.pt] [--umbral 0.5] [--intervalo 2.0]
+Sin videos se genera un clip sintético mayormente estático y un detector de color
+con el costo de inferencia simulado (--costo-ms)
+"""
+
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from monitoreo_basico import cargar_detector
+from planificador_movimiento import PlanificadorMovimiento
+
+
+def clip_sintetico(num_frames=900, ancho=640, alto=480, fps=30.0, semilla=0):
+    """
+    Escena fija con ruido de sensor; una "persona" (rectángulo) entra, se queda
+    quieta un rato y sale. Devuelve (fotogramas, fps)
+    """
+    rng = np.random.default_rng(semilla)
+    fondo = cv2.GaussianBlur(rng.integers(0, 255, (alto, ancho, 3), dtype=np.uint8), (0, 0), 8)
+    frames = []
+    for i in range(num_frames):
+        frame = fondo.copy()
+        fase = i % 300
+        if 100 <= fase < 250:
+            # Camina durante 50 fotogramas y luego se queda quieta
+            x = 40 + min(fase - 100, 50) * 6
+            cv2.rectangle(frame, (x, 150), (x + 80, 400), (40, 40, 200), -1)
+        ruido = rng.normal(0, 3, frame.shape)
+        frames.append(np.clip(frame + ruido, 0, 255).astype(np.uint8))
+    return frames, fps
+
+
+def detector_color(frame, costo_ms=0.0):
+    """
+    Detector de referencia para el clip sintético (sin modelo): regiones rojas
+    costo_ms simula el tiempo de inferencia de YOLO en CPU
+    """
+    if costo_ms:
+        time.sleep(costo_ms / 1000.0)
+    mascara = cv2.inRange(frame, (0, 0, 150), (90, 90, 255))
+    contornos, _ = cv2.findContours(mascara, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    detecciones = []
+    for c in contornos:
+        x, y, w, h = cv2.boundingRect(c)
+        if w * h > 500:
+            detecciones.append(("person", 0.9, (x, y, x + w, y + h)))
+    return detecciones
+
+
+def leer_video(ruta):
+    cap = cv2.VideoCapture(ruta)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while True:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames, fps
+
+
+def iou_medio(a, b):
+    """
+    IoU medio del emparejamiento voraz entre dos listas de detecciones
+    (las cajas sin pareja cuentan como 0)
+    """
+    if not a and not b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    ca = np.array([d[2] for d in a], dtype=np.float64)
+    cb = np.array([d[2] for d in b], dtype=np.float64)
+    x1 = np.maximum(ca[:, None, 0], cb[None, :, 0])
+    y1 = np.maximum(ca[:, None, 1], cb[None, :, 1])
+    x2 = np.minimum(ca[:, None, 2], cb[None, :, 2])
+    y2 = np.minimum(ca[:, None, 3], cb[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (ca[:, 2] - ca[:, 0]) * (ca[:, 3] - ca[:, 1])
+    area_b = (cb[:, 2] - cb[:, 0]) * (cb[:, 3] - cb[:, 1])
+    iou = inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+    total = 0.0
+    for _ in range(min(len(a), len(b))):
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        total += iou[i, j]
+        iou[i, :] = -1
+        iou[:, j] = -1
+    return total / max(len(a), len(b))
+
+
+def medir(nombre, frames, fps, detectar, args):
+    personas = lambda dets: sum(1 for d in dets if d[0] == "person")
+
+    inicio = time.perf_counter()
+    completas = [detectar(f) for f in frames]
+    t_completo = time.perf_counter() - inicio
+
+    planificador = PlanificadorMovimiento(detectar, umbral=args.umbral, intervalo_max_s=args.intervalo,
+                                          metodo=args.metodo)
+    inicio = time.perf_counter()
+    gateadas = [planificador(f, t=i / fps) for i, f in enumerate(frames)]
+    t_gateado = time.perf_counter() - inicio
+
+    s = planificador.estadisticas()
+    dif_conteo = np.array([abs(personas(a) - personas(b)) for a, b in zip(completas, gateadas)])
+    ious = np.array([iou_medio(a, b) for a, b in zip(completas, gateadas)])
+
+    print(f"\n{nombre}: {len(frames)} fotogramas a {fps:.0f} fps")
+    print(f"  Inferir siempre:   {1000 * t_completo / len(frames):7.2f} ms/fotograma")
+    print(f"  Por movimiento:    {1000 * t_gateado / len(frames):7.2f} ms/fotograma "
+          f"({t_completo / t_gateado:.1f}x) | puntaje {s['puntaje_ms']:.3f} ms/fotograma")
+    print(f"  Omitidos: {100 * s['fraccion_omitidos']:.1f}% | inferencias {s['inferencias']} "
+          f"(forzadas por intervalo: {s['forzadas']})")
+    print(f"  Deriva: conteo distinto en {100 * np.mean(dif_conteo > 0):.2f}% de fotogramas "
+          f"(error medio {dif_conteo.mean():.3f}) | IoU medio {ious.mean():.3f} (mín {ious.min():.3f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de inferencia condicionada al movimiento")
+    parser.add_argument("videos", nargs="*", help="Videos grabados de la cámara")
+    parser.add_argument("--modelo", default=None, help="Modelo YOLO (por defecto, detector de color)")
+    parser.add_argument("--umbral", type=float, default=0.5, help="Porcentaje de píxeles cambiados")
+    parser.add_argument("--intervalo", type=float, default=2.0, help="Segundos máximos sin inferir")
+    parser.add_argument("--metodo", choices=["diferencia", "fondo"], default="diferencia")
+    parser.add_argument("--costo-ms", type=float, default=25.0,
+                        help="Tiempo simulado de inferencia del detector de color")
+    args = parser.parse_args()
+
+    if args.modelo:
+        detectar = cargar_detector(args.modelo)
+    elif args.videos:
+        parser.error("los videos grabados necesitan --modelo")
+    else:
+        detectar = lambda frame: detector_color(frame, args.costo_ms)
+
+    if args.videos:
+        for ruta in args.videos:
+            frames, fps = leer_video(ruta)
+            medir(ruta, frames, fps, detectar, args)
+    else:
+        frames, fps = clip_sintetico()
+        medir("Clip sintético", frames, fps, detectar, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Benchmark del registro de detecciones: RegistroDetecciones contra un CSV
+Escribe las mismas detecciones sintéticas (N por fotograma a 30 fps) en los dos
+formatos y mide la velocidad de escritura, el tamaño en disco y la latencia de
+consultas típicas: conteo por clase y minuto de todo el registro, conteo de la
+última hora y lectura de un intervalo de 10 minutos.
+El CSV se escribe como eventos.csv (filas de texto vaciadas por lotes) pero con el
+instante en segundos, que es lo más rápido de leer; se consulta con el módulo csv y
+con np.loadtxt. Las consultas del registro abren la carpeta de nuevo en solo lectura
+(la caché del sistema de archivos queda caliente en ambos casos)
+Uso: python benchmark_registro.py [--detecciones 1000000] [--por-fotograma 4] [--clases 10]
+"""
+
+import argparse
+import collections
+import csv
+import math
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from registro_detecciones import RegistroDetecciones
+
+
+def datos_sinteticos(detecciones, por_fotograma, num_clases, fps=30.0, semilla=0):
+    """
+    Devuelve (t, clases, confianzas, cajas, inicios de fotograma); el número de
+    detecciones por fotograma varía entre 0 y 2 * por_fotograma
+    """
+    rng = np.random.default_rng(semilla)
+    conteos = rng.integers(0, 2 * por_fotograma + 1, int(1.2 * detecciones / por_fotograma) + 1)
+    fin = np.searchsorted(np.cumsum(conteos), detecciones)
+    conteos = conteos[:fin + 1]
+    conteos[-1] -= conteos.sum() - detecciones
+    # Instantes redondeados a milisegundos, la precisión con la que se escriben en el CSV
+    t_fotogramas = np.round(1.75e9 + np.arange(len(conteos)) / fps, 3)
+    t = np.repeat(t_fotogramas, conteos)
+    clases = rng.zipf(1.5, detecciones) % num_clases
+    confianzas = rng.uniform(0.25, 1.0, detecciones).astype(np.float32)
+    xy = rng.uniform(0, 600, (detecciones, 2))
+    cajas = np.hstack((xy, xy + rng.uniform(10, 200, (detecciones, 2)))).astype(np.float32)
+    inicios = np.concatenate(([0], np.cumsum(conteos)))
+    return t, clases, confianzas, cajas, inicios
+
+
+def tamano_en_disco(ruta):
+    if os.path.isfile(ruta):
+        return os.stat(ruta).st_blocks * 512
+    return sum(os.stat(os.path.join(ruta, nombre)).st_blocks * 512 for nombre in os.listdir(ruta))
+
+
+def escribir_registro(carpeta, datos, nombres):
+    t, clases, confianzas, cajas, inicios = datos
+    etiquetas = [nombres[c] for c in clases]
+    registro = RegistroDetecciones(carpeta)
+    inicio = time.perf_counter()
+    for a, b in zip(inicios[:-1], inicios[1:]):
+        if b > a:
+            registro.agregar_lote(t[a], 0, etiquetas[a:b], confianzas[a:b], cajas[a:b])
+    registro.cerrar()
+    return time.perf_counter() - inicio
+
+
+def escribir_csv(ruta, datos, nombres, lote=50):
+    t, clases, confianzas, cajas, inicios = datos
+    filas = []
+    inicio = time.perf_counter()
+    with open(ruta, "w") as archivo:
+        archivo.write("t,flujo,clase,confianza,x1,y1,x2,y2\n")
+        for a, b in zip(inicios[:-1], inicios[1:]):
+            for i in range(a, b):
+                x1, y1, x2, y2 = cajas[i]
+                filas.append(f"{t[i]:.3f},0,{nombres[clases[i]]},{confianzas[i]:.2f},"
+                             f"{x1:.1f},{y1:.1f},{x2:.1f},{y2:.1f}\n")
+            if len(filas) >= lote:
+                archivo.writelines(filas)
+                filas.clear()
+        archivo.writelines(filas)
+    return time.perf_counter() - inicio
+
+
+def csv_conteo(ruta, t0=None, periodo=60.0):
+    conteos = collections.Counter()
+    with open(ruta, newline="") as archivo:
+        lector = csv.reader(archivo)
+        next(lector)
+        for fila in lector:
+            t = float(fila[0])
+            if t0 is None or t >= t0:
+                conteos[(math.floor(t / periodo), fila[2])] += 1
+    return conteos
+
+
+def csv_intervalo(ruta, t0, t1):
+    filas = []
+    with open(ruta, newline="") as archivo:
+        lector = csv.reader(archivo)
+        next(lector)
+        for fila in lector:
+            t = float(fila[0])
+            if t >= t1:
+                break
+            if t >= t0:
+                filas.append(fila)
+    return filas
+
+
+def loadtxt_conteo(ruta, nombres, periodo=60.0):
+    """
+    Con NumPy: la clase se lee como texto y se convierte a id
+    """
+    ids = {nombre: i for i, nombre in enumerate(nombres)}
+    t, clase = np.loadtxt(ruta, delimiter=",", skiprows=1, usecols=(0, 2), unpack=True,
+                          converters={2: lambda s: ids[s]})
+    minutos = np.floor(t / periodo).astype(np.int64)
+    minutos -= minutos[0]
+    return np.bincount(minutos * len(nombres) + clase.astype(np.int64))
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos) * 1000, resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--detecciones", type=int, default=1_000_000)
+    parser.add_argument("--por-fotograma", type=int, default=4, help="Detecciones medias por fotograma")
+    parser.add_argument("--clases", type=int, default=10)
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones de las consultas del registro")
+    args = parser.parse_args()
+
+    nombres = ["person", "car", "bicycle", "dog", "cat", "truck", "bus", "motorcycle", "backpack", "chair"]
+    nombres = (nombres + [f"clase_{i}" for i in range(len(nombres), args.clases)])[:args.clases]
+    datos = datos_sinteticos(args.detecciones, args.por_fotograma, args.clases)
+    t = datos[0]
+    horas = (t[-1] - t[0]) / 3600
+    print(f"{args.detecciones} detecciones | {len(datos[4]) - 1} fotogramas | {horas:.1f} h a 30 fps\n")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta_csv = os.path.join(carpeta, "detecciones.csv")
+        carpeta_registro = os.path.join(carpeta, "registro")
+
+        s_registro = escribir_registro(carpeta_registro, datos, nombres)
+        s_csv = escribir_csv(ruta_csv, datos, nombres)
+        print("Escritura (detecciones/s) y tamaño en disco")
+        print(f"  Registro: {args.detecciones / s_registro:12,.0f} /s | "
+              f"{tamano_en_disco(carpeta_registro) / 2 ** 20:7.1f} MB")
+        print(f"  CSV:      {args.detecciones / s_csv:12,.0f} /s | {tamano_en_disco(ruta_csv) / 2 ** 20:7.1f} MB")
+
+        registro = RegistroDetecciones(carpeta_registro, solo_lectura=True)
+        t_hora = t[-1] - 3600
+        medio = t[len(t) // 2]
+
+        print("\nConsultas (ms)")
+        ms_todo, (_, conteos) = medir(lambda: registro.conteo_por_periodo(), args.repeticiones)
+        ms_hora, (_, conteos_hora) = medir(lambda: registro.conteo_por_periodo(t_hora), args.repeticiones)
+        ms_intervalo, filas = medir(lambda: registro.leer(medio, medio + 600), args.repeticiones)
+        ms_csv_todo, c_todo = medir(lambda: csv_conteo(ruta_csv), 1)
+        ms_csv_hora, c_hora = medir(lambda: csv_conteo(ruta_csv, t_hora), 1)
+        ms_csv_intervalo, filas_csv = medir(lambda: csv_intervalo(ruta_csv, medio, medio + 600), 1)
+        ms_loadtxt, c_loadtxt = medir(lambda: loadtxt_conteo(ruta_csv, nombres), 1)
+
+        print(f"  {'consulta':<34}{'registro':>10}{'csv':>12}{'np.loadtxt':>12}")
+        print(f"  {'conteo por clase y minuto (todo)':<34}{ms_todo:10.1f}{ms_csv_todo:12.0f}{ms_loadtxt:12.0f}")
+        print(f"  {'conteo por clase y minuto (1 h)':<34}{ms_hora:10.1f}{ms_csv_hora:12.0f}{'-':>12}")
+        print(f"  {'leer 10 minutos':<34}{ms_intervalo:10.1f}{ms_csv_intervalo:12.0f}{'-':>12}")
+
+        # Mismos resultados en los dos formatos
+        iguales = (conteos.sum() == sum(c_todo.values()) == c_loadtxt.sum()
+                   and conteos_hora.sum() == sum(c_hora.values()) and len(filas) == len(filas_csv))
+        print(f"\n  Resultados coinciden: {'sí' if iguales else 'NO'} "
+              f"({len(filas)} detecciones en el intervalo)")
+        registro.cerrar()
+
+
+if __name__ == "__main__":
+    main()
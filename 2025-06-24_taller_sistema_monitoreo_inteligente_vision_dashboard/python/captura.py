@@ -0,0 +1,226 @@
+"""
+Captura de video en un hilo de fondo
+Guarda los fotogramas en un buffer circular acotado (se descarta el más viejo)
+para que la inferencia siempre trabaje sobre el fotograma más reciente
+"""
+
+import collections
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Fotograma entregado al consumidor: id consecutivo, instante de captura e imagen
+Fotograma = collections.namedtuple("Fotograma", ["id", "t_captura", "imagen"])
+
+
+class FuenteSintetica:
+    """
+    Fuente de video generada por software con la misma interfaz que cv2.VideoCapture
+    Sirve para probar el pipeline sin cámara
+    """
+
+    def __init__(self, ancho=640, alto=480, fps=30.0, num_frames=None):
+        self.ancho = ancho
+        self.alto = alto
+        self.periodo = 1.0 / fps if fps else 0.0
+        self.num_frames = num_frames
+        self.contador = 0
+        self.abierta = True
+        self.siguiente = time.perf_counter()
+
+    def isOpened(self):
+        return self.abierta
+
+    def read(self):
+        if not self.abierta or (self.num_frames is not None and self.contador >= self.num_frames):
+            return False, None
+
+        # Respetar el ritmo de una cámara real
+        if self.periodo:
+            espera = self.siguiente - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            self.siguiente = max(self.siguiente + self.periodo, time.perf_counter())
+
+        # Cuadro que se desplaza horizontalmente y número de fotograma
+        frame = np.zeros((self.alto, self.ancho, 3), dtype=np.uint8)
+        x = (self.contador * 8) % max(self.ancho - 80, 1)
+        cv2.rectangle(frame, (x, self.alto // 2 - 40), (x + 80, self.alto // 2 + 40), (0, 200, 255), -1)
+        cv2.putText(frame, f"{self.contador}", (10, self.alto - 20),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        self.contador += 1
+        return True, frame
+
+    def release(self):
+        self.abierta = False
+
+
+def abrir_fuente(fuente):
+    """
+    Abre una fuente de video
+    fuente: índice de cámara, ruta de archivo, "sintetica" o un objeto con read()
+    Devuelve (captura, es_archivo)
+    """
+    if hasattr(fuente, "read"):
+        return fuente, False
+    if isinstance(fuente, str) and fuente.startswith("sintetica"):
+        return FuenteSintetica(), False
+    if isinstance(fuente, str) and fuente.isdigit():
+        fuente = int(fuente)
+    return cv2.VideoCapture(fuente), isinstance(fuente, str)
+
+
+class CapturaAsincrona:
+    def __init__(self, fuente=0, tam_buffer=2, ritmo_archivo=True, historial_latencias=300):
+        """
+        Inicia la captura en un hilo de fondo
+        fuente: índice de cámara, ruta de video, "sintetica" o un objeto con read()
+        tam_buffer: fotogramas que se guardan como máximo (se descarta el más viejo)
+        ritmo_archivo: si la fuente es un archivo, leerlo a sus FPS nominales como una cámara
+        """
+        self.cap, es_archivo = abrir_fuente(fuente)
+        if not self.cap.isOpened():
+            raise IOError(f"No se pudo abrir la fuente de video: {fuente}")
+
+        # Periodo de lectura para archivos (0 = lo más rápido posible)
+        self.periodo = 0.0
+        if es_archivo and ritmo_archivo:
+            fps = self.cap.get(cv2.CAP_PROP_FPS)
+            self.periodo = 1.0 / fps if fps and fps > 0 else 0.0
+
+        self.buffer = collections.deque(maxlen=tam_buffer)
+        self.condicion = threading.Condition()
+        self.terminado = False
+
+        # Estadísticas
+        self.capturados = 0
+        self.entregados = 0
+        self.descartados = 0
+        self.latencias_entrega = collections.deque(maxlen=historial_latencias)
+        self.latencias_inferencia = collections.deque(maxlen=historial_latencias)
+
+        self.hilo = threading.Thread(target=self._bucle_captura, daemon=True)
+        self.hilo.start()
+
+    def _bucle_captura(self):
+        """
+        Lee fotogramas continuamente y los guarda en el buffer
+        """
+        siguiente = time.perf_counter()
+        while not self.terminado:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+
+            with self.condicion:
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.descartados += 1
+                self.buffer.append(Fotograma(self.capturados, time.perf_counter(), frame))
+                self.capturados += 1
+                self.condicion.notify()
+
+            if self.periodo:
+                siguiente += self.periodo
+                espera = siguiente - time.perf_counter()
+                if espera > 0:
+                    time.sleep(espera)
+                else:
+                    siguiente = time.perf_counter()
+
+        with self.condicion:
+            self.terminado = True
+            self.condicion.notify_all()
+
+    def leer(self, timeout=None):
+        """
+        Devuelve el Fotograma más reciente y descarta los anteriores
+        Devuelve None si la fuente terminó o se agotó el tiempo de espera
+        """
+        with self.condicion:
+            if not self.condicion.wait_for(lambda: self.buffer or self.terminado, timeout):
+                return None
+            if not self.buffer:
+                return None
+
+            fotograma = self.buffer.pop()
+            self.descartados += len(self.buffer)
+            self.buffer.clear()
+            self.entregados += 1
+
+        self.latencias_entrega.append(time.perf_counter() - fotograma.t_captura)
+        return fotograma
+
+    def read(self):
+        """
+        Interfaz compatible con cv2.VideoCapture: (ret, frame)
+        """
+        fotograma = self.leer()
+        if fotograma is None:
+            return False, None
+        return True, fotograma.imagen
+
+    def registrar_inferencia(self, fotograma):
+        """
+        Registra la latencia captura -> fin de inferencia de un fotograma ya procesado
+        """
+        self.latencias_inferencia.append(time.perf_counter() - fotograma.t_captura)
+
+    def estadisticas(self):
+        """
+        Devuelve contadores y latencias (ms) de la captura
+        """
+        def resumen(valores):
+            if not valores:
+                return 0.0, 0.0
+            arr = np.fromiter(valores, dtype=np.float64) * 1000.0
+            return float(arr.mean()), float(np.percentile(arr, 95))
+
+        entrega_media, entrega_p95 = resumen(self.latencias_entrega)
+        inferencia_media, inferencia_p95 = resumen(self.latencias_inferencia)
+        return {
+            "capturados": self.capturados,
+            "entregados": self.entregados,
+            "descartados": self.descartados,
+            "latencia_entrega_ms": entrega_media,
+            "latencia_entrega_p95_ms": entrega_p95,
+            "latencia_inferencia_ms": inferencia_media,
+            "latencia_inferencia_p95_ms": inferencia_p95,
+        }
+
+    def release(self):
+        """
+        Detiene el hilo de captura y libera la fuente
+        """
+        with self.condicion:
+            self.terminado = True
+            self.condicion.notify_all()
+        self.hilo.join(timeout=1.0)
+        self.cap.release()
+
+
+def main():
+    """
+    Prueba de la captura sin modelo: simula una inferencia lenta y muestra estadísticas
+    """
+    import sys
+
+    fuente = sys.argv[1] if len(sys.argv) > 1 else "sintetica"
+    captura = CapturaAsincrona(fuente)
+    print("Simulando inferencia de 80 ms durante 100 fotogramas...")
+
+    for _ in range(100):
+        fotograma = captura.leer(timeout=2.0)
+        if fotograma is None:
+            break
+        time.sleep(0.08)  # Inferencia simulada
+        captura.registrar_inferencia(fotograma)
+
+    captura.release()
+    for clave, valor in captura.estadisticas().items():
+        print(f"{clave}: {valor:.2f}" if isinstance(valor, float) else f"{clave}: {valor}")
+
+
+if __name__ == "__main__":
+    main()
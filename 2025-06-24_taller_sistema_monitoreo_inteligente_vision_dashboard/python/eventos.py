@@ -0,0 +1,169 @@
+"""
+Registro asíncrono de eventos del panel de monitoreo
+El hilo de la interfaz solo encola eventos; un hilo escritor agrupa las filas del
+CSV y un pool de hilos codifica las capturas JPEG a menor resolución.
+Cada incidente (detecciones seguidas de la misma clase) genera un solo evento
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import cv2
+
+CABECERA_CSV = "timestamp,evento,clase,confianza\n"
+
+
+class SumideroEventos:
+    def __init__(self, log_path, carpeta_capturas, enfriamiento_s=5.0, tam_cola=256,
+                 lote_csv=50, periodo_flush=1.0, guardar_capturas=True, escala_captura=0.5,
+                 calidad_jpeg=85, hilos_jpeg=2, max_capturas_pendientes=8):
+        """
+        enfriamiento_s: segundos sin ver la clase para dar por terminado un incidente
+        tam_cola: eventos en espera como máximo; los que no caben se descartan
+        lote_csv / periodo_flush: el CSV se vacía al juntar lote_csv filas o cada periodo_flush segundos
+        escala_captura: factor de reducción de la captura antes de codificarla
+        max_capturas_pendientes: capturas en el pool como máximo; las demás se descartan
+        """
+        self.log_path = log_path
+        self.carpeta_capturas = carpeta_capturas
+        self.enfriamiento_s = enfriamiento_s
+        self.lote_csv = lote_csv
+        self.periodo_flush = periodo_flush
+        self.guardar_capturas = guardar_capturas
+        self.escala_captura = escala_captura
+        self.parametros_jpeg = [cv2.IMWRITE_JPEG_QUALITY, calidad_jpeg]
+        self.max_capturas_pendientes = max_capturas_pendientes
+
+        os.makedirs(carpeta_capturas, exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+        nuevo = not os.path.exists(log_path)
+        self.archivo = open(log_path, "a")
+        if nuevo:
+            self.archivo.write(CABECERA_CSV)
+
+        # Última vez que se vio cada clave (solo lo usa el hilo que llama a registrar)
+        self.ultimo_visto = {}
+
+        self.cola = queue.Queue(maxsize=tam_cola)
+        self.pool = ThreadPoolExecutor(max_workers=hilos_jpeg)
+        self.capturas_pendientes = 0
+        self.candado = threading.Lock()
+
+        # Estadísticas
+        self.encolados = 0
+        self.suprimidos = 0
+        self.descartados = 0
+        self.filas_escritas = 0
+        self.vaciados = 0
+        self.capturas_escritas = 0
+        self.capturas_descartadas = 0
+        self.profundidad_max = 0
+
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+        self.hilo.start()
+
+    def registrar(self, evento, clase, confianza, frame=None, clave=None):
+        """
+        Registra un evento si empieza un incidente nuevo para 'clave' (por defecto la clase)
+        Devuelve True si el evento se encoló
+        """
+        ahora = time.monotonic()
+        clave = clase if clave is None else clave
+        anterior = self.ultimo_visto.get(clave)
+        self.ultimo_visto[clave] = ahora
+        if anterior is not None and ahora - anterior < self.enfriamiento_s:
+            self.suprimidos += 1
+            return False
+
+        instante = datetime.now()
+        # Copia: el llamador sigue dibujando sobre el fotograma
+        imagen = frame.copy() if self.guardar_capturas and frame is not None else None
+        try:
+            self.cola.put_nowait((instante, evento, clase, confianza, imagen))
+        except queue.Full:
+            self.descartados += 1
+            return False
+        self.encolados += 1
+        self.profundidad_max = max(self.profundidad_max, self.cola.qsize())
+        return True
+
+    def _bucle(self):
+        filas = []
+        t_vaciado = time.monotonic()
+        while True:
+            espera = max(self.periodo_flush - (time.monotonic() - t_vaciado), 0.0)
+            try:
+                item = self.cola.get(timeout=espera)
+            except queue.Empty:
+                item = False
+
+            if item:
+                instante, evento, clase, confianza, imagen = item
+                timestamp = instante.strftime("%Y-%m-%d_%H-%M-%S")
+                filas.append(f"{timestamp},{evento},{clase},{confianza:.2f}\n")
+                if imagen is not None:
+                    nombre = f"captura_{instante.strftime('%Y-%m-%d_%H-%M-%S_%f')[:-3]}.jpg"
+                    self._enviar_captura(os.path.join(self.carpeta_capturas, nombre), imagen)
+
+            if filas and (item is None or len(filas) >= self.lote_csv
+                          or time.monotonic() - t_vaciado >= self.periodo_flush):
+                self.archivo.writelines(filas)
+                self.archivo.flush()
+                self.filas_escritas += len(filas)
+                self.vaciados += 1
+                filas.clear()
+            if not filas:
+                t_vaciado = time.monotonic()
+
+            if item is None:
+                break
+
+    def _enviar_captura(self, ruta, imagen):
+        with self.candado:
+            if self.capturas_pendientes >= self.max_capturas_pendientes:
+                self.capturas_descartadas += 1
+                return
+            self.capturas_pendientes += 1
+        self.pool.submit(self._escribir_captura, ruta, imagen)
+
+    def _escribir_captura(self, ruta, imagen):
+        ok = False
+        try:
+            if self.escala_captura != 1.0:
+                imagen = cv2.resize(imagen, None, fx=self.escala_captura, fy=self.escala_captura,
+                                    interpolation=cv2.INTER_AREA)
+            ok, datos = cv2.imencode(".jpg", imagen, self.parametros_jpeg)
+            if ok:
+                with open(ruta, "wb") as f:
+                    f.write(datos.tobytes())
+        finally:
+            with self.candado:
+                self.capturas_pendientes -= 1
+                self.capturas_escritas += ok
+
+    def estadisticas(self):
+        return {
+            "profundidad_cola": self.cola.qsize(),
+            "profundidad_max": self.profundidad_max,
+            "encolados": self.encolados,
+            "suprimidos": self.suprimidos,
+            "descartados": self.descartados,
+            "filas_escritas": self.filas_escritas,
+            "vaciados_csv": self.vaciados,
+            "capturas_pendientes": self.capturas_pendientes,
+            "capturas_escritas": self.capturas_escritas,
+            "capturas_descartadas": self.capturas_descartadas,
+        }
+
+    def cerrar(self):
+        """
+        Escribe lo pendiente y detiene los hilos
+        """
+        self.cola.put(None)
+        self.hilo.join()
+        self.pool.shutdown(wait=True)
+        self.archivo.close()
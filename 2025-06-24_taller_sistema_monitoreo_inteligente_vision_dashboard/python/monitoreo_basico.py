@@ -1,84 +1,307 @@
-import cv2
-from ultralytics import YOLO
+import argparse
+import collections
 import os
-from datetime import datetime
-import pandas as pd
-import tkinter as tk
-from PIL import Image, ImageTk
-
-# Crear carpetas
-os.makedirs("../capturas", exist_ok=True)
-os.makedirs("../logs", exist_ok=True)
-
-# Cargar modelo
-model = YOLO("yolov5n.pt")
-
-# CSV log
-log_path = "../logs/eventos.csv"
-if not os.path.exists(log_path):
-    with open(log_path, "w") as f:
-        f.write("timestamp,evento,clase,confianza\n")
-
-# Panel tkinter
-root = tk.Tk()
-root.title("Panel de Monitoreo Inteligente")
-
-video_label = tk.Label(root)
-video_label.pack()
-
-estado_label = tk.Label(root, text="Estado: Inactivo", font=("Arial", 14))
-estado_label.pack()
-
-conteo_label = tk.Label(root, text="Personas detectadas: 0", font=("Arial", 14))
-conteo_label.pack()
-
-cap = cv2.VideoCapture(0)
-
-def actualizar_frame():
-    ret, frame = cap.read()
-    if not ret:
-        return
-
-    detecciones = model(frame)[0]
-    personas = 0
-
-    for r in detecciones.boxes:
-        cls_id = int(r.cls)
-        conf = float(r.conf)
-        label = model.names[cls_id]
-
-        if label == 'person' and conf > 0.5:
-            personas += 1
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-            img_path = f"../capturas/captura_{timestamp}.jpg"
-            cv2.imwrite(img_path, frame)
-            with open(log_path, "a") as f:
-                f.write(f"{timestamp},Persona detectada,{label},{conf:.2f}\n")
-
-        # Dibujar cajas
-        xyxy = r.xyxy[0].cpu().numpy().astype(int)
-        cv2.rectangle(frame, (xyxy[0], xyxy[1]), (xyxy[2], xyxy[3]), (0, 255, 0), 2)
-        cv2.putText(frame, f"{label} {conf:.2f}", (xyxy[0], xyxy[1] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-
-    # Actualizar UI
-    estado = "ALERTA" if personas > 0 else "Inactivo"
-    estado_label.config(text=f"Estado: {estado}")
-    conteo_label.config(text=f"Personas detectadas: {personas}")
-
-    # Mostrar imagen en panel
-    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    img = Image.fromarray(rgb_frame)
-    imgtk = ImageTk.PhotoImage(image=img)
-    video_label.imgtk = imgtk
-    video_label.configure(image=imgtk)
-
-    root.after(100, actualizar_frame)
-
-def cerrar():
-    cap.release()
-    root.destroy()
-
-root.protocol("WM_DELETE_WINDOW", cerrar)
-actualizar_frame()
-root.mainloop()
+import threading
+import time
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from captura import CapturaAsincrona
+from eventos import SumideroEventos
+from planificador_movimiento import PlanificadorMovimiento
+from registro_detecciones import RegistroDetecciones
+
+# Resultado listo para mostrar: id del fotograma, imagen RGB con las cajas y conteo
+Resultado = collections.namedtuple("Resultado", ["id", "rgb", "personas"])
+
+
+def cargar_detector(modelo="yolov5n.pt"):
+    """
+    Devuelve detectar(frame) -> lista de (etiqueta, confianza, (x1, y1, x2, y2))
+    """
+    from ultralytics import YOLO
+
+    model = YOLO(modelo)
+
+    def detectar(frame):
+        boxes = model(frame, verbose=False)[0].boxes
+        clases = boxes.cls.cpu().numpy().astype(int)
+        confs = boxes.conf.cpu().numpy()
+        cajas = boxes.xyxy.cpu().numpy().astype(int)
+        return [(model.names[c], float(conf), tuple(xyxy)) for c, conf, xyxy in zip(clases, confs, cajas)]
+
+    return detectar
+
+
+def detector_simulado(ms):
+    """
+    Detector de prueba que tarda 'ms' milisegundos y devuelve una persona fija
+    """
+    def detectar(frame):
+        time.sleep(ms / 1000.0)
+        h, w = frame.shape[:2]
+        return [("person", 0.9, (w // 4, h // 4, w // 2, h - 10))]
+
+    return detectar
+
+
+class ProcesadorMonitoreo:
+    def __init__(self, captura, detectar, sumidero, conf_min=0.5, registro=None):
+        """
+        Hilo de inferencia: toma el fotograma más reciente de la captura, detecta,
+        registra eventos, dibuja y deja el resultado RGB listo para la interfaz
+        registro: RegistroDetecciones opcional donde se guardan todas las cajas
+        """
+        self.captura = captura
+        self.detectar = detectar
+        self.sumidero = sumidero
+        self.conf_min = conf_min
+        self.registro = registro
+
+        self.candado = threading.Lock()
+        self.ultimo = None
+        self.terminado = False
+        self.detener = False
+
+        # Estadísticas
+        self.inferencias = 0
+        self.t_inferencia = collections.deque(maxlen=300)
+
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+        self.hilo.start()
+
+    def _bucle(self):
+        while not self.detener:
+            fotograma = self.captura.leer(timeout=0.5)
+            if fotograma is None:
+                if self.captura.terminado:
+                    break
+                continue
+
+            frame = fotograma.imagen
+            inicio = time.perf_counter()
+            detecciones = self.detectar(frame)
+            self.t_inferencia.append(time.perf_counter() - inicio)
+            if self.registro is not None and detecciones:
+                etiquetas, confs, cajas = zip(*detecciones)
+                self.registro.agregar_lote(time.time(), 0, etiquetas, confs, cajas)
+
+            personas = [conf for label, conf, _ in detecciones if label == 'person' and conf > self.conf_min]
+            # Un evento por incidente (no uno por caja y fotograma), antes de dibujar las cajas
+            if personas:
+                self.sumidero.registrar("Persona detectada", "person", max(personas), frame)
+
+            # Dibujar cajas
+            for label, conf, (x1, y1, x2, y2) in detecciones:
+                cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                cv2.putText(frame, f"{label} {conf:.2f}", (x1, y1 - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+            # La conversión de color también se hace aquí, fuera del hilo de la interfaz
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            with self.candado:
+                self.ultimo = Resultado(fotograma.id, rgb, len(personas))
+            self.inferencias += 1
+            self.captura.registrar_inferencia(fotograma)
+
+        self.terminado = True
+
+    def ultimo_resultado(self):
+        with self.candado:
+            return self.ultimo
+
+    def cerrar(self):
+        self.detener = True
+        self.hilo.join(timeout=2.0)
+
+
+class ActualizadorVista:
+    """
+    Lógica de cada tick de la interfaz: solo cambia la imagen si hay un resultado nuevo
+    'pegar' recibe la imagen PIL (en Tk pega sobre un único PhotoImage reutilizado)
+    """
+
+    def __init__(self, procesador, pegar, mostrar_estado=None):
+        self.procesador = procesador
+        self.pegar = pegar
+        self.mostrar_estado = mostrar_estado
+        self.id_mostrado = None
+        self.mostrados = 0
+        self.latencias_tick = collections.deque(maxlen=1000)
+
+    def tick(self):
+        inicio = time.perf_counter()
+        resultado = self.procesador.ultimo_resultado()
+        if resultado is not None and resultado.id != self.id_mostrado:
+            # fromarray no copia los píxeles; paste los copia directo al buffer de Tk
+            self.pegar(Image.fromarray(resultado.rgb))
+            if self.mostrar_estado is not None:
+                self.mostrar_estado(resultado.personas)
+            self.id_mostrado = resultado.id
+            self.mostrados += 1
+        self.latencias_tick.append(time.perf_counter() - inicio)
+
+
+def resumen_ms(valores):
+    if not valores:
+        return 0.0, 0.0, 0.0
+    arr = np.fromiter(valores, dtype=np.float64) * 1000.0
+    return float(arr.mean()), float(np.percentile(arr, 95)), float(arr.max())
+
+
+def imprimir_estadisticas(captura, procesador, vista, sumidero, duracion):
+    tick_media, tick_p95, tick_max = resumen_ms(vista.latencias_tick)
+    inf_media, inf_p95, _ = resumen_ms(procesador.t_inferencia)
+    s = captura.estadisticas()
+    print("\n" + "="*60)
+    print(f"Tick de interfaz: media {tick_media:.3f} ms | p95 {tick_p95:.3f} ms | máx {tick_max:.3f} ms "
+          f"({len(vista.latencias_tick)} ticks, {vista.mostrados} imágenes nuevas)")
+    print(f"Inferencia: {procesador.inferencias / duracion:.1f} fotogramas/s | "
+          f"media {inf_media:.1f} ms | p95 {inf_p95:.1f} ms")
+    print(f"Captura: {s['capturados']} capturados, {s['descartados']} descartados | "
+          f"latencia captura->resultado {s['latencia_inferencia_ms']:.1f} ms")
+    print("Eventos:", sumidero.estadisticas())
+    if procesador.registro is not None:
+        print(f"Registro de detecciones: {len(procesador.registro)} cajas en '{procesador.registro.carpeta}'")
+    print("="*60)
+
+
+def ejecutar_benchmark(procesador, segundos, periodo_ms):
+    """
+    Modo sin ventana: simula los ticks de la interfaz con el mismo periodo
+    """
+    # Buffer del tamaño de la imagen, como el PhotoImage de la interfaz
+    destino = {}
+
+    def pegar(img):
+        buffer = destino.get("img")
+        if buffer is None or buffer.size != img.size:
+            buffer = destino["img"] = Image.new("RGB", img.size)
+        buffer.paste(img)
+
+    vista = ActualizadorVista(procesador, pegar)
+    inicio = time.perf_counter()
+    siguiente = inicio
+    while time.perf_counter() - inicio < segundos and not procesador.terminado:
+        vista.tick()
+        siguiente += periodo_ms / 1000.0
+        espera = siguiente - time.perf_counter()
+        if espera > 0:
+            time.sleep(espera)
+    return vista, time.perf_counter() - inicio
+
+
+def ejecutar_panel(procesador, sumidero, periodo_ms):
+    import tkinter as tk
+    from PIL import ImageTk
+
+    # Panel tkinter
+    root = tk.Tk()
+    root.title("Panel de Monitoreo Inteligente")
+
+    video_label = tk.Label(root)
+    video_label.pack()
+
+    estado_label = tk.Label(root, text="Estado: Inactivo", font=("Arial", 14))
+    estado_label.pack()
+
+    conteo_label = tk.Label(root, text="Personas detectadas: 0", font=("Arial", 14))
+    conteo_label.pack()
+
+    eventos_label = tk.Label(root, text="Eventos: 0 | cola: 0 | descartados: 0", font=("Arial", 10))
+    eventos_label.pack()
+
+    # Un solo PhotoImage; se crea con el tamaño del primer resultado y luego solo se pega
+    foto = {}
+
+    def pegar(img):
+        imgtk = foto.get("imgtk")
+        if imgtk is None or (imgtk.width(), imgtk.height()) != img.size:
+            imgtk = foto["imgtk"] = ImageTk.PhotoImage("RGB", img.size)
+            video_label.configure(image=imgtk)
+        imgtk.paste(img)
+
+    def mostrar_estado(personas):
+        estado = "ALERTA" if personas > 0 else "Inactivo"
+        estado_label.config(text=f"Estado: {estado}")
+        conteo_label.config(text=f"Personas detectadas: {personas}")
+        s = sumidero.estadisticas()
+        eventos_label.config(text=f"Eventos: {s['encolados']} | cola: {s['profundidad_cola']} "
+                                  f"| descartados: {s['descartados'] + s['capturas_descartadas']}")
+
+    vista = ActualizadorVista(procesador, pegar, mostrar_estado)
+    inicio = time.perf_counter()
+
+    def actualizar_frame():
+        vista.tick()
+        root.after(periodo_ms, actualizar_frame)
+
+    root.protocol("WM_DELETE_WINDOW", root.destroy)
+    actualizar_frame()
+    root.mainloop()
+    return vista, time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Panel de monitoreo inteligente")
+    parser.add_argument("--fuente", default="0", help="Cámara, video o 'sintetica'")
+    parser.add_argument("--modelo", default="yolov5n.pt")
+    parser.add_argument("--periodo-ms", type=int, default=15, help="Periodo del tick de la interfaz")
+    parser.add_argument("--benchmark", type=float, default=None, metavar="SEGUNDOS",
+                        help="Ejecutar sin ventana y reportar latencia del tick e inferencia")
+    parser.add_argument("--inferencia-simulada", type=float, default=None, metavar="MS",
+                        help="Usar un detector simulado que tarda MS milisegundos")
+    parser.add_argument("--inferir-siempre", action="store_true",
+                        help="Inferir en cada fotograma aunque la escena no cambie")
+    parser.add_argument("--umbral-movimiento", type=float, default=0.5,
+                        help="Porcentaje de píxeles cambiados para volver a inferir")
+    parser.add_argument("--refresco-max", type=float, default=2.0,
+                        help="Segundos máximos reutilizando detecciones")
+    args = parser.parse_args()
+
+    # Crear carpetas
+    os.makedirs("../capturas", exist_ok=True)
+    os.makedirs("../logs", exist_ok=True)
+
+    # Cargar modelo
+    if args.inferencia_simulada is not None:
+        detectar = detector_simulado(args.inferencia_simulada)
+    else:
+        detectar = cargar_detector(args.modelo)
+
+    # Escena sin cambios: se reutilizan las últimas detecciones
+    planificador = None
+    if not args.inferir_siempre:
+        detectar = planificador = PlanificadorMovimiento(detectar, umbral=args.umbral_movimiento,
+                                                         intervalo_max_s=args.refresco_max)
+
+    # CSV log y capturas: se escriben en segundo plano, un evento por incidente
+    log_path = "../logs/eventos.csv"
+    sumidero = SumideroEventos(log_path, "../capturas", enfriamiento_s=5.0)
+    # Todas las detecciones en registros binarios consultables por tiempo y clase
+    registro = RegistroDetecciones("../logs/detecciones")
+
+    # Captura e inferencia en hilos; la interfaz solo muestra el último resultado
+    captura = CapturaAsincrona(args.fuente)
+    procesador = ProcesadorMonitoreo(captura, detectar, sumidero, registro=registro)
+
+    if args.benchmark is not None:
+        vista, duracion = ejecutar_benchmark(procesador, args.benchmark, args.periodo_ms)
+    else:
+        vista, duracion = ejecutar_panel(procesador, sumidero, args.periodo_ms)
+
+    procesador.cerrar()
+    captura.release()
+    sumidero.cerrar()
+    registro.cerrar()
+    imprimir_estadisticas(captura, procesador, vista, sumidero, duracion)
+    if planificador is not None:
+        s = planificador.estadisticas()
+        print(f"Planificador: {100 * s['fraccion_omitidos']:.1f}% de fotogramas sin inferencia "
+              f"({s['inferencias']} inferencias, {s['forzadas']} forzadas por intervalo)")
+
+
+if __name__ == "__main__":
+    main()
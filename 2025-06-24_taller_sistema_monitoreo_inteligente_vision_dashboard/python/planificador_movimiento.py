@@ -0,0 +1,119 @@
+"""
+Inferencia condicionada al movimiento para cámaras casi siempre estáticas
+Calcula un puntaje barato sobre el fotograma reducido (diferencia con el último
+fotograma inferido o sustracción de fondo); si la escena no cambió reutiliza las
+últimas detecciones y solo fuerza una inferencia cada 'intervalo_max_s' segundos
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class PlanificadorMovimiento:
+    def __init__(self, detectar, umbral=0.5, intervalo_max_s=2.0, ancho=96, umbral_pixel=20,
+                 metodo="diferencia"):
+        """
+        detectar: función frame -> detecciones (cualquier tipo; se devuelven tal cual)
+        umbral: porcentaje de píxeles cambiados a partir del cual se vuelve a inferir
+        intervalo_max_s: tiempo máximo reutilizando detecciones (0 = sin límite)
+        ancho: ancho aproximado del fotograma reducido sobre el que se calcula el puntaje
+        umbral_pixel: diferencia de gris mínima para contar un píxel como cambiado
+        metodo: "diferencia" (contra el último fotograma inferido) o "fondo" (MOG2)
+        """
+        self.detectar = detectar
+        self.umbral = umbral
+        self.intervalo_max_s = intervalo_max_s
+        self.ancho = ancho
+        self.umbral_pixel = umbral_pixel
+        self.metodo = metodo
+
+        self.referencia = None
+        self.fondo = cv2.createBackgroundSubtractorMOG2(history=300, detectShadows=False) \
+            if metodo == "fondo" else None
+        self.tam_reducido = None
+        self.factor = 1
+        self.reducido = None
+        self.diferencia = None
+        self.mascara = None
+
+        self.ultimas = None
+        self.t_ultima = None
+        self.ultimo_puntaje = 0.0
+
+        # Estadísticas
+        self.fotogramas = 0
+        self.inferencias = 0
+        self.forzadas = 0
+        self.t_puntaje = 0.0
+        self.t_inferencia = 0.0
+
+    def _puntaje(self, frame):
+        """
+        Porcentaje de píxeles del fotograma reducido que cambiaron
+        """
+        if self.tam_reducido is None:
+            # Factor entero: INTER_AREA con razón exacta es varias veces más rápido
+            h, w = frame.shape[:2]
+            self.factor = max(1, w // self.ancho)
+            self.tam_reducido = (w // self.factor, max(1, h // self.factor))
+            self.reducido = np.empty(self.tam_reducido[::-1], np.uint8)
+            self.diferencia = np.empty_like(self.reducido)
+            self.mascara = np.empty_like(self.reducido)
+
+        gris = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        w, h = self.tam_reducido
+        # INTER_AREA promedia bloques: también filtra el ruido del sensor
+        cv2.resize(gris[:h * self.factor, :w * self.factor], self.tam_reducido, dst=self.reducido,
+                   interpolation=cv2.INTER_AREA)
+
+        if self.fondo is not None:
+            self.fondo.apply(self.reducido, self.mascara)
+            return 100.0 * cv2.countNonZero(self.mascara) / self.mascara.size
+
+        if self.referencia is None:
+            return 100.0
+        cv2.absdiff(self.reducido, self.referencia, dst=self.diferencia)
+        cv2.threshold(self.diferencia, self.umbral_pixel, 255, cv2.THRESH_BINARY, dst=self.mascara)
+        return 100.0 * cv2.countNonZero(self.mascara) / self.mascara.size
+
+    def __call__(self, frame, t=None):
+        """
+        Devuelve las detecciones del fotograma, nuevas o reutilizadas
+        t: instante del fotograma en segundos (por defecto el reloj; útil para videos grabados)
+        """
+        t = time.monotonic() if t is None else t
+        self.fotogramas += 1
+
+        inicio = time.perf_counter()
+        self.ultimo_puntaje = self._puntaje(frame)
+        self.t_puntaje += time.perf_counter() - inicio
+
+        vencida = self.t_ultima is None or (self.intervalo_max_s and t - self.t_ultima >= self.intervalo_max_s)
+        if self.ultimas is not None and self.ultimo_puntaje < self.umbral and not vencida:
+            return self.ultimas
+
+        if self.ultimas is not None and self.ultimo_puntaje < self.umbral:
+            self.forzadas += 1
+        inicio = time.perf_counter()
+        self.ultimas = self.detectar(frame)
+        self.t_inferencia += time.perf_counter() - inicio
+        self.inferencias += 1
+        self.t_ultima = t
+        if self.fondo is None:
+            # La próxima diferencia se mide contra este fotograma
+            self.referencia = self.reducido.copy()
+        return self.ultimas
+
+    def estadisticas(self):
+        omitidos = self.fotogramas - self.inferencias
+        return {
+            "fotogramas": self.fotogramas,
+            "inferencias": self.inferencias,
+            "forzadas": self.forzadas,
+            "omitidos": omitidos,
+            "fraccion_omitidos": omitidos / self.fotogramas if self.fotogramas else 0.0,
+            "puntaje_ms": 1000.0 * self.t_puntaje / self.fotogramas if self.fotogramas else 0.0,
+            "inferencia_ms": 1000.0 * self.t_inferencia / self.inferencias if self.inferencias else 0.0,
+        }
@@ -0,0 +1,340 @@
+"""
+Registro de detecciones en registros NumPy de tipo fijo sobre archivos mapeados en memoria
+Cada detección ocupa 32 bytes (instante, flujo, clase, confianza, caja) y se añade a
+bloques .npy de capacidad fija abiertos con memmap. Un índice JSON guarda por bloque
+cuántos registros son válidos y su rango de tiempo; las consultas descartan bloques
+con él, ubican el intervalo dentro de cada bloque por búsqueda binaria sobre la
+columna de tiempo y agregan con NumPy, sin convertir texto.
+Las detecciones se juntan en un lote en memoria y se copian a los bloques al llenarlo
+o cada periodo_vaciado segundos; el índice se reescribe de forma atómica después de
+copiar los datos, así otro proceso que lo lea nunca ve registros a medio escribir
+Uso: python registro_detecciones.py ../logs/detecciones [--minutos 10] [--periodo 60]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+REGISTRO = np.dtype([
+    ("t", "<f8"),  # segundos desde la época (time.time())
+    ("flujo", "<u2"),
+    ("clase", "<u2"),
+    ("confianza", "<f4"),
+    ("caja", "<f4", (4,)),  # x1, y1, x2, y2 en píxeles
+])
+ARCHIVO_INDICE = "indice.json"
+
+
+class RegistroDetecciones:
+    def __init__(self, carpeta, capacidad_bloque=1 << 20, tam_lote=4096, periodo_vaciado=1.0,
+                 solo_lectura=False):
+        """
+        carpeta: se crea si no existe; si ya tiene un registro se sigue añadiendo al final
+        capacidad_bloque: registros por archivo (1 << 20 = 32 MB)
+        tam_lote / periodo_vaciado: los registros pasan a los bloques al juntar tam_lote
+        o cada periodo_vaciado segundos
+        solo_lectura: para consultar un registro que otro proceso está escribiendo
+        """
+        self.carpeta = carpeta
+        self.solo_lectura = solo_lectura
+        self.periodo_vaciado = periodo_vaciado
+        self.capacidad_bloque = capacidad_bloque
+        self.clases = []
+        self.ids = {}
+        self.bloques = []
+        if os.path.exists(os.path.join(carpeta, ARCHIVO_INDICE)):
+            self.recargar()
+        elif solo_lectura:
+            raise FileNotFoundError(f"No hay un registro de detecciones en '{carpeta}'")
+        else:
+            os.makedirs(carpeta, exist_ok=True)
+            self._guardar_indice()
+
+        self.lote = np.empty(tam_lote, dtype=REGISTRO)
+        self.pendientes = 0
+        self.t_vaciado = time.monotonic()
+        self.mapas = {}
+
+        # Estadísticas
+        self.vaciados = 0
+
+    def recargar(self):
+        """
+        Vuelve a leer el índice (un lector ve así lo que el escritor añadió)
+        """
+        with open(os.path.join(self.carpeta, ARCHIVO_INDICE), encoding="utf-8") as f:
+            indice = json.load(f)
+        self.capacidad_bloque = indice["capacidad_bloque"]
+        self.clases = indice["clases"]
+        self.bloques = indice["bloques"]
+        self.ids = {nombre: i for i, nombre in enumerate(self.clases)}
+
+    def __len__(self):
+        return sum(bloque["n"] for bloque in self.bloques) + self.pendientes
+
+    def id_clase(self, nombre):
+        """
+        Id numérico de una clase; las nuevas se añaden a la tabla del índice
+        """
+        i = self.ids.get(nombre)
+        if i is None:
+            i = self.ids[nombre] = len(self.clases)
+            self.clases.append(nombre)
+        return i
+
+    def agregar(self, t, flujo, clase, confianza, caja):
+        """
+        Añade una detección; clase puede ser el nombre o un id ya dado por id_clase
+        """
+        if isinstance(clase, str):
+            clase = self.id_clase(clase)
+        else:
+            self._validar_ids(clase)
+        self.lote[self.pendientes] = (t, flujo, clase, confianza, caja)
+        self.pendientes += 1
+        if self.pendientes == len(self.lote) or time.monotonic() - self.t_vaciado >= self.periodo_vaciado:
+            self.vaciar()
+
+    def agregar_lote(self, t, flujo, clases, confianzas, cajas):
+        """
+        Añade las N detecciones de un fotograma (o un arreglo ya armado)
+        t y flujo pueden ser un valor para todas o un arreglo (N,); clases nombres o ids
+        (de id_clase); cajas (N, 4)
+        """
+        n = len(confianzas)
+        if n == 0:
+            return
+        if isinstance(clases[0], str):
+            clases = [self.id_clase(c) for c in clases]
+        else:
+            self._validar_ids(clases)
+        if self.pendientes + n > len(self.lote):
+            self.vaciar(guardar_indice=False)
+        if n > len(self.lote):
+            registros = np.empty(n, dtype=REGISTRO)
+        else:
+            registros = self.lote[self.pendientes:self.pendientes + n]
+        registros["t"] = t
+        registros["flujo"] = flujo
+        registros["clase"] = clases
+        registros["confianza"] = confianzas
+        registros["caja"] = cajas
+        if n > len(self.lote):
+            self._escribir(registros)
+            self._guardar_indice()
+            return
+        self.pendientes += n
+        if self.pendientes == len(self.lote) or time.monotonic() - self.t_vaciado >= self.periodo_vaciado:
+            self.vaciar()
+
+    def _validar_ids(self, clases):
+        """
+        Un id fuera de la tabla de clases caería en la columna de otra clase y periodo
+        al contar (clave = periodo * clases + clase), así que se rechaza al escribir
+        """
+        ids = np.asarray(clases)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self.clases)):
+            raise ValueError(f"Id de clase fuera de la tabla ({len(self.clases)} clases): "
+                             f"{ids.min()}..{ids.max()}; registre el nombre con id_clase")
+
+    def vaciar(self, sincronizar=False, guardar_indice=True):
+        """
+        Copia el lote pendiente a los bloques y publica el índice
+        sincronizar: forzar la escritura a disco (msync); sin ella los datos ya quedan
+        en la caché del sistema y sobreviven a que el proceso termine
+        """
+        if self.pendientes:
+            self._escribir(self.lote[:self.pendientes])
+            self.pendientes = 0
+            self.vaciados += 1
+        if sincronizar:
+            for mapa in self.mapas.values():
+                mapa.flush()
+        if guardar_indice:
+            self._guardar_indice()
+        self.t_vaciado = time.monotonic()
+
+    def cerrar(self):
+        if not self.solo_lectura:
+            self.vaciar(sincronizar=True)
+        self.mapas.clear()
+
+    def _mapa(self, bloque):
+        mapa = self.mapas.get(bloque["archivo"])
+        if mapa is None:
+            ruta = os.path.join(self.carpeta, bloque["archivo"])
+            mapa = np.load(ruta, mmap_mode="r" if self.solo_lectura else "r+")
+            self.mapas[bloque["archivo"]] = mapa
+        return mapa
+
+    def _bloque_escritura(self):
+        """
+        Último bloque si tiene espacio; si no, crea uno nuevo (archivo disperso)
+        """
+        if self.bloques and self.bloques[-1]["n"] < self.capacidad_bloque:
+            return self.bloques[-1]
+        bloque = {"archivo": f"bloque_{len(self.bloques):06d}.npy", "n": 0,
+                  "t_min": None, "t_max": None, "ordenado": True}
+        ruta = os.path.join(self.carpeta, bloque["archivo"])
+        self.mapas[bloque["archivo"]] = np.lib.format.open_memmap(
+            ruta, mode="w+", dtype=REGISTRO, shape=(self.capacidad_bloque,))
+        self.bloques.append(bloque)
+        return bloque
+
+    def _escribir(self, registros):
+        i = 0
+        while i < len(registros):
+            bloque = self._bloque_escritura()
+            mapa = self._mapa(bloque)
+            n = bloque["n"]
+            k = min(len(registros) - i, self.capacidad_bloque - n)
+            parte = registros[i:i + k]
+            mapa[n:n + k] = parte
+
+            # Un bloque en orden de tiempo admite búsqueda binaria; si llega algo fuera
+            # de orden (varios flujos, reloj ajustado) se consulta con una máscara
+            t = parte["t"]
+            ordenado = bloque["ordenado"] and bool(np.all(t[1:] >= t[:-1]))
+            if n and ordenado:
+                ordenado = bool(t[0] >= mapa[n - 1]["t"])
+            t_min, t_max = float(t.min()), float(t.max())
+            bloque.update(n=n + k, ordenado=ordenado,
+                          t_min=t_min if bloque["t_min"] is None else min(bloque["t_min"], t_min),
+                          t_max=t_max if bloque["t_max"] is None else max(bloque["t_max"], t_max))
+            i += k
+
+    def _guardar_indice(self):
+        ruta = os.path.join(self.carpeta, ARCHIVO_INDICE)
+        temporal = ruta + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            json.dump({"capacidad_bloque": self.capacidad_bloque, "clases": self.clases,
+                       "bloques": self.bloques}, f)
+        os.replace(temporal, ruta)
+
+    def tramos(self, t0=None, t1=None):
+        """
+        Registros con t0 <= t < t1 como vistas de cada bloque (sin copiar)
+        En el escritor se vacía antes el lote pendiente
+        """
+        if self.pendientes and not self.solo_lectura:
+            self.vaciar()
+        for bloque in self.bloques:
+            n = bloque["n"]
+            if n == 0 or (t0 is not None and bloque["t_max"] < t0) or (t1 is not None and bloque["t_min"] >= t1):
+                continue
+            datos = self._mapa(bloque)[:n]
+            if bloque["ordenado"]:
+                # bisect sobre el memmap solo toca ~log2(n) páginas
+                tiempos = datos["t"]
+                i0 = 0 if t0 is None or bloque["t_min"] >= t0 else bisect.bisect_left(tiempos, t0)
+                i1 = n if t1 is None or bloque["t_max"] < t1 else bisect.bisect_left(tiempos, t1)
+                if i1 > i0:
+                    yield datos[i0:i1]
+            else:
+                tiempos = datos["t"]
+                mascara = np.ones(n, dtype=bool)
+                if t0 is not None:
+                    mascara &= tiempos >= t0
+                if t1 is not None:
+                    mascara &= tiempos < t1
+                if mascara.any():
+                    yield datos[mascara]
+
+    def leer(self, t0=None, t1=None, flujo=None, clase=None, conf_min=None):
+        """
+        Copia de los registros del intervalo que cumplen los filtros (arreglo REGISTRO)
+        """
+        if isinstance(clase, str):
+            clase = self.ids.get(clase, -1)
+        partes = []
+        for datos in self.tramos(t0, t1):
+            mascara = None
+            for campo, valor, es_minimo in (("flujo", flujo, False), ("clase", clase, False),
+                                            ("confianza", conf_min, True)):
+                if valor is None:
+                    continue
+                m = datos[campo] >= valor if es_minimo else datos[campo] == valor
+                mascara = m if mascara is None else mascara & m
+            partes.append(np.array(datos) if mascara is None else datos[mascara])
+        if not partes:
+            return np.empty(0, dtype=REGISTRO)
+        return np.concatenate(partes)
+
+    def conteo_por_periodo(self, t0=None, t1=None, periodo=60.0, flujo=None, conf_min=None):
+        """
+        Detecciones por clase en cada periodo (por defecto, por minuto)
+        Devuelve (inicio de cada periodo (P,), conteos (P, clases)); los periodos se
+        alinean a múltiplos de 'periodo' desde la época
+        """
+        if self.pendientes and not self.solo_lectura:
+            self.vaciar()
+        ocupados = [b for b in self.bloques if b["n"]]
+        if not ocupados:
+            return np.empty(0), np.zeros((0, len(self.clases)), dtype=np.int64)
+        # Rango de periodos a partir del índice, sin leer los bloques
+        primero = min(b["t_min"] for b in ocupados)
+        ultimo = max(b["t_max"] for b in ocupados)
+        if t0 is not None:
+            primero = max(primero, t0)
+        if t1 is not None:
+            ultimo = min(ultimo, t1)
+        base = math.floor(primero / periodo)
+        num_periodos = max(math.floor(ultimo / periodo) - base + 1, 0)
+        num_clases = len(self.clases)
+        conteos = np.zeros(num_periodos * num_clases, dtype=np.int64)
+
+        for datos in self.tramos(t0, t1):
+            mascara = None
+            if flujo is not None:
+                mascara = datos["flujo"] == flujo
+            if conf_min is not None:
+                m = datos["confianza"] >= conf_min
+                mascara = m if mascara is None else mascara & m
+            t = datos["t"] if mascara is None else datos["t"][mascara]
+            clases = datos["clase"] if mascara is None else datos["clase"][mascara]
+            clave = (np.floor(t / periodo).astype(np.int64) - base) * num_clases + clases
+            # Un registro justo en t_max puede caer fuera si t1 no es múltiplo del periodo
+            clave = clave[(clave >= 0) & (clave < len(conteos))]
+            conteos += np.bincount(clave, minlength=len(conteos))
+
+        inicios = (base + np.arange(num_periodos)) * periodo
+        return inicios, conteos.reshape(num_periodos, num_clases)
+
+
+def main():
+    """
+    Resumen de un registro: detecciones por clase en los últimos minutos
+    """
+    parser = argparse.ArgumentParser(description="Consulta del registro de detecciones")
+    parser.add_argument("carpeta", nargs="?", default="../logs/detecciones")
+    parser.add_argument("--minutos", type=float, default=10.0, help="Ventana hasta la última detección")
+    parser.add_argument("--periodo", type=float, default=60.0, help="Segundos por fila")
+    parser.add_argument("--conf-min", type=float, default=None)
+    args = parser.parse_args()
+
+    registro = RegistroDetecciones(args.carpeta, solo_lectura=True)
+    ocupados = [b for b in registro.bloques if b["n"]]
+    print(f"{len(registro)} detecciones en {len(registro.bloques)} bloque(s) | clases: {', '.join(registro.clases)}")
+    if not ocupados:
+        return
+    t1 = max(b["t_max"] for b in ocupados)
+    inicio = time.perf_counter()
+    inicios, conteos = registro.conteo_por_periodo(t1 - 60 * args.minutos, None, args.periodo,
+                                                   conf_min=args.conf_min)
+    duracion = 1000 * (time.perf_counter() - inicio)
+    print("inicio               " + " ".join(f"{c[:10]:>10}" for c in registro.clases))
+    for t, fila in zip(inicios, conteos):
+        print(datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") + "  "
+              + " ".join(f"{v:>10}" for v in fila))
+    print(f"Consulta en {duracion:.1f} ms")
+    registro.cerrar()
+
+
+if __name__ == "__main__":
+    main()
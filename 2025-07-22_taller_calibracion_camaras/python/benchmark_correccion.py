@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark de corrección de distorsión en tiempo real
+Compara el camino original de test_calibracion_tiempo_real (getOptimalNewCameraMatrix
++ undistort + recorte + resize en cada fotograma) contra CorrectorDistorsion
+Uso: python benchmark_correccion.py [archivo_calibracion] [repeticiones]
+"""
+
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from utilidades import CorrectorDistorsion, cargar_parametros_calibracion
+
+
+def corregir_original(frame, mtx, dist):
+    h, w = frame.shape[:2]
+    newcameramtx, roi = cv2.getOptimalNewCameraMatrix(mtx, dist, (w, h), 1, (w, h))
+    dst = cv2.undistort(frame, mtx, dist, None, newcameramtx)
+    x, y, w_roi, h_roi = roi
+    dst = dst[y:y+h_roi, x:x+w_roi]
+    return cv2.resize(dst, (w, h))
+
+
+def main():
+    archivo = sys.argv[1] if len(sys.argv) > 1 else "../resultados/calibracion_camara.json"
+    repeticiones = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    data = cargar_parametros_calibracion(archivo)
+    if not data:
+        return
+    mtx = np.array(data['matriz_camara'])
+    dist = np.array(data['coeficientes_distorsion'])
+
+    rng = np.random.default_rng(0)
+    corrector = CorrectorDistorsion()
+
+    for w, h in [(640, 480), (1280, 720), (1920, 1080)]:
+        # La calibración es de 640x480: se escala la matriz a cada resolución
+        escala = np.diag([w / 640, h / 480, 1.0])
+        mtx_res = escala @ mtx
+        frame = rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+        frame = cv2.GaussianBlur(frame, (0, 0), 3)
+
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            ref = corregir_original(frame, mtx_res, dist)
+        t_original = (time.perf_counter() - inicio) / repeticiones * 1000
+
+        corrector.corregir(frame, mtx_res, dist)  # Construye los mapas una vez
+        inicio = time.perf_counter()
+        for _ in range(repeticiones):
+            nuevo = corrector.corregir(frame, mtx_res, dist)
+        t_nuevo = (time.perf_counter() - inicio) / repeticiones * 1000
+
+        diferencia = np.abs(ref.astype(np.int16) - nuevo.astype(np.int16)).mean()
+        print(f"{w}x{h}: original {t_original:6.2f} ms | remap {t_nuevo:6.2f} ms "
+              f"({t_original / t_nuevo:.1f}x) | diferencia media {diferencia:.2f} niveles")
+
+
+if __name__ == "__main__":
+    main()
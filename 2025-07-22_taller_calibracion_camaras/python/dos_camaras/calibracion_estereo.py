@@ -9,6 +9,31 @@ import numpy as np
 import glob
 import os
 import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Criterio de refinamiento subpíxel de las esquinas
+CRITERIO_SUBPIX = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+# Banderas de la pre-pasada rápida sobre la imagen reducida
+FLAGS_PREPASADA = cv2.CALIB_CB_ADAPTIVE_THRESH + cv2.CALIB_CB_NORMALIZE_IMAGE + cv2.CALIB_CB_FAST_CHECK
+# Lados máximos de las pasadas, de la más barata a la más fina: la segunda encuentra
+# tableros de cuadros pequeños (6-8 px en 1080p) y sigue rechazando una imagen sin
+# tablero en menos tiempo que la búsqueda completa a resolución original
+LADOS_PREPASADA = (640, 1280)
+
+
+def prepasada_esquinas(gray, patron_size, lado_max=640):
+    """
+    Busca el patrón en una versión reducida con CALIB_CB_FAST_CHECK
+    Devuelve las esquinas escaladas a la resolución original o None si no hay patrón
+    """
+    escala = min(1.0, lado_max / max(gray.shape))
+    pequeña = gray if escala == 1.0 else cv2.resize(gray, None, fx=escala, fy=escala,
+                                                     interpolation=cv2.INTER_AREA)
+    ret, corners = cv2.findChessboardCorners(pequeña, patron_size, FLAGS_PREPASADA)
+    if not ret:
+        return None
+    return corners / escala
+
 
 class CalibradorEstereo:
     def __init__(self, patron_size=(9, 6), tam_cuadrado=1.0):
@@ -28,6 +53,29 @@ class CalibradorEstereo:
         self.imgpoints_l = []   # Puntos 2D en imagen izquierda
         self.imgpoints_r = []   # Puntos 2D en imagen derecha
         
+        # Imágenes decodificadas una sola vez y compartidas por todas las etapas
+        self.cache_imagenes = {}
+        self.imagenes_l = []
+        self.imagenes_r = []
+        self.img_size = None
+        
+    def leer_imagen(self, fname):
+        """
+        Devuelve la imagen decodificada desde la caché (la decodifica la primera vez)
+        """
+        img = self.cache_imagenes.get(fname)
+        if img is None:
+            img = cv2.imread(fname)
+            if img is not None:
+                self.cache_imagenes[fname] = img
+        return img
+        
+    def liberar_cache(self):
+        """
+        Libera las imágenes decodificadas
+        """
+        self.cache_imagenes.clear()
+        
     def capturar_imagenes_estereo(self, num_imagenes=15, carpeta_salida="../imagenes"):
         """
         Captura pares de imágenes estéreo desde dos cámaras
@@ -129,9 +177,59 @@ class CalibradorEstereo:
         cv2.destroyAllWindows()
         return contador > 0
         
-    def detectar_esquinas_estereo(self, carpeta_imagenes="../imagenes"):
+    def _detectar_lado(self, fname):
+        """
+        Decodifica una imagen y busca el patrón con pasadas rápidas cada vez menos
+        reducidas (LADOS_PREPASADA); si ninguna lo encuentra el lado se rechaza
+        Devuelve (gray, esquinas sin refinar) o None si falla
+        """
+        img = self.leer_imagen(fname)
+        if img is None:
+            return None
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        for lado_max in LADOS_PREPASADA:
+            corners = prepasada_esquinas(gray, self.patron_size, lado_max)
+            if corners is not None:
+                return gray, corners
+            if lado_max >= max(gray.shape):
+                break  # Ya se buscó a resolución original
+        return None
+        
+    def _procesar_par(self, pool_lados, fname_l, fname_r):
+        """
+        Detecta ambos lados en paralelo y descarta el par en cuanto un lado falla
+        Devuelve (corners_l, corners_r) refinadas o None
+        """
+        futuros = {pool_lados.submit(self._detectar_lado, fname_l): 'l',
+                   pool_lados.submit(self._detectar_lado, fname_r): 'r'}
+        resultados = {}
+        pendientes = set(futuros)
+        while pendientes:
+            listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in listos:
+                resultado = futuro.result()
+                if resultado is None:
+                    # Corto circuito: el otro lado ya no se refina ni se espera
+                    for otro in pendientes:
+                        otro.cancel()
+                    # El par no se usará: sus imágenes salen de la caché
+                    self.cache_imagenes.pop(fname_l, None)
+                    self.cache_imagenes.pop(fname_r, None)
+                    return None
+                resultados[futuros[futuro]] = resultado
+        
+        # Refinar ambos lados en paralelo
+        refinar = lambda gray, corners: cv2.cornerSubPix(
+            gray, corners, (11, 11), (-1, -1), CRITERIO_SUBPIX)
+        futuro_l = pool_lados.submit(refinar, *resultados['l'])
+        futuro_r = pool_lados.submit(refinar, *resultados['r'])
+        return futuro_l.result(), futuro_r.result()
+        
+    def detectar_esquinas_estereo(self, carpeta_imagenes="../imagenes", hilos=None, guardar_anotadas=True):
         """
         Detecta esquinas en pares de imágenes estéreo
+        hilos: pares procesados a la vez (None = núcleos disponibles)
+        guardar_anotadas: guarda la visualización de esquinas de cada par válido
         """
         imagenes_l = sorted(glob.glob(f"{carpeta_imagenes}/izquierda/*.jpg"))
         imagenes_r = sorted(glob.glob(f"{carpeta_imagenes}/derecha/*.jpg"))
@@ -140,48 +238,51 @@ class CalibradorEstereo:
             print(f"No se encontraron pares de imágenes en: {carpeta_imagenes}")
             return False
             
-        print(f"Procesando {min(len(imagenes_l), len(imagenes_r))} pares de imágenes...")
-        
-        for i, (fname_l, fname_r) in enumerate(zip(imagenes_l, imagenes_r)):
-            img_l = cv2.imread(fname_l)
-            img_r = cv2.imread(fname_r)
-            
-            if img_l is None or img_r is None:
+        num_pares = min(len(imagenes_l), len(imagenes_r))
+        self.imagenes_l = imagenes_l[:num_pares]
+        self.imagenes_r = imagenes_r[:num_pares]
+        print(f"Procesando {num_pares} pares de imágenes...")
+        
+        hilos = hilos or os.cpu_count() or 1
+        # OpenCV libera el GIL, así que los hilos trabajan en paralelo real
+        with ThreadPoolExecutor(max_workers=hilos) as pool_pares, \
+             ThreadPoolExecutor(max_workers=2 * hilos) as pool_lados:
+            # map conserva el orden de los pares
+            resultados = list(pool_pares.map(
+                lambda par: self._procesar_par(pool_lados, *par),
+                zip(self.imagenes_l, self.imagenes_r)))
+        
+        for i, (fname_l, fname_r, resultado) in enumerate(zip(self.imagenes_l, self.imagenes_r, resultados)):
+            # Solo usar si se detectan esquinas en ambas imágenes
+            if resultado is None:
+                print(f"Esquinas no detectadas en par: {i}")
                 continue
                 
-            gray_l = cv2.cvtColor(img_l, cv2.COLOR_BGR2GRAY)
-            gray_r = cv2.cvtColor(img_r, cv2.COLOR_BGR2GRAY)
+            corners_l, corners_r = resultado
+            self.objpoints.append(self.objp)
+            self.imgpoints_l.append(corners_l)
+            self.imgpoints_r.append(corners_r)
             
-            # Encontrar esquinas en ambas imágenes
-            ret_l, corners_l = cv2.findChessboardCorners(gray_l, self.patron_size, None)
-            ret_r, corners_r = cv2.findChessboardCorners(gray_r, self.patron_size, None)
+            img_l = self.leer_imagen(fname_l)
+            self.img_size = img_l.shape[1::-1]
             
-            # Solo usar si se detectan esquinas en ambas imágenes
-            if ret_l and ret_r:
-                # Refinar coordenadas
-                criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-                corners_l = cv2.cornerSubPix(gray_l, corners_l, (11, 11), (-1, -1), criteria)
-                corners_r = cv2.cornerSubPix(gray_r, corners_r, (11, 11), (-1, -1), criteria)
-                
-                # Añadir puntos
-                self.objpoints.append(self.objp)
-                self.imgpoints_l.append(corners_l)
-                self.imgpoints_r.append(corners_r)
-                
-                # Dibujar esquinas
-                cv2.drawChessboardCorners(img_l, self.patron_size, corners_l, ret_l)
-                cv2.drawChessboardCorners(img_r, self.patron_size, corners_r, ret_r)
+            if guardar_anotadas:
+                # Dibujar esquinas sobre copias para no alterar la caché
+                vis_l = img_l.copy()
+                vis_r = self.leer_imagen(fname_r).copy()
+                cv2.drawChessboardCorners(vis_l, self.patron_size, corners_l, True)
+                cv2.drawChessboardCorners(vis_r, self.patron_size, corners_r, True)
                 
                 # Guardar visualización
-                combined = np.hstack((img_l, img_r))
+                combined = np.hstack((vis_l, vis_r))
                 output_path = f"../resultados/estereo_esquinas_{i:02d}.jpg"
                 os.makedirs(os.path.dirname(output_path), exist_ok=True)
                 cv2.imwrite(output_path, combined)
                 
-                print(f"Esquinas detectadas en par: {i}")
-            else:
-                print(f"Esquinas no detectadas en par: {i}")
+            print(f"Esquinas detectadas en par: {i}")
                 
+        # Las etapas siguientes solo usan los puntos; la rectificación vuelve a leer un par
+        self.liberar_cache()
         print(f"Total de pares válidos para calibración: {len(self.objpoints)}")
         return len(self.objpoints) > 0
         
@@ -191,12 +292,10 @@ class CalibradorEstereo:
         """
         if len(self.objpoints) == 0:
             print("Error: No hay puntos para calibración")
-            return None, None, None, None
+            return None, None, None
             
-        # Obtener tamaño de imagen
-        img_l = cv2.imread(glob.glob("../imagenes/izquierda/*.jpg")[0])
-        gray_l = cv2.cvtColor(img_l, cv2.COLOR_BGR2GRAY)
-        img_size = gray_l.shape[::-1]
+        # Tamaño de imagen obtenido durante la detección (sin volver a leer del disco)
+        img_size = self.img_size
         
         print("Calibrando cámara izquierda...")
         ret_l, mtx_l, dist_l, rvecs_l, tvecs_l = cv2.calibrateCamera(
@@ -281,8 +380,8 @@ class CalibradorEstereo:
             mtx_r, dist_r, R2, P2, img_size, cv2.CV_16SC2)
         
         # Aplicar rectificación a un par de imágenes
-        img_l = cv2.imread(glob.glob("../imagenes/izquierda/*.jpg")[0])
-        img_r = cv2.imread(glob.glob("../imagenes/derecha/*.jpg")[0])
+        img_l = self.leer_imagen(self.imagenes_l[0])
+        img_r = self.leer_imagen(self.imagenes_r[0])
         
         # Rectificar imágenes
         rectified_l = cv2.remap(img_l, map1_l, map2_l, cv2.INTER_LINEAR)
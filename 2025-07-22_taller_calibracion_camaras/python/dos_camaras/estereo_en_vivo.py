@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Modo estéreo en vivo usando la calibración guardada
+Carga calibracion_estereo.json, guarda los mapas de rectificación en un archivo
+binario junto al JSON, rectifica pares de fotogramas (un hilo por cámara) y
+calcula disparidad (StereoBM/SGBM) y profundidad a partir de Q
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def cargar_calibracion_estereo(ruta_json):
+    """
+    Lee el JSON de calibración estéreo y devuelve las matrices como arreglos NumPy
+    """
+    with open(ruta_json, 'rb') as f:
+        contenido = f.read()
+    data = json.loads(contenido)
+    calib = {
+        'mtx_l': np.array(data['matriz_camara_izq']),
+        'dist_l': np.array(data['distorsion_izq']),
+        'mtx_r': np.array(data['matriz_camara_der']),
+        'dist_r': np.array(data['distorsion_der']),
+        'R1': np.array(data['rectificacion_izq']),
+        'R2': np.array(data['rectificacion_der']),
+        'P1': np.array(data['proyeccion_izq']),
+        'P2': np.array(data['proyeccion_der']),
+        'Q': np.array(data['matriz_disparidad']),
+    }
+    # El hash del JSON invalida los mapas guardados si la calibración cambia
+    calib['huella'] = hashlib.sha1(contenido).hexdigest()[:16]
+    return calib
+
+
+def mapas_rectificacion(calib, img_size, ruta_json):
+    """
+    Devuelve los mapas (map1_l, map2_l, map1_r, map2_r) en punto fijo (CV_16SC2)
+    Los lee del archivo binario junto al JSON o los construye y los guarda
+    """
+    w, h = img_size
+    ruta_mapas = os.path.splitext(ruta_json)[0] + f"_mapas_{w}x{h}_{calib['huella']}.npz"
+    if os.path.exists(ruta_mapas):
+        with np.load(ruta_mapas) as datos:
+            return datos['map1_l'], datos['map2_l'], datos['map1_r'], datos['map2_r']
+
+    map1_l, map2_l = cv2.initUndistortRectifyMap(
+        calib['mtx_l'], calib['dist_l'], calib['R1'], calib['P1'], img_size, cv2.CV_16SC2)
+    map1_r, map2_r = cv2.initUndistortRectifyMap(
+        calib['mtx_r'], calib['dist_r'], calib['R2'], calib['P2'], img_size, cv2.CV_16SC2)
+    np.savez(ruta_mapas, map1_l=map1_l, map2_l=map2_l, map1_r=map1_r, map2_r=map2_r)
+    print(f"Mapas de rectificación guardados en: {ruta_mapas}")
+    return map1_l, map2_l, map1_r, map2_r
+
+
+class FuenteCarpeta:
+    """
+    Lee las imágenes de una carpeta en orden, con la interfaz de cv2.VideoCapture
+    """
+
+    def __init__(self, carpeta, extensiones=("jpg", "png")):
+        self.archivos = sorted(f for ext in extensiones for f in glob.glob(os.path.join(carpeta, f"*.{ext}")))
+        self.indice = 0
+
+    def isOpened(self):
+        return bool(self.archivos)
+
+    def read(self):
+        if self.indice >= len(self.archivos):
+            return False, None
+        img = cv2.imread(self.archivos[self.indice])
+        self.indice += 1
+        return img is not None, img
+
+    def release(self):
+        pass
+
+
+def abrir_fuente(fuente):
+    if os.path.isdir(fuente):
+        return FuenteCarpeta(fuente)
+    return cv2.VideoCapture(int(fuente) if fuente.isdigit() else fuente)
+
+
+class TrabajadorCamara:
+    def __init__(self, cap, map1, map2, tam_cola=2, primero=None):
+        """
+        Hilo que lee una cámara y rectifica cada fotograma a escala de grises
+        Usa un anillo de buffers preasignados: la cola nunca tiene más fotogramas
+        que buffers libres, así el consumidor no ve un buffer reescrito
+        """
+        self.cap = cap
+        self.primero = primero  # Fotograma ya leído para conocer el tamaño
+        self.map1 = map1
+        self.map2 = map2
+        self.cola = queue.Queue(maxsize=tam_cola)
+        h, w = map1.shape[:2]
+        self.buffers_gray = [np.empty((h, w), np.uint8) for _ in range(tam_cola + 2)]
+        self.buffers_rect = [np.empty((h, w), np.uint8) for _ in range(tam_cola + 2)]
+        self.siguiente = 0
+        self.t_captura = 0.0
+        self.t_rectificacion = 0.0
+        self.fotogramas = 0
+        self.error = None  # Excepción que terminó el hilo, si la hubo
+        self.hilo = threading.Thread(target=self._bucle, daemon=True)
+
+    def iniciar(self):
+        self.hilo.start()
+        return self
+
+    def _bucle(self):
+        """
+        Termina siempre con None en la cola para que el consumidor no se quede
+        esperando; si fue por una excepción, la deja en self.error
+        """
+        try:
+            while True:
+                inicio = time.perf_counter()
+                if self.primero is not None:
+                    ret, frame, self.primero = True, self.primero, None
+                else:
+                    ret, frame = self.cap.read()
+                if not ret:
+                    break
+                medio = time.perf_counter()
+
+                gray = self.buffers_gray[self.siguiente]
+                rect = self.buffers_rect[self.siguiente]
+                self.siguiente = (self.siguiente + 1) % len(self.buffers_gray)
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+                cv2.remap(gray, self.map1, self.map2, cv2.INTER_LINEAR, dst=rect)
+
+                fin = time.perf_counter()
+                self.t_captura += medio - inicio
+                self.t_rectificacion += fin - medio
+                self.fotogramas += 1
+                self.cola.put(rect)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.cola.put(None)
+
+
+class MotorDisparidad:
+    def __init__(self, Q, img_size, algoritmo="sgbm", num_disparidades=64, bloque=7):
+        """
+        Calcula disparidad y profundidad en buffers preasignados
+        algoritmo: "sgbm" (mejor calidad) o "bm" (más rápido)
+        """
+        if algoritmo == "bm":
+            self.matcher = cv2.StereoBM_create(numDisparities=num_disparidades, blockSize=max(bloque, 5) | 1)
+        else:
+            self.matcher = cv2.StereoSGBM_create(
+                minDisparity=0, numDisparities=num_disparidades, blockSize=bloque,
+                P1=8 * bloque * bloque, P2=32 * bloque * bloque,
+                mode=cv2.STEREO_SGBM_MODE_SGBM_3WAY)
+
+        w, h = img_size
+        self.disparidad = np.empty((h, w), np.int16)
+        self.disparidad_px = np.empty((h, w), np.float32)
+        self.profundidad = np.zeros((h, w), np.float32)
+        self.denominador = np.empty((h, w), np.float32)
+        self.valida = np.empty((h, w), bool)
+
+        # Z = f / (Q[3,2] * d + Q[3,3]) con las entradas de Q de stereoRectify
+        self.f = float(Q[2, 3])
+        self.q32 = float(Q[3, 2])
+        self.q33 = float(Q[3, 3])
+
+    def calcular(self, rect_l, rect_r):
+        """
+        Devuelve (disparidad en píxeles, profundidad en unidades de la calibración)
+        """
+        self.matcher.compute(rect_l, rect_r, disparity=self.disparidad)
+        # Disparidad en punto fijo con 4 bits fraccionarios
+        np.multiply(self.disparidad, 1.0 / 16.0, out=self.disparidad_px, casting='unsafe')
+
+        np.multiply(self.disparidad_px, self.q32, out=self.denominador)
+        self.denominador += self.q33
+        np.greater(self.disparidad_px, 0, out=self.valida)
+        self.profundidad.fill(0)
+        np.divide(self.f, self.denominador, out=self.profundidad, where=self.valida)
+        np.abs(self.profundidad, out=self.profundidad)
+        return self.disparidad_px, self.profundidad
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rectificación y disparidad estéreo en vivo")
+    parser.add_argument("--izq", default="0", help="Cámara, video o carpeta de imágenes izquierdas")
+    parser.add_argument("--der", default="1", help="Cámara, video o carpeta de imágenes derechas")
+    parser.add_argument("--calibracion", default="../resultados/calibracion_estereo.json")
+    parser.add_argument("--algoritmo", choices=["sgbm", "bm"], default="sgbm")
+    parser.add_argument("--disparidades", type=int, default=64, help="Múltiplo de 16")
+    parser.add_argument("--sin-ventana", action="store_true", help="No mostrar ventanas (solo tiempos)")
+    parser.add_argument("--max-pares", type=int, default=None)
+    args = parser.parse_args()
+
+    calib = cargar_calibracion_estereo(args.calibracion)
+    cap_l = abrir_fuente(args.izq)
+    cap_r = abrir_fuente(args.der)
+    if not cap_l.isOpened() or not cap_r.isOpened():
+        print("Error: No se pudieron abrir las fuentes estéreo")
+        return
+
+    # El tamaño de imagen se toma del primer fotograma
+    ret_l, primero_l = cap_l.read()
+    ret_r, primero_r = cap_r.read()
+    if not ret_l or not ret_r:
+        print("Error: No se pudo leer el primer par")
+        return
+    img_size = primero_l.shape[1::-1]
+
+    map1_l, map2_l, map1_r, map2_r = mapas_rectificacion(calib, img_size, args.calibracion)
+    motor = MotorDisparidad(calib['Q'], img_size, args.algoritmo, args.disparidades)
+
+    trabajador_l = TrabajadorCamara(cap_l, map1_l, map2_l, primero=primero_l).iniciar()
+    trabajador_r = TrabajadorCamara(cap_r, map1_r, map2_r, primero=primero_r).iniciar()
+
+    pares = 0
+    t_disparidad = 0.0
+    t_espera = 0.0
+    inicio_total = time.perf_counter()
+    vista = np.empty((img_size[1], img_size[0]), np.uint8)
+
+    while args.max_pares is None or pares < args.max_pares:
+        inicio = time.perf_counter()
+        rect_l = trabajador_l.cola.get()
+        rect_r = trabajador_r.cola.get()
+        if rect_l is None or rect_r is None:
+            break
+        medio = time.perf_counter()
+
+        disparidad, profundidad = motor.calcular(rect_l, rect_r)
+        t_disparidad += time.perf_counter() - medio
+        t_espera += medio - inicio
+        pares += 1
+
+        if not args.sin_ventana:
+            cv2.normalize(disparidad, vista, 0, 255, cv2.NORM_MINMAX, cv2.CV_8U)
+            cx, cy = img_size[0] // 2, img_size[1] // 2
+            color = cv2.applyColorMap(vista, cv2.COLORMAP_JET)
+            cv2.putText(color, f"Z centro: {profundidad[cy, cx]:.1f}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+            cv2.imshow('Rectificado (Izq | Der)', np.hstack((rect_l, rect_r)))
+            cv2.imshow('Disparidad', color)
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+    duracion = time.perf_counter() - inicio_total
+    cap_l.release()
+    cap_r.release()
+    if not args.sin_ventana:
+        cv2.destroyAllWindows()
+
+    for lado, trabajador in (("izquierda", trabajador_l), ("derecha", trabajador_r)):
+        if trabajador.error is not None:
+            raise RuntimeError(f"Falló el hilo de la cámara {lado} tras {trabajador.fotogramas} "
+                               f"fotogramas: {trabajador.error}") from trabajador.error
+
+    if pares == 0:
+        print("No se procesó ningún par")
+        return
+
+    print("\n" + "="*60)
+    print("TIEMPOS POR ETAPA (ms por par)")
+    print("="*60)
+    for nombre, t in [("Captura izquierda", trabajador_l.t_captura / trabajador_l.fotogramas),
+                      ("Captura derecha", trabajador_r.t_captura / trabajador_r.fotogramas),
+                      ("Rectificación izquierda", trabajador_l.t_rectificacion / trabajador_l.fotogramas),
+                      ("Rectificación derecha", trabajador_r.t_rectificacion / trabajador_r.fotogramas),
+                      ("Espera del par", t_espera / pares),
+                      (f"Disparidad + profundidad ({args.algoritmo})", t_disparidad / pares)]:
+        print(f"{nombre:<35} {1000 * t:8.2f}")
+    print(f"Pares procesados: {pares} | {pares / duracion:.1f} pares/s")
+    print("="*60)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,73 @@ import numpy as np
 import glob
 import os
 import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+# Criterio de refinamiento subpíxel de las esquinas
+CRITERIO_SUBPIX = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
+
+
+def clave_cache_esquinas(contenido, patron_size):
+    """
+    Nombre del archivo de caché: hash del contenido de la imagen + tamaño del patrón
+    """
+    return f"{hashlib.sha1(contenido).hexdigest()}_{patron_size[0]}x{patron_size[1]}.npz"
+
+
+def detectar_esquinas_imagen(fname, patron_size, carpeta_cache=None, ruta_anotada=None):
+    """
+    Detecta y refina las esquinas de una imagen (se ejecuta en un proceso del pool)
+    Devuelve (encontrado, esquinas, tamaño_imagen, desde_cache)
+    """
+    with open(fname, 'rb') as f:
+        contenido = f.read()
+
+    ruta_cache = None
+    if carpeta_cache is not None:
+        ruta_cache = os.path.join(carpeta_cache, clave_cache_esquinas(contenido, patron_size))
+        if os.path.exists(ruta_cache):
+            with np.load(ruta_cache) as datos:
+                ret = bool(datos['encontrado'])
+                corners = datos['esquinas'] if ret else None
+                img_size = tuple(int(v) for v in datos['tamaño_imagen'])
+            if ret and ruta_anotada is not None:
+                img = cv2.imdecode(np.frombuffer(contenido, np.uint8), cv2.IMREAD_COLOR)
+                cv2.drawChessboardCorners(img, patron_size, corners, ret)
+                cv2.imwrite(ruta_anotada, img)
+            return ret, corners, img_size, True
+
+    # Se decodifica desde los bytes ya leídos para no abrir el archivo dos veces
+    img = cv2.imdecode(np.frombuffer(contenido, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        return False, None, None, False
+
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    img_size = gray.shape[::-1]
+
+    # Encontrar esquinas del tablero de ajedrez
+    ret, corners = cv2.findChessboardCorners(gray, patron_size, None)
+    if ret:
+        # Refinar coordenadas de esquinas
+        corners = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), CRITERIO_SUBPIX)
+
+        if ruta_anotada is not None:
+            # Dibujar y guardar imagen con esquinas detectadas
+            cv2.drawChessboardCorners(img, patron_size, corners, ret)
+            cv2.imwrite(ruta_anotada, img)
+    else:
+        corners = None
+
+    if ruta_cache is not None:
+        # Escritura atómica para que otro proceso nunca lea un archivo a medias
+        tmp = ruta_cache[:-len('.npz')] + f".{os.getpid()}.tmp.npz"
+        np.savez(tmp, encontrado=ret,
+                 esquinas=corners if ret else np.zeros((0, 1, 2), np.float32),
+                 tamaño_imagen=np.array(img_size))
+        os.replace(tmp, ruta_cache)
+
+    return bool(ret), corners, img_size, False
+
 
 class CalibradorCamara:
     def __init__(self, patron_size=(9, 6), tam_cuadrado=1.0):
@@ -28,6 +95,7 @@ class CalibradorCamara:
         # Arrays para almacenar puntos del objeto y puntos de imagen
         self.objpoints = []  # Puntos 3D en el mundo real
         self.imgpoints = []  # Puntos 2D en el plano de imagen
+        self.img_size = None  # Tamaño (ancho, alto) de las imágenes procesadas
         
     def capturar_imagenes_webcam(self, num_imagenes=20, carpeta_salida="../imagenes"):
         """
@@ -70,11 +138,16 @@ class CalibradorCamara:
         cv2.destroyAllWindows()
         return contador > 0
         
-    def detectar_esquinas(self, ruta_imagenes="../imagenes/*.jpg"):
+    def detectar_esquinas(self, ruta_imagenes="../imagenes/*.jpg", procesos=None, usar_cache=True,
+                          guardar_anotadas=True, carpeta_cache="../resultados/cache_esquinas"):
         """
         Detecta esquinas del patrón en las imágenes
+        procesos: procesos en paralelo (None = todos los núcleos, 1 = sin pool)
+        usar_cache: reutiliza las esquinas guardadas por hash de imagen y tamaño de patrón
+        guardar_anotadas: guarda una imagen JPEG con las esquinas dibujadas por cada detección
         """
-        imagenes = glob.glob(ruta_imagenes)
+        # Orden determinista: los resultados siempre se añaden en orden de nombre
+        imagenes = sorted(glob.glob(ruta_imagenes))
         
         if not imagenes:
             print(f"No se encontraron imágenes en: {ruta_imagenes}")
@@ -82,37 +155,43 @@ class CalibradorCamara:
             
         print(f"Procesando {len(imagenes)} imágenes...")
         
-        for i, fname in enumerate(imagenes):
-            img = cv2.imread(fname)
-            if img is None:
-                continue
+        if usar_cache:
+            os.makedirs(carpeta_cache, exist_ok=True)
+        else:
+            carpeta_cache = None
+        if guardar_anotadas:
+            os.makedirs("../resultados", exist_ok=True)
+        
+        argumentos = [
+            (fname, self.patron_size, carpeta_cache,
+             f"../resultados/esquinas_detectadas_{i:02d}.jpg" if guardar_anotadas else None)
+            for i, fname in enumerate(imagenes)
+        ]
+        
+        if procesos == 1:
+            resultados = [detectar_esquinas_imagen(*args) for args in argumentos]
+        else:
+            with ProcessPoolExecutor(max_workers=procesos) as pool:
+                # map conserva el orden de entrada
+                resultados = list(pool.map(detectar_esquinas_imagen, *zip(*argumentos),
+                                           chunksize=max(1, len(argumentos) // 64)))
+        
+        desde_cache = 0
+        for fname, (ret, corners, img_size, cacheada) in zip(imagenes, resultados):
+            desde_cache += cacheada
+            if img_size is not None:
+                self.img_size = img_size
                 
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            
-            # Encontrar esquinas del tablero de ajedrez
-            ret, corners = cv2.findChessboardCorners(gray, self.patron_size, None)
-            
             # Si se encuentran esquinas, añadir puntos del objeto y de imagen
             if ret:
                 self.objpoints.append(self.objp)
-                
-                # Refinar coordenadas de esquinas
-                criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 30, 0.001)
-                corners2 = cv2.cornerSubPix(gray, corners, (11, 11), (-1, -1), criteria)
-                self.imgpoints.append(corners2)
-                
-                # Dibujar y mostrar esquinas
-                cv2.drawChessboardCorners(img, self.patron_size, corners2, ret)
-                
-                # Guardar imagen con esquinas detectadas
-                output_path = f"../resultados/esquinas_detectadas_{i:02d}.jpg"
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-                cv2.imwrite(output_path, img)
-                
+                self.imgpoints.append(corners)
                 print(f"Esquinas detectadas en: {os.path.basename(fname)}")
             else:
                 print(f"No se detectaron esquinas en: {os.path.basename(fname)}")
                 
+        if desde_cache:
+            print(f"Imágenes tomadas de la caché: {desde_cache}")
         print(f"Total de imágenes válidas para calibración: {len(self.objpoints)}")
         return len(self.objpoints) > 0
         
@@ -124,10 +203,12 @@ class CalibradorCamara:
             print("Error: No hay puntos para calibración")
             return None
             
-        # Obtener tamaño de imagen
-        img = cv2.imread(glob.glob("../imagenes/*.jpg")[0])
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        img_size = gray.shape[::-1]
+        # Obtener tamaño de imagen (ya conocido si se detectaron esquinas)
+        img_size = self.img_size
+        if img_size is None:
+            img = cv2.imread(glob.glob("../imagenes/*.jpg")[0])
+            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+            img_size = gray.shape[::-1]
         
         print("Realizando calibración...")
         
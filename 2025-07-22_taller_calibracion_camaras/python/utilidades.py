@@ -8,6 +8,7 @@ import cv2
 import numpy as np
 import json
 import matplotlib.pyplot as plt
+from collections import OrderedDict
 from pathlib import Path
 
 def generar_patron_ajedrez(filas=6, columnas=9, tamaño_cuadrado=30, archivo_salida="patron_ajedrez.png"):
@@ -199,6 +200,62 @@ def comparar_calibraciones(archivo_una_camara, archivo_estereo=None):
     
     print("="*60)
 
+class CorrectorDistorsion:
+    """
+    Corrección de distorsión con mapas de remapeo precalculados
+    Los mapas (punto fijo, CV_16SC2) se construyen una vez por resolución y calibración,
+    incluyen el recorte al ROI válido y el redimensionado, y se guardan en una caché LRU
+    """
+    
+    def __init__(self, max_entradas=4):
+        self.max_entradas = max_entradas
+        self.cache = OrderedDict()
+        
+    def mapas(self, mtx, dist, tamaño, alpha=1, recortar=True, canales=3):
+        """
+        Devuelve (map1, map2, salida) para imágenes de tamaño (ancho, alto)
+        """
+        mtx = np.asarray(mtx, dtype=np.float64)
+        dist = np.asarray(dist, dtype=np.float64)
+        clave = (tuple(tamaño), alpha, recortar, canales, mtx.tobytes(), dist.tobytes())
+        
+        entrada = self.cache.get(clave)
+        if entrada is not None:
+            self.cache.move_to_end(clave)
+            return entrada
+            
+        w, h = tamaño
+        newcameramtx, roi = cv2.getOptimalNewCameraMatrix(mtx, dist, (w, h), alpha, (w, h))
+        
+        x, y, w_roi, h_roi = roi
+        if recortar and w_roi > 0 and h_roi > 0:
+            # Recorte + resize equivalen a desplazar y escalar la matriz de cámara nueva
+            sx, sy = w / w_roi, h / h_roi
+            newcameramtx = newcameramtx.copy()
+            newcameramtx[0, 0] *= sx
+            newcameramtx[1, 1] *= sy
+            newcameramtx[0, 2] = (newcameramtx[0, 2] - x + 0.5) * sx - 0.5
+            newcameramtx[1, 2] = (newcameramtx[1, 2] - y + 0.5) * sy - 0.5
+            
+        map1, map2 = cv2.initUndistortRectifyMap(mtx, dist, None, newcameramtx, (w, h), cv2.CV_16SC2)
+        salida = np.empty((h, w, canales) if canales > 1 else (h, w), dtype=np.uint8)
+        
+        entrada = (map1, map2, salida)
+        self.cache[clave] = entrada
+        if len(self.cache) > self.max_entradas:
+            self.cache.popitem(last=False)
+        return entrada
+        
+    def corregir(self, frame, mtx, dist, alpha=1, recortar=True):
+        """
+        Corrige la distorsión de un fotograma (uint8, color o escala de grises)
+        Escribe en un buffer preasignado que se reutiliza en la siguiente llamada
+        """
+        h, w = frame.shape[:2]
+        canales = frame.shape[2] if frame.ndim == 3 else 1
+        map1, map2, salida = self.mapas(mtx, dist, (w, h), alpha, recortar, canales)
+        return cv2.remap(frame, map1, map2, cv2.INTER_LINEAR, dst=salida)
+
 def test_calibracion_tiempo_real(archivo_calibracion, camara_id=0):
     """
     Prueba la calibración en tiempo real corrigiendo distorsión
@@ -217,27 +274,16 @@ def test_calibracion_tiempo_real(archivo_calibracion, camara_id=0):
     
     print("Presione 'q' para salir, 'c' para cambiar entre original/corregido")
     mostrar_corregido = True
+    corrector = CorrectorDistorsion()
     
     while True:
         ret, frame = cap.read()
         if not ret:
             break
         
-        h, w = frame.shape[:2]
-        
         if mostrar_corregido:
-            # Obtener matriz optimizada
-            newcameramtx, roi = cv2.getOptimalNewCameraMatrix(mtx, dist, (w, h), 1, (w, h))
-            
-            # Corregir distorsión
-            dst = cv2.undistort(frame, mtx, dist, None, newcameramtx)
-            
-            # Recortar
-            x, y, w_roi, h_roi = roi
-            dst = dst[y:y+h_roi, x:x+w_roi]
-            
-            # Redimensionar para mostrar
-            dst = cv2.resize(dst, (w, h))
+            # Corregir distorsión, recortar y redimensionar con un solo remap
+            dst = corrector.corregir(frame, mtx, dist)
             
             cv2.putText(dst, "CORREGIDO (C: cambiar)", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 255, 0), 2)